@@ -93,6 +93,11 @@ const studentProfileSchema = new mongoose.Schema({
     type: String,
     default: null
   },
+  // Time of the last match run stored in the Match collection
+  matchesUpdatedAt: {
+    type: Date,
+    default: null
+  },
   createdAt: {
     type: Date,
     default: Date.now
@@ -0,0 +1,130 @@
+"""
+Batch matching for many students against one encoded alumni corpus
+Students are scored in memory-bounded blocks, optionally across a process pool
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from python_service.sparse_engine import SparseMatchEngine
+from python_service.vocabulary import Vocabulary, current_vocabulary, use_vocabulary
+
+
+def _match_chunk(engine: SparseMatchEngine, tokens: List[str], students: List[Dict], top_n: Optional[int],
+                 min_score: Optional[float], memory_budget_bytes: int) -> List[List[Dict]]:
+    """Pool task: match one chunk of students in a copy of the submitting vocabulary so IDs match"""
+    chunk_vocabulary = Vocabulary()
+    chunk_vocabulary.adopt(tokens)
+    with use_vocabulary(chunk_vocabulary):
+        return match_students(engine, students, top_n, min_score, memory_budget_bytes)
+
+
+class BatchPool:
+    """
+    Long-lived process pool shared by batch requests
+
+    Workers are spawned, not forked: forking the multithreaded service
+    could copy a lock another thread holds into a worker that never
+    releases it. The pool starts on first use.
+    """
+
+    def __init__(self, workers: int):
+        """
+        Args:
+            workers: Number of worker processes
+        """
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._context = multiprocessing.get_context("spawn")
+
+    def executor(self) -> ProcessPoolExecutor:
+        """The worker pool, started if needed"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context)
+            return self._pool
+
+    def discard(self, executor: ProcessPoolExecutor):
+        """Drop a broken pool (a worker died) so the next batch starts a fresh one"""
+        with self._lock:
+            if self._pool is executor:
+                self._pool = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def match_students(engine: SparseMatchEngine, students: List[Dict], top_n: Optional[int] = None,
+                   min_score: Optional[float] = None, memory_budget_bytes: int = 256 * 1024 * 1024) -> List[List[Dict]]:
+    """
+    Match students block by block in the current process
+
+    Args:
+        engine: Encoded alumni corpus
+        students: Student profiles
+        top_n: Number of recommendations per student (None = all)
+        min_score: Drop alumni scoring below this
+        memory_budget_bytes: Upper bound for one block's score arrays
+
+    Returns:
+        One recommendation list per student, in input order
+    """
+    size = engine.block_size(memory_budget_bytes)
+    results = []
+    for start in range(0, len(students), size):
+        results.extend(engine.get_block_recommendations(students[start:start + size], top_n, min_score))
+    return results
+
+
+def run_batch(engine: SparseMatchEngine, students: List[Dict], top_n: Optional[int] = None,
+              min_score: Optional[float] = None, workers: int = 1,
+              memory_budget_bytes: int = 256 * 1024 * 1024,
+              pool: Optional[BatchPool] = None) -> List[List[Dict]]:
+    """
+    Match many students, splitting them across a process pool if workers > 1
+
+    Students are split into one chunk per worker, each sent with the engine;
+    the memory budget applies per chunk.
+
+    Args:
+        engine: Encoded alumni corpus
+        students: Student profiles
+        top_n: Number of recommendations per student (None = all)
+        min_score: Drop alumni scoring below this
+        workers: Number of worker processes
+        memory_budget_bytes: Upper bound for one block's score arrays
+        pool: Worker pool (None = match in this process)
+
+    Returns:
+        One recommendation list per student, in input order
+    """
+    if pool is None or workers <= 1 or len(students) < 2:
+        return match_students(engine, students, top_n, min_score, memory_budget_bytes)
+
+    workers = min(workers, pool.workers, len(students))
+    chunk = -(-len(students) // workers)
+    tokens = current_vocabulary().tokens()
+
+    executor = pool.executor()
+    try:
+        futures = [
+            executor.submit(_match_chunk, engine, tokens, students[start:start + chunk], top_n, min_score,
+                            memory_budget_bytes)
+            for start in range(0, len(students), chunk)
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+    except BrokenProcessPool:
+        pool.discard(executor)
+        raise
+    return results
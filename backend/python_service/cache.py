@@ -0,0 +1,168 @@
+"""
+Match result cache for GBHM Service
+Byte-bounded LRU/TTL cache of serialized match responses, keyed by the
+normalized student profile, the alumni corpus version and the weights
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, NamedTuple, Optional
+
+from python_service.serialization import dumps
+from python_service.vocabulary import normalize_scalar, normalize_set
+
+
+def _digest(data) -> str:
+    """Stable short hash of JSON-serializable data"""
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def profile_fingerprint(student: Dict) -> str:
+    """
+    Hash of the student fields GBHM scores, normalized as the matcher compares them
+
+    Students differing only in name, id, location or token case/order share
+    a fingerprint, since their recommendations are identical.
+    """
+    return _digest({
+        'university': normalize_scalar(student.get('university', '')),
+        'industry': normalize_scalar(student.get('preferred_industry', '')),
+        'degree': normalize_scalar(student.get('degree', '')),
+        'company': normalize_scalar(student.get('company', '')),
+        'skills': sorted(normalize_set(student.get('skills', []))),
+        'interests': sorted(normalize_set(student.get('interests', []))),
+        'looking_for': sorted(normalize_set(student.get('looking_for', [])))
+    })
+
+
+def profiles_fingerprint(profiles: List[Dict]) -> str:
+    """
+    Hash of profiles exactly as given (order and every field count)
+
+    Profiles built by the request models have a fixed key order, so they
+    are hashed from dumps() output without sorting keys.
+    """
+    return hashlib.blake2b(dumps(profiles), digest_size=16).hexdigest()
+
+
+def weights_fingerprint(weights: Dict) -> str:
+    """Hash of a GBHM weight table"""
+    return _digest(weights)
+
+
+class CacheEntry(NamedTuple):
+    """One cached response"""
+    body: bytes
+    expires_at: float
+    tag: Optional[str]
+
+
+class ResultCache:
+    """Thread-safe LRU cache of response bytes with a byte bound and a TTL"""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        """
+        Initialize an empty cache
+
+        Args:
+            max_bytes: Upper bound for the summed size of cached bodies (0 disables caching)
+            ttl_seconds: Lifetime of an entry (0 = no expiry)
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """
+        Look up a cached body, refreshing its LRU position
+
+        Returns:
+            Cached bytes, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds and entry.expires_at <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.body
+
+    def put(self, key: Hashable, body: bytes, tag: Optional[str] = None):
+        """
+        Store a body, evicting least recently used entries to fit the byte bound
+
+        Bodies larger than the whole bound are not cached.
+
+        Args:
+            key: Cache key
+            body: Serialized response
+            tag: Invalidation tag (e.g. the student userId)
+        """
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            while self._bytes + len(body) > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = CacheEntry(body, time.monotonic() + self.ttl_seconds, tag)
+            self._bytes += len(body)
+
+    def invalidate(self, tag: Optional[str] = None) -> int:
+        """
+        Drop entries
+
+        Args:
+            tag: Only drop entries stored with this tag (None = everything)
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if tag is None or entry.tag == tag]
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def _drop(self, key: Hashable):
+        self._bytes -= len(self._entries.pop(key).body)
+
+    def stats(self) -> Dict:
+        """Counters and occupancy for monitoring"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
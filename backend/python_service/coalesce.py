@@ -0,0 +1,70 @@
+"""
+Single-flight request coalescing for GBHM Service
+Concurrent requests with the same key share one computation and its
+serialized result instead of each running it
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """At most one in-flight computation per key; later callers await the first"""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled: False runs every call on its own (counters still count leaders)
+        """
+        self.enabled = enabled
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run compute, or join the computation already running for key
+
+        The computation runs as its own task, so a caller that goes away
+        (cancelled) does not cancel it for the others. An exception is
+        raised to every caller that joined it.
+
+        Args:
+            key: Normalized request fingerprint
+            compute: Coroutine function producing the shared result
+
+        Returns:
+            (result, whether it was shared with an earlier caller)
+        """
+        if not self.enabled:
+            self.leaders += 1
+            return await compute(), False
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = task
+        self.leaders += 1
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), False
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the exception so a computation every caller abandoned is not reported as unhandled
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+
+    def stats(self) -> Dict:
+        """Coalescing counters for monitoring"""
+        return {
+            'enabled': self.enabled,
+            'in_flight': len(self._inflight),
+            'computations': self.leaders,
+            'coalesced': self.coalesced,
+            'failures': self.failures
+        }
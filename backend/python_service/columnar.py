@@ -0,0 +1,224 @@
+"""
+Columnar wire format for alumni corpora
+Alumni are sent as column arrays over a shared string dictionary and decoded
+straight into EncodedProfile, without per-alumnus Pydantic models
+
+Format (JSON or msgpack object):
+    {
+        "strings": ["MIT", "Technology", "Python", ...],
+        "id": [...], "userId": [...], "name": [...],       # plain values
+        "university": [0, ...], "degree": [...], "industry": [...],
+        "company": [...], "availability": [...],            # string indices
+        "location": [...],                                  # string index or null
+        "skills": [[2, 5], ...], "interests": [...],
+        "mentoring_areas": [...], "hiring_stack": [...]     # lists of string indices
+    }
+Optional columns (company, availability, location, list columns) may be
+omitted; company and location may hold null entries.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from python_service.vocabulary import EncodedProfile, current_vocabulary, normalize_scalar
+
+SCALAR_COLUMNS = ('university', 'degree', 'industry')
+
+LIST_COLUMNS = ('skills', 'interests', 'mentoring_areas', 'hiring_stack')
+
+VALUE_COLUMNS = ('id', 'userId', 'name')
+
+
+class ColumnarAlumni(Sequence):
+    """Alumni profiles backed by columns; dicts are only built for rows accessed"""
+
+    def __init__(self, strings: List[str], columns: Dict[str, list], size: int):
+        self.strings = strings
+        self.columns = columns
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _string(self, column: str, row: int, default=None):
+        values = self.columns.get(column)
+        if values is None or values[row] is None:
+            return default
+        return self.strings[values[row]]
+
+    def _strings(self, column: str, row: int) -> List[str]:
+        values = self.columns.get(column)
+        if values is None:
+            return []
+        return [self.strings[j] for j in values[row]]
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(self.size))]
+        if row < 0:
+            row += self.size
+        return {
+            'id': self.columns['id'][row],
+            'userId': self.columns['userId'][row],
+            'name': self.columns['name'][row],
+            'university': self._string('university', row),
+            'degree': self._string('degree', row),
+            'industry': self._string('industry', row),
+            'skills': self._strings('skills', row),
+            'interests': self._strings('interests', row),
+            'mentoring_areas': self._strings('mentoring_areas', row),
+            'company': self._string('company', row, ''),
+            'availability': self._string('availability', row, 'Available'),
+            'hiring_stack': self._strings('hiring_stack', row),
+            'location': self._string('location', row)
+        }
+
+
+def _check_indices(column: str, values: list, size: int, nullable: bool = False):
+    for value in values:
+        if value is None and nullable:
+            continue
+        if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value < size:
+            raise ValueError(f"Column '{column}' holds an invalid string index: {value!r}")
+
+
+def decode_alumni_columns(payload: Dict) -> Tuple[ColumnarAlumni, List[EncodedProfile]]:
+    """
+    Decode a columnar alumni corpus
+
+    Tokens are normalized and interned once per dictionary string, then each
+    alumnus is encoded from integer indices only.
+
+    Args:
+        payload: Columnar corpus (see module docstring)
+
+    Returns:
+        (alumni sequence for building recommendations, encode_alumni output per row)
+
+    Raises:
+        ValueError: Malformed payload
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Alumni columns must be an object")
+
+    strings = payload.get('strings')
+    if not isinstance(strings, list) or not all(isinstance(s, str) for s in strings):
+        raise ValueError("'strings' must be a list of strings")
+
+    for column in VALUE_COLUMNS + SCALAR_COLUMNS:
+        if not isinstance(payload.get(column), list):
+            raise ValueError(f"Missing column '{column}'")
+
+    size = len(payload['userId'])
+    columns = {}
+    for column in VALUE_COLUMNS + SCALAR_COLUMNS + ('company', 'availability', 'location') + LIST_COLUMNS:
+        values = payload.get(column)
+        if values is None:
+            continue
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError(f"Column '{column}' must be a list of {size} entries")
+        columns[column] = values
+
+    for column in SCALAR_COLUMNS + ('availability',):
+        if column in columns:
+            _check_indices(column, columns[column], len(strings))
+    for column in ('company', 'location'):
+        if column in columns:
+            _check_indices(column, columns[column], len(strings), nullable=True)
+    for column in LIST_COLUMNS:
+        for row in columns.get(column, ()):
+            if not isinstance(row, list):
+                raise ValueError(f"Column '{column}' must hold lists of string indices")
+            _check_indices(column, row, len(strings))
+
+    # One intern per dictionary string instead of one per occurrence
+    active = current_vocabulary()
+    token_ids = [active.intern(normalize_scalar(s)) for s in strings]
+    available = [s == 'Available' for s in strings]
+
+    empty = [()] * size
+    skills = columns.get('skills', empty)
+    interests = columns.get('interests', empty)
+    mentoring = columns.get('mentoring_areas', empty)
+    companies = columns.get('company', [None] * size)
+    availability = columns.get('availability')
+
+    encoded = [
+        EncodedProfile(
+            university=token_ids[columns['university'][i]],
+            industry=token_ids[columns['industry'][i]],
+            degree=token_ids[columns['degree'][i]],
+            company=token_ids[companies[i]] if companies[i] is not None and strings[companies[i]] else None,
+            skills=frozenset([token_ids[j] for j in skills[i]]),
+            interests=frozenset([token_ids[j] for j in interests[i]]),
+            mentoring=frozenset([token_ids[j] for j in mentoring[i]]),
+            available=available[availability[i]] if availability is not None else True
+        )
+        for i in range(size)
+    ]
+
+    return ColumnarAlumni(strings, columns, size), encoded
+
+
+def rank_columnar(matcher, student: Dict, payload: Dict, top_n: Optional[int] = None,
+                  min_score: Optional[float] = None, offset: int = 0) -> Tuple[ColumnarAlumni, Tuple]:
+    """
+    Decode a columnar corpus and rank it for one student
+
+    Args:
+        matcher: GBHMMatcher
+        student: Student profile data
+        payload: Columnar alumni corpus
+        top_n: Number of recommendations (None = all)
+        min_score: Drop alumni scoring below this
+        offset: Number of ranked rows to skip (pagination)
+
+    Returns:
+        (decoded alumni, GBHMMatcher.rank_alumni output)
+    """
+    alumni, encoded = decode_alumni_columns(payload)
+    return alumni, matcher.rank_alumni(student, alumni, top_n, min_score, offset, encoded)
+
+
+def columnar_recommendations(matcher, student: Dict, payload: Dict, top_n: Optional[int] = None,
+                             min_score: Optional[float] = None, offset: int = 0) -> Tuple[int, List[Dict]]:
+    """
+    Recommendations for a columnar corpus, as GBHMMatcher.get_recommendations
+
+    Decoding happens here so it also runs on process workers, whose
+    vocabulary IDs are their own.
+
+    Returns:
+        (number of alumni, recommendations)
+    """
+    alumni, ranking = rank_columnar(matcher, student, payload, top_n, min_score, offset)
+    return len(alumni), list(matcher.iter_recommendations(student, alumni, ranking))
+
+
+def encode_alumni_columns(alumni_list: List[Dict]) -> Dict:
+    """
+    Build the columnar form of alumni profiles (AlumniProfileData dicts)
+
+    Args:
+        alumni_list: Alumni profiles
+
+    Returns:
+        Columnar corpus accepted by decode_alumni_columns
+    """
+    strings: List[str] = []
+    index: Dict[str, int] = {}
+
+    def ref(value: Optional[str]) -> Optional[int]:
+        if value is None:
+            return None
+        if value not in index:
+            index[value] = len(strings)
+            strings.append(value)
+        return index[value]
+
+    columns = {column: [alumni.get(column) for alumni in alumni_list] for column in VALUE_COLUMNS}
+    for column in SCALAR_COLUMNS + ('company', 'availability', 'location'):
+        columns[column] = [ref(alumni.get(column)) for alumni in alumni_list]
+    for column in LIST_COLUMNS:
+        columns[column] = [[ref(value) for value in alumni.get(column) or []] for alumni in alumni_list]
+
+    return {'strings': strings, **columns}
@@ -24,10 +24,102 @@ class Config:
     # MongoDB Settings
     MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/careernexus")
     DB_NAME = os.getenv("DB_NAME", "careernexus")
+    # Load the registries from Mongo at startup and keep them current from
+    # a change stream (replica sets) or by polling updatedAt every
+    # MONGO_POLL_SECONDS; off = the backend pushes profiles over HTTP
+    MONGO_SYNC = os.getenv("MONGO_SYNC", "False").lower() == "true"
+    MONGO_CHANGE_STREAMS = os.getenv("MONGO_CHANGE_STREAMS", "True").lower() == "true"
+    MONGO_BATCH_SIZE = int(os.getenv("MONGO_BATCH_SIZE", 1000))
+    MONGO_POLL_SECONDS = float(os.getenv("MONGO_POLL_SECONDS", 5))
+    MONGO_ALUMNI_COLLECTION = os.getenv("MONGO_ALUMNI_COLLECTION", "alumniprofiles")
+    MONGO_STUDENT_COLLECTION = os.getenv("MONGO_STUDENT_COLLECTION", "studentprofiles")
+    # Match collection written by POST /api/match/student/persist, in
+    # unordered bulk_write batches of this many operations
+    MATCH_SINK_COLLECTION = os.getenv("MATCH_SINK_COLLECTION", "matches")
+    MATCH_SINK_BATCH_SIZE = int(os.getenv("MATCH_SINK_BATCH_SIZE", 500))
     
     # Backend Settings
     BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:5000")
     
+    # Matching Settings
+    # "index" answers top_n requests on the resident corpus from the
+    # inverted index and full rankings with SparseMatchEngine,
+    # "sparse" always uses SparseMatchEngine,
+    # "python" uses the per-pair GBHMMatcher loop
+    MATCH_ENGINE = os.getenv("MATCH_ENGINE", "index").lower()
+    REGISTRY_CHANGE_LOG_SIZE = int(os.getenv("REGISTRY_CHANGE_LOG_SIZE", 10000))
+    # Approximate matching (requests with "approximate": true) scores only
+    # alumni sharing a MinHash LSH bucket with the student; more bands raise
+    # recall and latency, more rows per band lower both
+    # (measure with: python -m python_service.lsh)
+    LSH_BANDS = int(os.getenv("LSH_BANDS", 32))
+    LSH_ROWS = int(os.getenv("LSH_ROWS", 2))
+    # Named weight profiles selectable per request: a JSON object of
+    # profile name -> weight overrides, or a path to a JSON file holding one
+    # (see python_service.weights); "default" is used when none is named
+    WEIGHT_PROFILES = os.getenv("WEIGHT_PROFILES", "")
+    
+    # Match Executor Settings
+    # "thread" runs matching on a thread pool; "process" additionally runs
+    # inline-corpus /api/match requests on a process pool (scoring holds the GIL)
+    MATCH_EXECUTOR = os.getenv("MATCH_EXECUTOR", "thread").lower()
+    MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", 4))
+    # Requests waiting for a worker beyond this are rejected with 429
+    MATCH_QUEUE_SIZE = int(os.getenv("MATCH_QUEUE_SIZE", 64))
+    # Requests not finished within this are answered with 503
+    MATCH_DEADLINE_MS = int(os.getenv("MATCH_DEADLINE_MS", 30000))
+    
+    # Sharded Matching Settings
+    # With 2 or more shards, registry matching fans out to this many shard
+    # processes, each owning a contiguous slice of the alumni corpus
+    SHARD_COUNT = int(os.getenv("SHARD_COUNT", 0))
+    
+    # Skill Graph Settings
+    # Co-occurrence graph over the skills and interests of all resident
+    # profiles, used by weight profiles with a non-zero "bridge" weight.
+    # It is rebuilt in the background when the registries changed
+    # (0 seconds = only through POST /api/skill-graph/rebuild)
+    SKILL_GRAPH_REBUILD_SECONDS = float(os.getenv("SKILL_GRAPH_REBUILD_SECONDS", 600))
+    SKILL_GRAPH_MIN_COOCCURRENCE = int(os.getenv("SKILL_GRAPH_MIN_COOCCURRENCE", 2))
+    SKILL_GRAPH_NEIGHBORS = int(os.getenv("SKILL_GRAPH_NEIGHBORS", 20))
+    SKILL_GRAPH_DECAY = float(os.getenv("SKILL_GRAPH_DECAY", 0.5))
+    
+    # Batch Matching Settings
+    # Worker processes of the pool shared by /api/match/batch requests (1 = no
+    # pool), and the most a request may ask for
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 1))
+    BATCH_MEMORY_BUDGET_MB = int(os.getenv("BATCH_MEMORY_BUDGET_MB", 256))
+    
+    # Request Coalescing Settings
+    # Concurrent identical /api/match and /api/explain requests share one
+    # computation and one serialized response
+    SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "True").lower() == "true"
+    
+    # Result Cache Settings
+    # Serialized /api/match/student responses; 0 MB disables the cache,
+    # 0 seconds disables expiry
+    RESULT_CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", 64))
+    RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", 300))
+    
+    # Match Table Export Settings
+    # Export outputs are written under this directory only
+    EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+    
+    # Alumni Snapshot Settings
+    # Encoded alumni corpora are written here and memory-mapped by every
+    # worker at startup; empty (the default) disables snapshots
+    SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
+    # How often workers check for a newer snapshot (0 = only at startup)
+    SNAPSHOT_POLL_SECONDS = float(os.getenv("SNAPSHOT_POLL_SECONDS", 30))
+    SNAPSHOT_KEEP = int(os.getenv("SNAPSHOT_KEEP", 3))
+    
+    # Profiling Settings
+    # Token required by the /api/admin endpoints (X-Admin-Token header);
+    # an empty value disables them and the X-Profile request header
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+    # cProfile (.prof) and collapsed-stack (.folded) outputs are written here
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
 
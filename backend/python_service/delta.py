@@ -0,0 +1,176 @@
+"""
+Incremental re-matching for a single profile change
+Finds the (student, alumni) pairs whose score or top-N membership changes
+when one profile is inserted, edited or removed, without rescoring the corpus
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from python_service.inverted_index import InvertedIndex, encode_profile, encoded_terms, static_score
+
+# One version of the changed profile: (terms, static score part), or None if absent
+Version = Optional[Tuple[Set, float]]
+
+
+def pair_change(student_id: str, alumni_id: str, old_score: Optional[float], new_score: Optional[float]) -> Dict:
+    """Build one pair change entry"""
+    return {
+        'student_id': student_id,
+        'alumni_id': alumni_id,
+        'old_score': old_score,
+        'new_score': new_score,
+        'was_top_n': None,
+        'in_top_n': None
+    }
+
+
+def _version(profile: Optional[Dict], side: str, weights: Dict) -> Version:
+    """Encode one version of the changed profile"""
+    if profile is None:
+        return None
+    encoded = encode_profile(profile, side)
+    return encoded_terms(encoded, side), static_score(encoded, weights)
+
+
+def _pair_score(index: InvertedIndex, version: Version, slot: int) -> Optional[float]:
+    """Score of the changed profile version against one indexed profile"""
+    if version is None:
+        return None
+    terms, static = version
+    return index.score(terms, slot) + static
+
+
+def _candidate_slots(index: InvertedIndex, old: Version, new: Version) -> Set[int]:
+    """
+    Indexed slots whose pair score can differ between the two versions
+
+    Scores are additive per shared term, so only the postings of terms
+    present in exactly one version matter, unless the static part changes
+    (or a version is absent and profiles score on their own static part),
+    which touches every pair.
+    """
+    old_static = old[1] if old else 0
+    new_static = new[1] if new else 0
+    if old_static != new_static:
+        return set(index.profiles)
+
+    if old is None or new is None:
+        terms = (old or new)[0]
+        slots = {slot for static, group in index.static_groups() if static for slot in group}
+    else:
+        terms = old[0] ^ new[0]
+        slots = set()
+
+    for term in terms:
+        slots.update(index.postings.get(term, ()))
+    return slots
+
+
+def _changed(old_score: Optional[float], new_score: Optional[float]) -> bool:
+    """A pair changed if its score moved; absent pairs count as scoring 0"""
+    return (old_score or 0) != (new_score or 0)
+
+
+def _in_top_n(others: List[Tuple[int, float]], slot: int, score: Optional[float], top_n: int) -> bool:
+    """Whether a (slot, score) entry ranks within top_n against the other entries"""
+    if score is None:
+        return False
+    ahead = sum(1 for other_slot, other_score in others
+                if other_score > score or (other_score == score and other_slot < slot))
+    return ahead < top_n
+
+
+def alumni_change_delta(old: Optional[Dict], new: Optional[Dict], student_index: InvertedIndex,
+                        alumni_index: InvertedIndex, weights: Dict, top_n: Optional[int] = None) -> List[Dict]:
+    """
+    Pairs affected by one alumni profile change
+
+    Both indexes must reflect the corpora before the change.
+
+    Args:
+        old: Alumni profile before the change (None if inserted)
+        new: Alumni profile after the change (None if removed)
+        student_index: Student InvertedIndex
+        alumni_index: Alumni InvertedIndex, for the students' top-N rankings
+        weights: GBHM weights
+        top_n: Also report top-N membership changes for this N
+
+    Returns:
+        Pair change dicts
+    """
+    alumni_id = (new or old)['userId']
+    old_version = _version(old, 'alumni', weights)
+    new_version = _version(new, 'alumni', weights)
+    alumni_slot = alumni_index.slot_for(alumni_id)
+
+    changes = []
+    for slot in sorted(_candidate_slots(student_index, old_version, new_version)):
+        old_score = _pair_score(student_index, old_version, slot)
+        new_score = _pair_score(student_index, new_version, slot)
+        if not _changed(old_score, new_score):
+            continue
+
+        student_id = student_index.profiles[slot]['userId']
+        changes.append(pair_change(student_id, alumni_id, old_score, new_score))
+        if not top_n:
+            continue
+
+        # Other alumni keep their scores; only this alumnus moves
+        query = encoded_terms(student_index.encoded[slot], 'student')
+        others = [hit for hit in alumni_index.top_k(query, top_n + 1) if hit[0] != alumni_slot][:top_n]
+        was_in = _in_top_n(others, alumni_slot, old_score, top_n)
+        is_in = _in_top_n(others, alumni_slot, new_score, top_n)
+        changes[-1].update(was_top_n=was_in, in_top_n=is_in)
+
+        if was_in != is_in and len(others) == top_n:
+            displaced_slot, displaced_score = others[-1]
+            displaced = pair_change(student_id, alumni_index.profiles[displaced_slot]['userId'],
+                                    displaced_score, displaced_score)
+            displaced.update(was_top_n=is_in, in_top_n=was_in)
+            changes.append(displaced)
+
+    return changes
+
+
+def student_change_delta(old: Optional[Dict], new: Optional[Dict], alumni_index: InvertedIndex,
+                         weights: Dict, top_n: Optional[int] = None) -> List[Dict]:
+    """
+    Pairs affected by one student profile change
+
+    Args:
+        old: Student profile before the change (None if inserted)
+        new: Student profile after the change (None if removed)
+        alumni_index: Alumni InvertedIndex
+        weights: GBHM weights
+        top_n: Also report top-N membership changes for this N
+
+    Returns:
+        Pair change dicts
+    """
+    student_id = (new or old)['userId']
+    old_version = _version(old, 'student', weights)
+    new_version = _version(new, 'student', weights)
+
+    slots = _candidate_slots(alumni_index, old_version, new_version)
+    before: Set[int] = set()
+    after: Set[int] = set()
+    if top_n:
+        before = {slot for slot, _ in alumni_index.top_k(old_version[0], top_n)} if old else set()
+        after = {slot for slot, _ in alumni_index.top_k(new_version[0], top_n)} if new else set()
+        slots |= before ^ after
+
+    changes = []
+    for slot in sorted(slots):
+        old_score = _pair_score(alumni_index, old_version, slot)
+        new_score = _pair_score(alumni_index, new_version, slot)
+        moved = slot in before ^ after
+        if not moved and not _changed(old_score, new_score):
+            continue
+
+        change = pair_change(student_id, alumni_index.profiles[slot]['userId'], old_score, new_score)
+        if top_n:
+            change.update(was_top_n=slot in before, in_top_n=slot in after)
+        changes.append(change)
+
+    return changes
+
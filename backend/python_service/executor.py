@@ -0,0 +1,137 @@
+"""
+Matching executor with admission control for GBHM Service
+Runs CPU-bound scoring off the asyncio event loop on a bounded thread or
+process pool, rejecting work when saturated or past its deadline
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ExecutorSaturated(Exception):
+    """All workers are busy and the queue is full"""
+
+
+class DeadlineExceeded(Exception):
+    """The request deadline passed before its result was ready"""
+
+
+def _run_timed(fn: Callable, args: tuple, enqueued_at: float, deadline_at: Optional[float]) -> Tuple[Any, float]:
+    """
+    Worker-side wrapper: skip work whose deadline passed while queued
+
+    Returns:
+        (fn result, queue wait in ms)
+    """
+    started_at = time.time()
+    if deadline_at is not None and started_at > deadline_at:
+        raise DeadlineExceeded("Deadline passed while queued")
+    return fn(*args), (started_at - enqueued_at) * 1000
+
+
+class MatchExecutor:
+    """Bounded pool for matching work"""
+
+    def __init__(self, kind: str = "thread", workers: int = 4, queue_size: int = 64):
+        """
+        Create the pools
+
+        Args:
+            kind: "thread" or "process"; process workers only run tasks
+                  submitted with in_process=True, the rest use threads
+            workers: Number of workers
+            queue_size: Tasks allowed to wait for a worker before rejecting
+        """
+        self.kind = kind
+        self.workers = workers
+        self.queue_size = queue_size
+        self._threads = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gbhm-match")
+        # Spawned, not forked: a fork of the threaded service can inherit held locks
+        self._processes = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) if kind == "process" else None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.expired = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Admitted tasks not yet picked up by a worker (upper estimate)"""
+        return max(0, self._pending - self.workers)
+
+    def _release(self, _future: Future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable, *args, deadline_ms: Optional[float] = None,
+                  in_process: bool = False) -> Tuple[Any, Dict]:
+        """
+        Run fn(*args) on the pool and await its result
+
+        Args:
+            fn: Function to run (module-level and picklable if in_process)
+            args: Arguments for fn
+            deadline_ms: Time budget from submission (None = no deadline)
+            in_process: Run on the process pool when kind == "process"
+
+        Returns:
+            (fn result, {"queue_depth", "queue_wait_ms"})
+
+        Raises:
+            ExecutorSaturated: Workers and queue are full
+            DeadlineExceeded: The deadline passed before fn finished
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise ExecutorSaturated("Matching queue is full")
+            self._pending += 1
+            queue_depth = max(0, self._pending - self.workers)
+
+        enqueued_at = time.time()
+        deadline_at = enqueued_at + deadline_ms / 1000 if deadline_ms else None
+        pool = self._processes if in_process and self._processes is not None else self._threads
+
+        try:
+            future = pool.submit(_run_timed, fn, args, enqueued_at, deadline_at)
+        except BaseException:
+            self._release(None)
+            raise
+        # Work that keeps running after a timeout still holds its slot
+        future.add_done_callback(self._release)
+
+        try:
+            result, queue_wait_ms = await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout=deadline_ms / 1000 if deadline_ms else None
+            )
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            with self._lock:
+                self.expired += 1
+            raise DeadlineExceeded("Matching deadline exceeded")
+
+        return result, {"queue_depth": queue_depth, "queue_wait_ms": round(queue_wait_ms, 2)}
+
+    def stats(self) -> Dict:
+        """Pool occupancy and rejection counters"""
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "pending": self._pending,
+            "queue_depth": self.queue_depth,
+            "rejected": self.rejected,
+            "expired": self.expired
+        }
+
+    def shutdown(self):
+        """Stop the pools, cancelling queued work"""
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
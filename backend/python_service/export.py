@@ -0,0 +1,264 @@
+"""
+All-pairs match table export for the nightly recompute
+Streams student x alumni scores (or per-student top-k) to NDJSON or Parquet
+in Match-collection shape, with progress reporting and resume by student ID
+
+NDJSON output loads straight into Mongo:
+    mongoimport --db careernexus --collection matches --mode upsert \
+        --upsertFields studentId,alumniId --file matches.ndjson
+"""
+
+import argparse
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from python_service.cache import profiles_fingerprint
+from python_service.gbhm_matcher import GBHMMatcher
+from python_service.sparse_engine import SparseMatchEngine
+
+FORMATS = ("ndjson", "parquet")
+
+BREAKDOWN_FIELDS = ('university', 'industry', 'degree', 'skills', 'interests', 'mentoring', 'company', 'availability')
+
+OBJECT_ID = re.compile(r"^[0-9a-fA-F]{24}$")
+
+# Checkpoint fields a resumed run must share with the run it continues
+RESUME_KEYS = ("format", "top_n", "min_score", "corpus", "start_id", "end_id")
+
+
+def _object_id(value: str, extended_json: bool):
+    """Wrap 24-hex ids as Extended JSON ObjectIds so mongoimport stores them as such"""
+    if extended_json and isinstance(value, str) and OBJECT_ID.match(value):
+        return {"$oid": value}
+    return value
+
+
+def match_document(student_id: str, recommendation: Dict, rank: int, updated_at: str,
+                   extended_json: bool = False) -> Dict:
+    """
+    Convert one recommendation into a Match collection document
+
+    Args:
+        student_id: Student userId
+        recommendation: Entry of get_recommendations
+        rank: 1-based rank within the student's list
+        updated_at: ISO timestamp of the run
+        extended_json: Emit $oid/$date wrappers for mongoimport
+
+    Returns:
+        Match document
+    """
+    breakdown = recommendation['score_breakdown']
+    return {
+        "studentId": _object_id(student_id, extended_json),
+        "alumniId": _object_id(recommendation['alumni_id'], extended_json),
+        "totalScore": recommendation['total_score'],
+        "scoreBreakdown": {field: breakdown.get(field, 0) for field in BREAKDOWN_FIELDS},
+        "commonSkills": breakdown.get('common_skills', []),
+        "commonInterests": breakdown.get('common_interests', []),
+        "matchingAreas": breakdown.get('matching_areas', []),
+        "matchRank": rank,
+        "updatedAt": {"$date": updated_at} if extended_json else updated_at
+    }
+
+
+def corpus_fingerprint(engine: SparseMatchEngine) -> str:
+    """Identifies the alumni corpus and weights an export is scored with"""
+    return f"{profiles_fingerprint(engine.alumni)}-{engine.profile.fingerprint}"
+
+
+def _progress_path(output_path: str) -> str:
+    return output_path + ".progress.json"
+
+
+def read_progress(output_path: str) -> Optional[Dict]:
+    """Read the checkpoint of a previous run, if any"""
+    try:
+        with open(_progress_path(output_path)) as progress_file:
+            return json.load(progress_file)
+    except FileNotFoundError:
+        return None
+
+
+def _write_progress(output_path: str, progress: Dict):
+    """Atomically replace the checkpoint file"""
+    path = _progress_path(output_path)
+    with open(path + ".tmp", "w") as progress_file:
+        json.dump(progress, progress_file)
+        progress_file.flush()
+        os.fsync(progress_file.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def _write_ndjson(output_path: str, documents: List[Dict]):
+    with open(output_path, "a", encoding="utf-8") as output:
+        for document in documents:
+            output.write(json.dumps(document, ensure_ascii=False))
+            output.write("\n")
+        output.flush()
+        os.fsync(output.fileno())
+
+
+def _write_parquet(output_path: str, documents: List[Dict], part: int):
+    """Parquet files cannot be appended to, so each block is one part file in a directory"""
+    import pandas as pd
+
+    os.makedirs(output_path, exist_ok=True)
+    frame = pd.DataFrame(documents)
+    frame.to_parquet(os.path.join(output_path, f"part-{part:05d}.parquet"), index=False)
+
+
+def export_match_table(engine: SparseMatchEngine, students: List[Dict], output_path: str,
+                       output_format: str = "ndjson", top_n: Optional[int] = None,
+                       min_score: Optional[float] = None, start_id: Optional[str] = None,
+                       end_id: Optional[str] = None, resume: bool = False,
+                       block_size: int = 256,
+                       progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    Score students against the engine's alumni and stream rows to disk
+
+    Students are processed in userId order, one block at a time; after each
+    block is flushed the checkpoint records the last student written, so a
+    resumed run continues after it. A crash between a flush and the
+    checkpoint re-exports that block, which is harmless when loading with
+    upserts keyed on (studentId, alumniId). A run only resumes a checkpoint
+    written with the same format, top_n, min_score and alumni corpus.
+
+    Args:
+        engine: Encoded alumni corpus
+        students: Student profiles
+        output_path: NDJSON file, or directory of Parquet parts
+        output_format: "ndjson" or "parquet"
+        top_n: Rows per student (None = full table)
+        min_score: Drop pairs scoring below this
+        start_id: First student userId to export (inclusive)
+        end_id: Last student userId to export (inclusive)
+        resume: Continue after the checkpoint of a previous run
+        block_size: Students scored per block
+        progress: Called with (students done, students in range) after each block
+
+    Returns:
+        Final progress record
+
+    Raises:
+        ValueError: Unsupported format, or a checkpoint this run cannot resume
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f"Unsupported export format: {output_format}")
+
+    selected = sorted(
+        (s for s in students
+         if (start_id is None or s['userId'] >= start_id) and (end_id is None or s['userId'] <= end_id)),
+        key=lambda s: s['userId']
+    )
+
+    state = {
+        "format": output_format,
+        "top_n": top_n,
+        "min_score": min_score,
+        "corpus": corpus_fingerprint(engine),
+        "start_id": start_id,
+        "end_id": end_id,
+        "total_students": len(selected),
+        "students_done": 0,
+        "rows_written": 0,
+        "parts_written": 0,
+        "last_student_id": None,
+        "completed": False
+    }
+
+    previous = read_progress(output_path) if resume else None
+    if previous is not None:
+        mismatched = [key for key in RESUME_KEYS if previous.get(key) != state[key]]
+        if mismatched:
+            raise ValueError(
+                f"Cannot resume {output_path}: its checkpoint has a different {', '.join(mismatched)}"
+            )
+        state.update({key: previous[key] for key in ("students_done", "rows_written", "parts_written", "last_student_id")})
+        if state["last_student_id"] is not None:
+            selected = [s for s in selected if s['userId'] > state["last_student_id"]]
+    elif output_format == "ndjson" and os.path.exists(output_path):
+        os.remove(output_path)
+    elif output_format == "parquet" and os.path.isdir(output_path):
+        for name in os.listdir(output_path):
+            if name.startswith("part-") and name.endswith(".parquet"):
+                os.remove(os.path.join(output_path, name))
+
+    updated_at = datetime.now(timezone.utc).isoformat()
+
+    for start in range(0, len(selected), block_size):
+        block = selected[start:start + block_size]
+        documents = []
+        for student, recommendations in zip(block, engine.get_block_recommendations(block, top_n, min_score)):
+            documents.extend(
+                match_document(student['userId'], rec, rank, updated_at, extended_json=output_format == "ndjson")
+                for rank, rec in enumerate(recommendations, start=1)
+            )
+
+        if output_format == "ndjson":
+            _write_ndjson(output_path, documents)
+        elif documents:
+            _write_parquet(output_path, documents, state["parts_written"])
+            state["parts_written"] += 1
+
+        state["students_done"] += len(block)
+        state["rows_written"] += len(documents)
+        state["last_student_id"] = block[-1]['userId']
+        _write_progress(output_path, state)
+
+        if progress:
+            progress(state["students_done"], state["total_students"])
+
+    state["completed"] = True
+    _write_progress(output_path, state)
+    return state
+
+
+def _load_profiles(path: str) -> List[Dict]:
+    """Load profiles from a JSON array or NDJSON file"""
+    with open(path, encoding="utf-8") as profile_file:
+        text = profile_file.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main():
+    """Command line entry point for the nightly export"""
+    parser = argparse.ArgumentParser(description="Export the GBHM student x alumni match table")
+    parser.add_argument("--students", required=True, help="Student profiles (JSON array or NDJSON)")
+    parser.add_argument("--alumni", required=True, help="Alumni profiles (JSON array or NDJSON)")
+    parser.add_argument("--output", required=True, help="NDJSON file or Parquet directory")
+    parser.add_argument("--format", default="ndjson", choices=FORMATS)
+    parser.add_argument("--top-n", type=int, default=None)
+    parser.add_argument("--min-score", type=float, default=None)
+    parser.add_argument("--start-id", default=None)
+    parser.add_argument("--end-id", default=None)
+    parser.add_argument("--resume", action="store_true")
+    args = parser.parse_args()
+
+    engine = GBHMMatcher().build_engine(_load_profiles(args.alumni))
+
+    def report(done, total):
+        print(f"{done}/{total} students exported", flush=True)
+
+    state = export_match_table(
+        engine,
+        _load_profiles(args.students),
+        args.output,
+        output_format=args.format,
+        top_n=args.top_n,
+        min_score=args.min_score,
+        start_id=args.start_id,
+        end_id=args.end_id,
+        resume=args.resume,
+        progress=report
+    )
+    print(f"Wrote {state['rows_written']} rows for {state['students_done']} students", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,25 +3,27 @@ Graph-Based Hierarchical Matching (GBHM) Algorithm
 Core matching logic for student-alumni recommendations
 """
 
-from typing import Dict, List, Tuple
+import heapq
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from python_service.inverted_index import InvertedIndex, encoded_terms, static_score
+from python_service.lsh import LSHIndex
+from python_service.sparse_engine import SparseMatchEngine
+from python_service.vocabulary import EncodedProfile, current_vocabulary, encode_alumni, encode_student
+from python_service.weights import DEFAULT_WEIGHTS
 
 class GBHMMatcher:
     """Graph-Based Hierarchical Matching Algorithm"""
     
-    def __init__(self):
-        """Initialize the matcher with GBHM weights"""
-        
-        # Define weights for different connection types
-        self.weights = {
-            'university': 200,      # Exact match - strongest (Level 0)
-            'industry': 160,        # Exact match (Level 0)
-            'degree': 100,          # Exact match (Level 0)
-            'skill': 90,            # Per skill match (Level 1)
-            'interest': 70,         # Per interest match (Level 1)
-            'mentoring': 50,        # Per mentoring area match (Level 2)
-            'company': 50,          # Company match (Additional)
-            'availability': 50      # Alumni is available (Additional)
-        }
+    def __init__(self, weights: Optional[Dict] = None):
+        """
+        Initialize the matcher with GBHM weights
+
+        Args:
+            weights: Weight key -> weight (default: DEFAULT_WEIGHTS, see weights.py)
+        """
+        self.weights = dict(weights if weights is not None else DEFAULT_WEIGHTS)
     
     def calculate_hierarchical_score(self, student: Dict, alumni: Dict) -> Dict:
         """
@@ -40,129 +42,379 @@ class GBHMMatcher:
         Returns:
             Dictionary with score breakdown
         """
-        score_breakdown = {}
-        total_score = 0
-        
-        # ============ LEVEL 0: EXACT MATCHES (0 hops) ============
+        # Alumni first: it interns its tokens, the student only looks them up
+        encoded_alumni = encode_alumni(alumni)
+        return self.score_encoded(encode_student(student), encoded_alumni)
+    
+    def _match_encoded(self, student: EncodedProfile, alumni: EncodedProfile) -> Tuple[Dict, frozenset, frozenset, frozenset]:
+        """
+        Score an encoded pair, keeping shared token IDs undecoded
         
-        # University match (strongest connection)
-        if str(student.get('university', '')).lower() == str(alumni.get('university', '')).lower():
-            score_breakdown['university'] = self.weights['university']
-            total_score += score_breakdown['university']
-        else:
-            score_breakdown['university'] = 0
+        Args:
+            student: Encoded student profile
+            alumni: Encoded alumni profile
+            
+        Returns:
+            (component scores, common skill IDs, common interest IDs, matching area IDs)
+        """
+        weights = self.weights
         
-        # Industry match
-        if str(student.get('preferred_industry', '')).lower() == str(alumni.get('industry', '')).lower():
-            score_breakdown['industry'] = self.weights['industry']
-            total_score += score_breakdown['industry']
-        else:
-            score_breakdown['industry'] = 0
+        # ============ LEVEL 0: EXACT MATCHES (0 hops) ============
         
-        # Degree match
-        if str(student.get('degree', '')).lower() == str(alumni.get('degree', '')).lower():
-            score_breakdown['degree'] = self.weights['degree']
-            total_score += score_breakdown['degree']
-        else:
-            score_breakdown['degree'] = 0
+        scores = {
+            'university': weights['university'] if student.university == alumni.university else 0,
+            'industry': weights['industry'] if student.industry == alumni.industry else 0,
+            'degree': weights['degree'] if student.degree == alumni.degree else 0
+        }
         
         # ============ LEVEL 1: SKILL BRIDGES (1 hop) ============
         
-        # Skills matching
-        student_skills = set([s.lower() for s in student.get('skills', [])])
-        alumni_skills = set([s.lower() for s in alumni.get('skills', [])])
-        common_skills = student_skills & alumni_skills
-        
-        skill_score = len(common_skills) * self.weights['skill']
-        score_breakdown['skills'] = skill_score
-        total_score += skill_score
-        score_breakdown['common_skills'] = list(common_skills)
+        common_skills = student.skills & alumni.skills
+        scores['skills'] = len(common_skills) * weights['skill']
         
-        # Interests matching
-        student_interests = set([i.lower() for i in student.get('interests', [])])
-        alumni_interests = set([i.lower() for i in alumni.get('interests', [])])
-        common_interests = student_interests & alumni_interests
-        
-        interest_score = len(common_interests) * self.weights['interest']
-        score_breakdown['interests'] = interest_score
-        total_score += interest_score
-        score_breakdown['common_interests'] = list(common_interests)
+        common_interests = student.interests & alumni.interests
+        scores['interests'] = len(common_interests) * weights['interest']
         
         # ============ LEVEL 2: MENTORING MATCH (2 hops) ============
         
-        student_looking_for = set([n.lower() for n in student.get('looking_for', [])])
-        alumni_mentoring = set([m.lower() for m in alumni.get('mentoring_areas', [])])
-        matching_areas = student_looking_for & alumni_mentoring
-        
-        mentoring_score = len(matching_areas) * self.weights['mentoring']
-        score_breakdown['mentoring'] = mentoring_score
-        total_score += mentoring_score
-        score_breakdown['matching_areas'] = list(matching_areas)
+        matching_areas = student.mentoring & alumni.mentoring
+        scores['mentoring'] = len(matching_areas) * weights['mentoring']
         
         # ============ ADDITIONAL FACTORS ============
         
-        # Company match (bonus if same company)
-        if alumni.get('company'):
-            if str(student.get('company', '')).lower() == str(alumni.get('company', '')).lower():
-                score_breakdown['company'] = self.weights['company']
-                total_score += score_breakdown['company']
-            else:
-                score_breakdown['company'] = 0
+        # Company match only counts when the alumnus has a company
+        if alumni.company is not None and student.company == alumni.company:
+            scores['company'] = weights['company']
         else:
-            score_breakdown['company'] = 0
+            scores['company'] = 0
         
-        # Availability bonus
-        if alumni.get('availability') == 'Available':
-            score_breakdown['availability'] = self.weights['availability']
-            total_score += score_breakdown['availability']
-        else:
-            score_breakdown['availability'] = 0
+        scores['availability'] = weights['availability'] if alumni.available else 0
+        
+        return scores, common_skills, common_interests, matching_areas
+    
+    def score_encoded(self, student: EncodedProfile, alumni: EncodedProfile) -> Dict:
+        """
+        Hierarchical match score of an encoded pair
+        
+        Args:
+            student: Encoded student profile
+            alumni: Encoded alumni profile
+            
+        Returns:
+            Same structure as calculate_hierarchical_score
+        """
+        scores, common_skills, common_interests, matching_areas = self._match_encoded(student, alumni)
+        
+        score_breakdown = {
+            'university': scores['university'],
+            'industry': scores['industry'],
+            'degree': scores['degree'],
+            'skills': scores['skills'],
+            'common_skills': current_vocabulary().decode(sorted(common_skills)),
+            'interests': scores['interests'],
+            'common_interests': current_vocabulary().decode(sorted(common_interests)),
+            'mentoring': scores['mentoring'],
+            'matching_areas': current_vocabulary().decode(sorted(matching_areas)),
+            'company': scores['company'],
+            'availability': scores['availability']
+        }
+        
+        total_score = 0
+        for component in ('university', 'industry', 'degree', 'skills', 'interests', 'mentoring', 'company', 'availability'):
+            total_score += scores[component]
         
         return {
             'total_score': total_score,
             'breakdown': score_breakdown
         }
     
-    def get_recommendations(self, student: Dict, alumni_list: List[Dict], top_n: int = None) -> List[Dict]:
+    def _total_encoded(self, student: EncodedProfile, alumni: EncodedProfile) -> float:
+        """
+        Total score only, without building the breakdown or common lists
+        
+        Args:
+            student: Encoded student profile
+            alumni: Encoded alumni profile
+            
+        Returns:
+            Same total as calculate_hierarchical_score
+        """
+        weights = self.weights
+        total_score = 0
+        
+        if student.university == alumni.university:
+            total_score += weights['university']
+        if student.industry == alumni.industry:
+            total_score += weights['industry']
+        if student.degree == alumni.degree:
+            total_score += weights['degree']
+        
+        total_score += len(student.skills & alumni.skills) * weights['skill']
+        total_score += len(student.interests & alumni.interests) * weights['interest']
+        total_score += len(student.mentoring & alumni.mentoring) * weights['mentoring']
+        
+        if alumni.company is not None and student.company == alumni.company:
+            total_score += weights['company']
+        if alumni.available:
+            total_score += weights['availability']
+        
+        return total_score
+    
+    def build_recommendation(self, student: Dict, alumni: Dict,
+                             encoded_student: Optional[EncodedProfile] = None,
+                             encoded_alumni: Optional[EncodedProfile] = None) -> Dict:
+        """
+        Score one pair and build its recommendation entry
+        
+        Args:
+            student: Student profile data
+            alumni: Alumni profile data
+            encoded_student: Pre-encoded student (encoded here if omitted)
+            encoded_alumni: Pre-encoded alumni (encoded here if omitted)
+            
+        Returns:
+            Recommendation dictionary with score breakdown
+        """
+        if encoded_alumni is None:
+            encoded_alumni = encode_alumni(alumni)
+        if encoded_student is None:
+            encoded_student = encode_student(student)
+        score_data = self.score_encoded(encoded_student, encoded_alumni)
+        
+        return {
+            'alumni_id': alumni.get('userId'),
+            'alumni_name': alumni.get('name'),
+            'company': alumni.get('company'),
+            'industry': alumni.get('industry'),
+            'location': alumni.get('location'),
+            'skills': alumni.get('skills', []),
+            'interests': alumni.get('interests', []),
+            'mentoring_areas': alumni.get('mentoring_areas', []),
+            'availability': alumni.get('availability'),
+            'total_score': score_data['total_score'],
+            'score_breakdown': score_data['breakdown']
+        }
+    
+    def get_recommendations(self, student: Dict, alumni_list: List[Dict], top_n: int = None,
+                            min_score: float = None, offset: int = 0,
+                            encoded_alumni: Optional[List[EncodedProfile]] = None,
+                            timings: Optional[Dict[str, float]] = None) -> List[Dict]:
         """
         Get top N alumni recommendations for a student
         
+        Totals are computed first on integer-encoded profiles; breakdowns
+        and common lists are only built (and decoded) for returned rows.
+        
         Args:
             student: Student profile data
             alumni_list: List of alumni profiles
             top_n: Number of recommendations (None = all)
+            min_score: Drop alumni scoring below this
+            offset: Number of ranked rows to skip (pagination)
+            encoded_alumni: encode_alumni output for alumni_list, if cached
+            timings: Filled with seconds per stage (see rank_alumni, plus 'recommendations')
             
         Returns:
             List of recommendations sorted by score
         """
+        ranking = self.rank_alumni(student, alumni_list, top_n, min_score, offset, encoded_alumni, timings)
+        started_at = time.perf_counter()
+        recommendations = list(self.iter_recommendations(student, alumni_list, ranking))
+        if timings is not None:
+            timings['recommendations'] = time.perf_counter() - started_at
+        return recommendations
+    
+    def timed_recommendations(self, *args, **kwargs) -> Tuple[List[Dict], Dict[str, float]]:
+        """get_recommendations and its stage timings, returned together so they survive a process pool"""
+        timings = {}
+        return self.get_recommendations(*args, timings=timings, **kwargs), timings
+    
+    def iter_recommendations(self, student: Dict, alumni_list: List[Dict],
+                             ranking: Tuple[EncodedProfile, List[EncodedProfile], List[int]]) -> Iterator[Dict]:
+        """
+        Build recommendations lazily, in ranked order
         
-        recommendations = []
-        
-        for alumni in alumni_list:
-            score_data = self.calculate_hierarchical_score(student, alumni)
+        Args:
+            student: Student profile data
+            alumni_list: List of alumni profiles
+            ranking: Output of rank_alumni
             
-            recommendation = {
-                'alumni_id': alumni.get('userId'),
-                'alumni_name': alumni.get('name'),
-                'company': alumni.get('company'),
-                'industry': alumni.get('industry'),
-                'location': alumni.get('location'),
-                'skills': alumni.get('skills', []),
-                'interests': alumni.get('interests', []),
-                'mentoring_areas': alumni.get('mentoring_areas', []),
-                'availability': alumni.get('availability'),
-                'total_score': score_data['total_score'],
-                'score_breakdown': score_data['breakdown']
-            }
+        Yields:
+            Recommendation dictionaries
+        """
+        encoded_student, encoded_alumni, ranked = ranking
+        for i in ranked:
+            yield self.build_recommendation(student, alumni_list[i], encoded_student, encoded_alumni[i])
+    
+    def rank_alumni(self, student: Dict, alumni_list: List[Dict], top_n: int = None,
+                    min_score: float = None, offset: int = 0,
+                    encoded_alumni: Optional[List[EncodedProfile]] = None,
+                    timings: Optional[Dict[str, float]] = None) -> Tuple[EncodedProfile, List[EncodedProfile], List[int]]:
+        """
+        Rank alumni by total score without building recommendation dicts
+        
+        Args:
+            student: Student profile data
+            alumni_list: List of alumni profiles
+            top_n: Number of recommendations (None = all)
+            min_score: Drop alumni scoring below this
+            offset: Number of ranked rows to skip (pagination)
+            encoded_alumni: encode_alumni output for alumni_list, if cached
+            timings: Filled with seconds spent 'encoding', 'scoring' and 'sorting'
             
-            recommendations.append(recommendation)
+        Returns:
+            (encoded student, encoded alumni, ranked alumni indices)
+        """
+        started_at = time.perf_counter()
+        if encoded_alumni is None:
+            encoded_alumni = [encode_alumni(alumni) for alumni in alumni_list]
+        encoded_student = encode_student(student)
+        encoded_at = time.perf_counter()
+        
+        scores = [self._total_encoded(encoded_student, alumni) for alumni in encoded_alumni]
+        scored_at = time.perf_counter()
         
-        # Sort by total score (descending)
-        recommendations.sort(key=lambda x: x['total_score'], reverse=True)
+        ranked = range(len(alumni_list))
+        if min_score is not None:
+            ranked = [i for i in ranked if scores[i] >= min_score]
         
-        # Return top N
         if top_n:
-            return recommendations[:top_n]
+            # Bounded heap; index breaks ties like the stable sort below
+            ranked = heapq.nsmallest(offset + top_n, ranked, key=lambda i: (-scores[i], i))
+        else:
+            # Sort by total score (descending)
+            ranked = sorted(ranked, key=lambda i: scores[i], reverse=True)
+        
+        if timings is not None:
+            timings['encoding'] = encoded_at - started_at
+            timings['scoring'] = scored_at - encoded_at
+            timings['sorting'] = time.perf_counter() - scored_at
+        return encoded_student, encoded_alumni, list(ranked[offset:])
+    
+    def build_engine(self, alumni_list: List[Dict],
+                     encoded_alumni: Optional[List[EncodedProfile]] = None) -> SparseMatchEngine:
+        """
+        Encode an alumni corpus for vectorized scoring with these weights
+        
+        Args:
+            alumni_list: List of alumni profiles
+            encoded_alumni: encode_alumni output for alumni_list, if cached
+            
+        Returns:
+            SparseMatchEngine producing the same output as get_recommendations
+        """
+        return SparseMatchEngine(alumni_list, self.weights, encoded_alumni)
+    
+    def build_index(self, profiles: List[Dict], side: str = 'alumni') -> InvertedIndex:
+        """
+        Build an inverted index over a corpus with these weights
+        
+        Args:
+            profiles: List of alumni (or student) profiles
+            side: Profile kind indexed ("alumni" or "student")
+            
+        Returns:
+            InvertedIndex for exact pruned top-k queries
+        """
+        index = InvertedIndex(self.weights, side=side)
+        index.add_all(profiles)
+        return index
+    
+    def get_indexed_recommendations(self, student: Dict, index: InvertedIndex, top_n: int,
+                                    min_score: float = None, offset: int = 0) -> List[Dict]:
+        """
+        Top N recommendations from an inverted index
+        
+        Same output as get_recommendations over the indexed corpus, but
+        only alumni sharing a token with the student are scored.
+        
+        Args:
+            student: Student profile data
+            index: Alumni InvertedIndex
+            top_n: Number of recommendations
+            min_score: Drop alumni scoring below this
+            offset: Number of ranked rows to skip (pagination)
+            
+        Returns:
+            List of recommendations sorted by score
+        """
+        encoded_student = encode_student(student)
+        hits = index.top_k(encoded_terms(encoded_student, 'student'), offset + top_n, min_score)
+        return [
+            self.build_recommendation(student, index.profiles[slot], encoded_student, index.encoded[slot])
+            for slot, _ in hits[offset:]
+        ]
+    
+    def get_lsh_recommendations(self, student: Dict, index: LSHIndex, top_n: int = None,
+                                min_score: float = None, offset: int = 0) -> Tuple[Optional[List[Dict]], int]:
+        """
+        Approximate top N recommendations from MinHash LSH candidates
+        
+        Only alumni sharing an LSH bucket with the student are scored (exactly,
+        as get_recommendations does); ties go to corpus order among them.
+        
+        Args:
+            student: Student profile data
+            index: Alumni LSHIndex
+            top_n: Number of recommendations (None = all candidates)
+            min_score: Drop alumni scoring below this
+            offset: Number of ranked rows to skip (pagination)
+            
+        Returns:
+            (recommendations sorted by score, number of candidates scored);
+            recommendations are None when the student has no skills,
+            interests or mentoring wishes to bucket
+        """
+        candidates = index.candidates(encode_student(student))
+        if candidates is None:
+            return None, 0
+        alumni_list = [index.profiles[slot] for slot in candidates]
+        encoded_alumni = [index.encoded[slot] for slot in candidates]
+        ranking = self.rank_alumni(student, alumni_list, top_n, min_score, offset, encoded_alumni)
+        return list(self.iter_recommendations(student, alumni_list, ranking)), len(candidates)
+    
+    def get_indexed_students(self, alumni: Dict, index: InvertedIndex, top_n: int = None,
+                             min_score: float = None, offset: int = 0) -> List[Dict]:
+        """
+        Top N students for an alumnus from a student inverted index
+        
+        Scores are those of calculate_hierarchical_score(student, alumni);
+        only students sharing a token with the alumnus are scored, ties go
+        to student registry order.
+        
+        Args:
+            alumni: Alumni profile data
+            index: Student InvertedIndex (side="student")
+            top_n: Number of students (None = all)
+            min_score: Drop students scoring below this
+            offset: Number of ranked rows to skip (pagination)
+            
+        Returns:
+            List of student recommendations sorted by score
+        """
+        encoded_alumni = encode_alumni(alumni)
+        # The alumnus' availability bonus is the same for every student
+        bonus = static_score(encoded_alumni, self.weights)
+        k = offset + top_n if top_n else len(index)
+        hits = index.top_k(
+            encoded_terms(encoded_alumni, 'alumni'),
+            k,
+            min_score - bonus if min_score is not None else None
+        )
+        
+        recommendations = []
+        for slot, _ in hits[offset:]:
+            student = index.profiles[slot]
+            score_data = self.score_encoded(index.encoded[slot], encoded_alumni)
+            recommendations.append({
+                'student_id': student.get('userId'),
+                'student_name': student.get('name'),
+                'university': student.get('university'),
+                'degree': student.get('degree'),
+                'location': student.get('location'),
+                'total_score': score_data['total_score'],
+                'score_breakdown': score_data['breakdown']
+            })
         return recommendations
     
     def generate_explanation(self, student: Dict, alumni: Dict) -> str:
@@ -177,8 +429,19 @@ class GBHMMatcher:
             Explanation string
         """
         score_data = self.calculate_hierarchical_score(student, alumni)
-        breakdown = score_data['breakdown']
+        return self.explain_breakdown(score_data['breakdown'], alumni)
+    
+    def explain_breakdown(self, breakdown: Dict, alumni: Dict) -> str:
+        """
+        Explanation text from an already computed score breakdown
         
+        Args:
+            breakdown: Score breakdown (calculate_hierarchical_score or a recommendation)
+            alumni: Alumni profile (university and industry are read)
+            
+        Returns:
+            Explanation string
+        """
         reasons = []
         
         # University match
@@ -194,7 +457,7 @@ class GBHMMatcher:
             reasons.append(f"Similar degree background")
         
         # Skills
-        common_skills = breakdown.get('common_skills', [])
+        common_skills = breakdown['common_skills']
         if common_skills:
             skills_str = ', '.join(common_skills[:3])
             if len(common_skills) > 3:
@@ -202,19 +465,22 @@ class GBHMMatcher:
             reasons.append(f"Shared skills: {skills_str}")
         
         # Interests
-        common_interests = breakdown.get('common_interests', [])
-        if common_interests:
-            interests_str = ', '.join(common_interests[:2])
+        if breakdown['common_interests']:
+            interests_str = ', '.join(breakdown['common_interests'][:2])
             reasons.append(f"Common interests: {interests_str}")
         
         # Mentoring
-        matching_areas = breakdown.get('matching_areas', [])
-        if matching_areas:
-            areas_str = ', '.join(matching_areas[:2])
+        if breakdown['matching_areas']:
+            areas_str = ', '.join(breakdown['matching_areas'][:2])
             reasons.append(f"Can help with: {areas_str}")
         
+        # Skill graph bridges
+        if breakdown.get('bridged_skills'):
+            bridged_str = ', '.join(breakdown['bridged_skills'][:3])
+            reasons.append(f"Related skills: {bridged_str}")
+        
         # Availability
         if breakdown['availability'] > 0:
             reasons.append("Available for mentorship")
         
-        return " | ".join(reasons) if reasons else "General profile compatibility"
\ No newline at end of file
+        return " | ".join(reasons) if reasons else "General profile compatibility"
@@ -0,0 +1,315 @@
+"""
+Inverted index with upper-bound pruning for exact top-k GBHM matching
+Only profiles sharing at least one normalized token with the query are scored
+"""
+
+import bisect
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from python_service.vocabulary import UNKNOWN, EncodedProfile, encode_alumni, encode_student
+
+# Component -> weight key in GBHMMatcher.weights
+TERM_WEIGHTS = {
+    'university': 'university',
+    'industry': 'industry',
+    'degree': 'degree',
+    'skills': 'skill',
+    'interests': 'interest',
+    'mentoring': 'mentoring',
+    'company': 'company',
+}
+
+SCALAR_COMPONENTS = ('university', 'industry', 'degree')
+
+SET_COMPONENTS = ('skills', 'interests', 'mentoring')
+
+# Terms are (component, vocabulary ID)
+Term = Tuple[str, int]
+
+# Free (removed) slots tolerated before compact() renumbers, at any index size
+COMPACT_MIN_FREE = 1024
+
+
+def encoded_terms(encoded: EncodedProfile, side: str) -> Set[Term]:
+    """
+    Terms of an encoded profile
+
+    Two profiles of opposite sides share a term exactly when
+    calculate_hierarchical_score awards that component's weight for it.
+
+    Args:
+        encoded: Encoded student or alumni profile
+        side: "alumni" or "student"
+
+    Returns:
+        Set of terms
+    """
+    terms = set()
+
+    for component in SCALAR_COMPONENTS:
+        token_id = getattr(encoded, component)
+        if token_id != UNKNOWN:
+            terms.add((component, token_id))
+
+    for component in SET_COMPONENTS:
+        terms.update((component, token_id) for token_id in getattr(encoded, component))
+
+    # Company is None for alumni without one; students may hold UNKNOWN
+    if encoded.company is not None and encoded.company != UNKNOWN:
+        terms.add(('company', encoded.company))
+
+    return terms
+
+
+def encode_profile(profile: Dict, side: str) -> EncodedProfile:
+    """Encode a profile of either side, interning its tokens"""
+    if side == 'alumni':
+        return encode_alumni(profile)
+    return encode_student(profile, intern=True)
+
+
+def static_score(encoded: EncodedProfile, weights: Dict) -> float:
+    """Query-independent part of the score (alumni availability bonus)"""
+    return weights['availability'] if encoded.available else 0
+
+
+class InvertedIndex:
+    """Term -> postings index over one side of the matching graph"""
+
+    def __init__(self, weights: Dict, side: str = 'alumni'):
+        """
+        Initialize an empty index
+
+        Args:
+            weights: GBHM weights (GBHMMatcher.weights)
+            side: Profile kind indexed ("alumni" or "student")
+        """
+        self.weights = dict(weights)
+        self.side = side
+        self.postings: Dict[Term, Set[int]] = {}
+        self.profiles: Dict[int, Dict] = {}
+        self.encoded: Dict[int, EncodedProfile] = {}
+        self.slots: Dict[str, int] = {}
+        self._terms: Dict[int, Set[Term]] = {}
+        self._static: Dict[int, float] = {}
+        self._static_groups: Dict[float, List[int]] = {}
+        self._static_scores = np.zeros(64, dtype=np.float64)
+        self._posting_arrays: Dict[Term, np.ndarray] = {}
+        self._next_slot = 0
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def term_weight(self, term: Term) -> float:
+        """Score contributed by one shared term"""
+        return self.weights[TERM_WEIGHTS[term[0]]]
+
+    def add_all(self, profiles: Iterable[Dict]):
+        """Index profiles in order"""
+        for profile in profiles:
+            self.upsert(profile)
+
+    def upsert(self, profile: Dict):
+        """
+        Index a new profile or re-index a changed one in place
+
+        A changed profile keeps its slot, so tie order stays that of the
+        registry (insertion order).
+        """
+        profile_id = profile['userId']
+        slot = self.slots.get(profile_id)
+        if slot is None:
+            slot = self._next_slot
+            self._next_slot += 1
+            self.slots[profile_id] = slot
+            if slot >= len(self._static_scores):
+                self._static_scores = np.concatenate([self._static_scores, np.zeros_like(self._static_scores)])
+        else:
+            self._unindex(slot)
+
+        encoded = encode_profile(profile, self.side)
+        terms = encoded_terms(encoded, self.side)
+        for term in terms:
+            self.postings.setdefault(term, set()).add(slot)
+            self._posting_arrays.pop(term, None)
+
+        static = static_score(encoded, self.weights)
+        bisect.insort(self._static_groups.setdefault(static, []), slot)
+        self._static_scores[slot] = static
+
+        self.profiles[slot] = profile
+        self.encoded[slot] = encoded
+        self._terms[slot] = terms
+        self._static[slot] = static
+
+    def remove(self, profile_id: str) -> bool:
+        """
+        Drop a profile from the index
+
+        Returns:
+            False if the profile was not indexed
+        """
+        slot = self.slots.pop(profile_id, None)
+        if slot is None:
+            return False
+        self._unindex(slot)
+        del self.profiles[slot]
+        del self.encoded[slot]
+        if self._next_slot - len(self.profiles) > max(COMPACT_MIN_FREE, len(self.profiles)):
+            self.compact()
+        return True
+
+    def compact(self):
+        """
+        Renumber slots densely once removals leave more free slots than live ones
+
+        Slots keep their relative order, so tie order is unchanged; slots
+        handed out before compacting are invalid afterwards.
+        """
+        order = sorted(self.profiles)
+        renumber = {old: new for new, old in enumerate(order)}
+
+        self.profiles = {renumber[slot]: self.profiles[slot] for slot in order}
+        self.encoded = {renumber[slot]: self.encoded[slot] for slot in order}
+        self._terms = {renumber[slot]: self._terms[slot] for slot in order}
+        self._static = {renumber[slot]: self._static[slot] for slot in order}
+        self.slots = {profile_id: renumber[slot] for profile_id, slot in self.slots.items()}
+        self.postings = {term: {renumber[slot] for slot in posting} for term, posting in self.postings.items()}
+        self._static_groups = {
+            static: [renumber[slot] for slot in group] for static, group in self._static_groups.items()
+        }
+        self._posting_arrays = {}
+
+        self._next_slot = len(order)
+        self._static_scores = np.zeros(max(64, 1 << max(self._next_slot - 1, 0).bit_length()), dtype=np.float64)
+        for slot, static in self._static.items():
+            self._static_scores[slot] = static
+
+    def slot_for(self, profile_id: str) -> int:
+        """Slot of an indexed profile, or the slot it would get if upserted now"""
+        slot = self.slots.get(profile_id)
+        return self._next_slot if slot is None else slot
+
+    def static_groups(self) -> List[Tuple[float, List[int]]]:
+        """(static score, slots in order) for every static score present"""
+        return list(self._static_groups.items())
+
+    def apply(self, change):
+        """Apply a registry ProfileChange"""
+        if change.new is None:
+            self.remove(change.profile_id)
+        else:
+            self.upsert(change.new)
+
+    def _unindex(self, slot: int):
+        """Remove a slot from postings and static groups"""
+        for term in self._terms.pop(slot):
+            posting = self.postings[term]
+            posting.discard(slot)
+            self._posting_arrays.pop(term, None)
+            if not posting:
+                del self.postings[term]
+
+        static = self._static.pop(slot)
+        group = self._static_groups[static]
+        del group[bisect.bisect_left(group, slot)]
+        if not group:
+            del self._static_groups[static]
+
+    def _posting_array(self, term: Term) -> np.ndarray:
+        """Postings of a term as a slot array, cached until the term changes"""
+        array = self._posting_arrays.get(term)
+        if array is None:
+            posting = self.postings[term]
+            array = np.fromiter(posting, dtype=np.int64, count=len(posting))
+            self._posting_arrays[term] = array
+        return array
+
+    def score(self, query_terms: Set[Term], slot: int) -> float:
+        """Exact score of one indexed profile for a query"""
+        shared = query_terms & self._terms[slot]
+        return sum(self.term_weight(term) for term in shared) + self._static[slot]
+
+    def top_k(self, query_terms: Set[Term], k: int, min_score: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Exact top-k by term-at-a-time evaluation with MaxScore pruning
+
+        Terms are processed in descending weight, accumulating per slot and
+        tracking the slots their postings touch, so a query costs the
+        postings it reads, not the corpus size. Once the best score an
+        unseen profile could still reach is below the current k-th score
+        (or min_score), no new candidates are admitted: remaining postings
+        only add to surviving candidates, and those whose upper bound falls
+        below the k-th score are dropped.
+
+        Args:
+            query_terms: Terms of the query profile (opposite side)
+            k: Number of results
+            min_score: Drop profiles scoring below this
+
+        Returns:
+            (slot, score) pairs, highest score first, ties by slot
+        """
+        terms = sorted(
+            (term for term in query_terms if term in self.postings),
+            key=self.term_weight,
+            reverse=True
+        )
+        static_max = max(self._static_groups, default=0)
+        remaining = sum(self.term_weight(term) for term in terms)
+        floor = min_score if min_score is not None else float('-inf')
+
+        # Scratch arrays come from calloc, so only pages postings land on are
+        # touched; candidates lists the slots seen, so nothing scans them
+        size = self._next_slot
+        accumulators = np.zeros(size, dtype=np.float64)
+        seen = np.zeros(size, dtype=bool)
+        candidates = np.zeros(0, dtype=np.int64)
+        admitting = True
+
+        for term in terms:
+            weight = self.term_weight(term)
+            posting = self._posting_array(term)
+            remaining -= weight
+
+            # Dropped candidates may still accumulate; they are never read again
+            accumulators[posting] += weight
+            if admitting:
+                fresh = posting[~seen[posting]]
+                seen[fresh] = True
+                candidates = np.concatenate([candidates, fresh])
+
+            scores = accumulators[candidates] + self._static_scores[candidates]
+            threshold = floor
+            if len(candidates) >= k:
+                kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+                threshold = max(threshold, kth)
+
+            if admitting and remaining + static_max < threshold:
+                admitting = False
+
+            if not admitting:
+                candidates = candidates[scores + remaining >= threshold]
+
+        slots = candidates.tolist()
+        scores = (accumulators[candidates] + self._static_scores[candidates]).tolist()
+
+        if admitting:
+            # Profiles sharing no term still score their static part
+            for static_value in sorted(self._static_groups, reverse=True):
+                if static_value < floor:
+                    break
+                taken = 0
+                for slot in self._static_groups[static_value]:
+                    if not seen[slot]:
+                        slots.append(slot)
+                        scores.append(static_value)
+                        taken += 1
+                        if taken == k:
+                            break
+
+        results = [(slot, score) for slot, score in zip(slots, scores) if score >= floor]
+        return heapq.nsmallest(k, results, key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,299 @@
+"""
+Approximate candidate generation with MinHash LSH
+Alumni are bucketed by MinHash signatures of their combined skill, interest
+and mentoring tokens; only alumni colliding with the student are scored exactly
+
+Two token sets with Jaccard similarity s share at least one of b bands of
+r rows with probability 1 - (1 - s^r)^b: more bands raise recall (and the
+number of candidates), more rows per band make collisions stricter.
+
+Offline recall@k measurement against exact ranking:
+    python -m python_service.lsh --alumni alumni.json --students students.json \
+        --k 10 --config 32x2 --config 16x4
+"""
+
+import argparse
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from python_service.vocabulary import EncodedProfile, encode_alumni
+
+# Set components combined into one token set
+SET_COMPONENTS = ('skills', 'interests', 'mentoring')
+
+# Hash modulus; keys and coefficients stay below it, so a * key + b fits in int64
+PRIME = (1 << 31) - 1
+
+# Profiles hashed per block when signing a corpus
+SIGN_BLOCK = 2048
+
+
+def token_keys(encoded: EncodedProfile) -> np.ndarray:
+    """
+    Combined set tokens of an encoded profile
+
+    Keys are tagged with their component, so a skill only collides with the
+    same skill, as calculate_hierarchical_score compares them.
+    """
+    return np.array(sorted(
+        token_id * len(SET_COMPONENTS) + i
+        for i, component in enumerate(SET_COMPONENTS)
+        for token_id in getattr(encoded, component)
+    ), dtype=np.int64)
+
+
+class LSHIndex:
+    """MinHash LSH buckets over an alumni corpus"""
+
+    def __init__(self, bands: int, rows: int, seed: int = 1):
+        """
+        Initialize an empty index
+
+        Args:
+            bands: Number of bands (more = higher recall, more candidates)
+            rows: Signature rows per band (more = fewer, closer candidates)
+            seed: Seed of the hash coefficients
+        """
+        if bands < 1 or rows < 1:
+            raise ValueError("LSH bands and rows must be at least 1")
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, PRIME, size=bands * rows, dtype=np.int64)
+        self._b = rng.integers(0, PRIME, size=bands * rows, dtype=np.int64)
+        self.buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(bands)]
+        self.profiles: Dict[int, Dict] = {}
+        self.encoded: Dict[int, EncodedProfile] = {}
+        self.slots: Dict[str, int] = {}
+        self._keys: Dict[int, List[bytes]] = {}
+        self._next_slot = 0
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def signatures(self, key_sets: List[np.ndarray]) -> np.ndarray:
+        """
+        MinHash signatures of token key sets
+
+        Args:
+            key_sets: token_keys output per profile (all non-empty)
+
+        Returns:
+            (profiles x bands * rows) signature array
+        """
+        signatures = np.empty((len(key_sets), len(self._a)), dtype=np.int64)
+        for start in range(0, len(key_sets), SIGN_BLOCK):
+            block = key_sets[start:start + SIGN_BLOCK]
+            flat = np.concatenate(block)
+            offsets = np.zeros(len(block), dtype=np.int64)
+            np.cumsum([len(keys) for keys in block[:-1]], out=offsets[1:])
+            hashed = (flat[:, None] * self._a + self._b) % PRIME
+            signatures[start:start + len(block)] = np.minimum.reduceat(hashed, offsets, axis=0)
+        return signatures
+
+    def band_keys(self, signature: np.ndarray) -> List[bytes]:
+        """Bucket key of each band of one signature"""
+        return [band.tobytes() for band in signature.reshape(self.bands, self.rows)]
+
+    def add_all(self, profiles: Iterable[Dict], encoded_alumni: Optional[List[EncodedProfile]] = None):
+        """
+        Index profiles in order, signing them in blocks
+
+        Args:
+            profiles: Alumni profiles
+            encoded_alumni: encode_alumni output for profiles, if cached
+        """
+        profiles = list(profiles)
+        encoded = encoded_alumni if encoded_alumni is not None else [encode_alumni(p) for p in profiles]
+        keys = [token_keys(e) for e in encoded]
+        signed = [i for i, k in enumerate(keys) if len(k)]
+        signatures = self.signatures([keys[i] for i in signed]) if signed else None
+
+        band_keys = [[] for _ in profiles]
+        for j, i in enumerate(signed):
+            band_keys[i] = self.band_keys(signatures[j])
+        for profile, e, profile_keys in zip(profiles, encoded, band_keys):
+            self._insert(profile, e, profile_keys)
+
+    def upsert(self, profile: Dict):
+        """Index a new profile or re-bucket a changed one, keeping its slot"""
+        encoded = encode_alumni(profile)
+        keys = token_keys(encoded)
+        self._insert(profile, encoded, self.band_keys(self.signatures([keys])[0]) if len(keys) else [])
+
+    def _insert(self, profile: Dict, encoded: EncodedProfile, band_keys: List[bytes]):
+        profile_id = profile['userId']
+        slot = self.slots.get(profile_id)
+        if slot is None:
+            slot = self._next_slot
+            self._next_slot += 1
+            self.slots[profile_id] = slot
+        else:
+            self._unbucket(slot)
+
+        for band, key in enumerate(band_keys):
+            self.buckets[band].setdefault(key, set()).add(slot)
+        self.profiles[slot] = profile
+        self.encoded[slot] = encoded
+        self._keys[slot] = band_keys
+
+    def remove(self, profile_id: str) -> bool:
+        """
+        Drop a profile from the index
+
+        Returns:
+            False if the profile was not indexed
+        """
+        slot = self.slots.pop(profile_id, None)
+        if slot is None:
+            return False
+        self._unbucket(slot)
+        del self.profiles[slot]
+        del self.encoded[slot]
+        return True
+
+    def apply(self, change):
+        """Apply a registry ProfileChange"""
+        if change.new is None:
+            self.remove(change.profile_id)
+        else:
+            self.upsert(change.new)
+
+    def _unbucket(self, slot: int):
+        for band, key in enumerate(self._keys.pop(slot)):
+            bucket = self.buckets[band][key]
+            bucket.discard(slot)
+            if not bucket:
+                del self.buckets[band][key]
+
+    def candidates(self, encoded_student: EncodedProfile) -> Optional[List[int]]:
+        """
+        Slots of alumni sharing a bucket with the student, in slot order
+
+        Alumni without skills, interests or mentoring areas are never
+        candidates.
+
+        Returns:
+            None when the student has no set tokens to bucket
+        """
+        keys = token_keys(encoded_student)
+        if not len(keys):
+            return None
+        found = set()
+        for band, key in enumerate(self.band_keys(self.signatures([keys])[0])):
+            found.update(self.buckets[band].get(key, ()))
+        return sorted(found)
+
+
+def recall_at_k(exact: List[Dict], approximate: List[Dict], k: int) -> float:
+    """
+    Share of the exact top k the approximate top k recovers
+
+    An approximate match counts when it scores at least the exact k-th
+    score, so ties at the cut-off are not counted as misses.
+    """
+    exact = exact[:k]
+    if not exact:
+        return 1.0
+    cutoff = exact[-1]['total_score']
+    hits = sum(1 for rec in approximate[:k] if rec['total_score'] >= cutoff)
+    return min(hits, len(exact)) / len(exact)
+
+
+def measure_recall(matcher, alumni: List[Dict], students: List[Dict], k: int,
+                   configs: List[Tuple[int, int]]) -> List[Dict]:
+    """
+    Compare LSH candidate ranking with exact ranking
+
+    Args:
+        matcher: GBHMMatcher
+        alumni: Alumni profiles
+        students: Student profiles
+        k: Number of recommendations compared
+        configs: (bands, rows) pairs to measure
+
+    Returns:
+        Per config: bands, rows, recall@k, mean candidate share, build
+        time and mean exact/approximate latency (ms)
+    """
+    engine = matcher.build_engine(alumni)
+    exact, exact_ms = [], []
+    for student in students:
+        started_at = time.perf_counter()
+        exact.append(engine.get_recommendations(student, k))
+        exact_ms.append((time.perf_counter() - started_at) * 1000)
+
+    results = []
+    for bands, rows in configs:
+        started_at = time.perf_counter()
+        index = LSHIndex(bands, rows)
+        index.add_all(alumni)
+        build_ms = (time.perf_counter() - started_at) * 1000
+
+        recalls, shares, approximate_ms = [], [], []
+        for student, exact_recs in zip(students, exact):
+            started_at = time.perf_counter()
+            recs, scored = matcher.get_lsh_recommendations(student, index, k)
+            approximate_ms.append((time.perf_counter() - started_at) * 1000)
+            if recs is None:
+                continue
+            recalls.append(recall_at_k(exact_recs, recs, k))
+            shares.append(scored / max(len(index), 1))
+
+        results.append({
+            'bands': bands,
+            'rows': rows,
+            'recall_at_k': float(np.mean(recalls)) if recalls else None,
+            'candidate_share': float(np.mean(shares)) if shares else None,
+            'students_bucketed': len(recalls),
+            'build_ms': round(build_ms, 1),
+            'exact_ms': round(float(np.mean(exact_ms)), 3) if exact_ms else None,
+            'approximate_ms': round(float(np.mean(approximate_ms)), 3) if approximate_ms else None
+        })
+    return results
+
+
+def _config(value: str) -> Tuple[int, int]:
+    """Parse BANDSxROWS"""
+    try:
+        bands, rows = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected BANDSxROWS, got {value!r}")
+    return bands, rows
+
+
+def main():
+    """Command line entry point for offline recall@k measurement"""
+    from python_service.export import _load_profiles
+    from python_service.gbhm_matcher import GBHMMatcher
+
+    parser = argparse.ArgumentParser(description="Measure MinHash LSH recall@k against exact GBHM ranking")
+    parser.add_argument("--students", required=True, help="Student profiles (JSON array or NDJSON)")
+    parser.add_argument("--alumni", required=True, help="Alumni profiles (JSON array or NDJSON)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--config", type=_config, action="append", default=None,
+                        help="BANDSxROWS to measure (repeatable, default 32x2 16x4 8x8)")
+    args = parser.parse_args()
+
+    alumni = _load_profiles(args.alumni)
+    students = _load_profiles(args.students)
+
+    configs = args.config or [(32, 2), (16, 4), (8, 8)]
+    print(f"{len(students)} students x {len(alumni)} alumni, k={args.k}", flush=True)
+    print(f"{'config':>8} {'recall@k':>9} {'candidates':>11} {'build ms':>9} {'exact ms':>9} {'lsh ms':>8}")
+    for result in measure_recall(GBHMMatcher(), alumni, students, args.k, configs):
+        recall = result['recall_at_k']
+        share = result['candidate_share']
+        print(
+            f"{result['bands']:>4}x{result['rows']:<3} "
+            f"{recall if recall is not None else float('nan'):>9.3f} "
+            f"{share if share is not None else float('nan'):>10.1%} "
+            f"{result['build_ms']:>9.1f} {result['exact_ms']:>9.3f} {result['approximate_ms']:>8.3f}",
+            flush=True
+        )
+
+
+if __name__ == "__main__":
+    main()
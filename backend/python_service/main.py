@@ -3,20 +3,95 @@ FastAPI Server for Graph-Based Hierarchical Matching (GBHM) Algorithm
 Python-based matching service integrated with Node.js backend
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
+import os
+import threading
+import uuid
 from datetime import datetime
 import time
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 
+from python_service.batch import BatchPool, run_batch
+from python_service.cache import ResultCache, profile_fingerprint, profiles_fingerprint
+from python_service.coalesce import SingleFlight
+from python_service.columnar import columnar_recommendations, rank_columnar
+from python_service.config import config
+from python_service.delta import alumni_change_delta, student_change_delta
+from python_service.executor import DeadlineExceeded, ExecutorSaturated, MatchExecutor
+from python_service.export import export_match_table
 from python_service.gbhm_matcher import GBHMMatcher
+from python_service.inverted_index import InvertedIndex
+from python_service.lsh import LSHIndex
+from python_service.match_sink import MatchSink
+from python_service.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    CallbackMetric,
+    Counter,
+    Histogram,
+    MetricsMiddleware,
+    MetricsRegistry,
+    request_started
+)
+from python_service.mongo_sync import ALUMNI_FIELDS, STUDENT_FIELDS, MongoSync, SyncTarget, connect
+from python_service.profiling import Profiler, ProfilingBusy, ProfilingMiddleware, current_run
+from python_service.registry import ProfileRegistry
+from python_service.sharding import ShardedMatcher
+from python_service.skill_graph import SkillGraph, SkillGraphStore
+from python_service.snapshot import SnapshotStore
+from python_service.serialization import (
+    dumps,
+    loads,
+    match_payload,
+    matching_result_payload,
+    media_type,
+    render,
+    reverse_matching_result_payload,
+    wants_msgpack
+)
+from python_service.vocabulary import (
+    encode_alumni,
+    encode_student,
+    iter_with_vocabulary,
+    normalize_scalar,
+    run_transient,
+    transient_vocabulary,
+    vocabulary
+)
+from python_service.weights import DEFAULT_PROFILE, WeightProfile, load_weight_profiles
 from python_service.models import (
     StudentProfileData,
     AlumniProfileData,
     MatchRequest,
-    MatchResponse,
+    ColumnarMatchRequest,
     MatchingResult,
+    StudentMatchRequest,
+    AlumniMatchRequest,
+    ReverseMatchingResult,
+    EvaluateRequest,
+    EvaluationResult,
+    WeightProfilesResponse,
+    BatchMatchRequest,
+    ExplainManyRequest,
+    ExplainManyResult,
+    AlumniBulkLoadRequest,
+    RegistryResponse,
+    SnapshotResponse,
+    StudentBulkLoadRequest,
+    StudentRegistryResponse,
+    AlumniDeltaRequest,
+    StudentDeltaRequest,
+    PairChange,
+    DeltaResult,
+    ExportRequest,
+    ExportJobResponse,
+    MatchPersistRequest,
+    MatchPersistResponse,
+    ProfilingRequest,
     HealthResponse
 )
 from python_service.utils import (
@@ -25,7 +100,9 @@ from python_service.utils import (
     print_error,
     print_info,
     get_current_timestamp,
-    calculate_processing_time
+    calculate_processing_time,
+    encode_cursor,
+    decode_cursor
 )
 
 # Configure logging
@@ -35,8 +112,297 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize matcher
-matcher = GBHMMatcher()
+# Named weight profiles, compiled once; the default one drives the matcher
+weight_profiles = load_weight_profiles(config.WEIGHT_PROFILES)
+
+# Initialize matchers, one per weight profile
+profile_matchers = {name: GBHMMatcher(profile.weights) for name, profile in weight_profiles.items()}
+matcher = profile_matchers[DEFAULT_PROFILE]
+
+# Resident alumni and student corpora
+alumni_registry = ProfileRegistry("alumni", change_log_size=config.REGISTRY_CHANGE_LOG_SIZE)
+student_registry = ProfileRegistry("student", change_log_size=config.REGISTRY_CHANGE_LOG_SIZE)
+
+# Serialized registry match responses
+result_cache = ResultCache(
+    max_bytes=int(config.RESULT_CACHE_MAX_MB * 1024 * 1024),
+    ttl_seconds=config.RESULT_CACHE_TTL_SECONDS
+)
+
+# Pool running CPU-bound matching off the event loop
+match_executor = MatchExecutor(
+    kind=config.MATCH_EXECUTOR,
+    workers=config.MATCH_WORKERS,
+    queue_size=config.MATCH_QUEUE_SIZE
+)
+
+# In-flight /api/match and /api/explain computations shared by identical requests
+single_flight = SingleFlight(enabled=config.SINGLE_FLIGHT)
+
+# Prometheus metrics (/metrics); gauges are read from their sources at scrape time
+metrics = MetricsRegistry()
+request_count = metrics.register(Counter(
+    "gbhm_requests_total", "HTTP requests by endpoint, method and status", ("endpoint", "method", "status")
+))
+request_seconds = metrics.register(Histogram(
+    "gbhm_request_duration_seconds", "HTTP request latency by endpoint", ("endpoint",)
+))
+stage_seconds = metrics.register(Histogram(
+    "gbhm_stage_duration_seconds", "Latency of matching request stages", ("endpoint", "stage")
+))
+
+# Admin-started cProfile / sampling sessions and X-Profile requests
+profiler = Profiler(config.PROFILE_DIR, config.ADMIN_TOKEN)
+
+# Worker processes for /api/match/batch, shared by all requests
+batch_pool = BatchPool(config.BATCH_WORKERS) if config.BATCH_WORKERS > 1 else None
+
+# Shard processes for scatter-gather registry matching
+shard_matcher = ShardedMatcher(config.SHARD_COUNT, matcher.weights) if config.SHARD_COUNT > 1 else None
+
+# Skill co-occurrence graph for bridge scoring, swapped in by background rebuilds
+skill_graph_store = SkillGraphStore()
+
+# Memory-mapped alumni corpus snapshots shared by all workers
+snapshot_store = SnapshotStore(config.SNAPSHOT_DIR, keep=config.SNAPSHOT_KEEP) if config.SNAPSHOT_DIR else None
+snapshot_state = {"name": None, "corpus_version": None, "registry_version": 0, "skipped": None}
+
+# Mongo database (opened on first use), corpus sync (created at startup
+# when MONGO_SYNC is set) and Match collection writer (created on first use)
+mongo_database = None
+mongo_sync: Optional[MongoSync] = None
+match_sink: Optional[MatchSink] = None
+
+def build_encoded_alumni(profiles):
+    """(profile, encoding) by userId, in registry order"""
+    return {profile['userId']: (profile, encode_alumni(profile)) for profile in profiles}
+
+def apply_encoded_alumni(encoded, change):
+    """Keep build_encoded_alumni output current; dict order follows the registry's"""
+    if change.new is None:
+        encoded.pop(change.profile_id, None)
+    else:
+        encoded[change.profile_id] = (change.new, encode_alumni(change.new))
+
+def encoded_alumni_map():
+    """Integer-encoded registry alumni by userId, kept current from the change log"""
+    return alumni_registry.derive_incremental("encoded", build_encoded_alumni, apply_encoded_alumni)
+
+def build_alumni_engine(profiles):
+    """Build the sparse engine from cached registry encodings"""
+    encoded = encoded_alumni_map()
+    return matcher.build_engine(profiles, [encoded[profile['userId']][1] for profile in profiles])
+
+def build_alumni_lsh(profiles):
+    """MinHash LSH buckets over the registry alumni, from cached encodings"""
+    encoded = encoded_alumni_map()
+    index = LSHIndex(config.LSH_BANDS, config.LSH_ROWS)
+    index.add_all(profiles, [encoded[profile['userId']][1] for profile in profiles])
+    return index
+
+def build_student_index(profiles):
+    """Student-side inverted index"""
+    return matcher.build_index(profiles, side='student')
+
+def alumni_index_view():
+    """Read view of the alumni inverted index, kept current from the change log"""
+    return alumni_registry.view("index", matcher.build_index, InvertedIndex.apply)
+
+def student_index_view():
+    """Read view of the student inverted index, kept current from the change log"""
+    return student_registry.view("index", build_student_index, InvertedIndex.apply)
+
+def load_latest_snapshot() -> bool:
+    """
+    Swap the alumni registry to the current snapshot if it is newer than the loaded one
+    
+    The registry and its sparse engine are replaced together; requests
+    already holding a view keep the previous corpus until they finish.
+    Registry writes since this worker last loaded or wrote a snapshot are
+    replayed on top (see ProfileRegistry.restore). If the change log no
+    longer reaches back that far the snapshot is skipped rather than
+    rolling those writes back.
+    
+    Returns:
+        True if a snapshot was loaded
+    """
+    name = snapshot_store.current()
+    if name is None or name in (snapshot_state["name"], snapshot_state["skipped"]):
+        return False
+    
+    start_time = time.time()
+    replay_since = snapshot_state["registry_version"]
+    version = None
+    if alumni_registry.changes_since(replay_since) is not None:
+        snapshot = snapshot_store.load(name, matcher.weights)
+        version = alumni_registry.restore(snapshot.profiles, {"engine": snapshot.engine}, replay_since)
+    if version is None:
+        snapshot_state.update(skipped=name)
+        logger.warning(
+            f"Skipped alumni snapshot {name}: registry changes since version {replay_since} "
+            f"are no longer in the change log"
+        )
+        return False
+    snapshot_state.update(name=name, corpus_version=snapshot.corpus_version, registry_version=version)
+    
+    logger.info(
+        f"Loaded alumni snapshot {name} ({len(snapshot.profiles)} alumni) as registry version {version}, "
+        f"replayed up to version {alumni_registry.version}, "
+        f"in {calculate_processing_time(start_time, time.time()):.2f}ms"
+    )
+    return True
+
+async def watch_snapshots(interval: float):
+    """Poll the snapshot directory and swap in newer snapshots"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(load_latest_snapshot)
+        except Exception as error:
+            logger.error(f"Snapshot load error: {str(error)}")
+
+def build_skill_graph(force: bool = False) -> Optional[SkillGraph]:
+    """
+    Build the skill graph from both registries (None if they are unchanged since the last build)
+    
+    Alumni encodings come from the registry cache; students are interned so
+    tokens only students have still link alumni skills two hops apart.
+    """
+    versions = (alumni_registry.version, student_registry.version)
+    graph = skill_graph_store.graph
+    if not force and graph is not None and graph.source_versions == versions:
+        return None
+    
+    with alumni_registry.view("encoded", build_encoded_alumni, apply_encoded_alumni) as (alumni_version, encoded):
+        profiles = [encoding for _, encoding in encoded.values()]
+    student_version, students = student_registry.versioned_profiles()
+    profiles.extend(encode_student(student, intern=True) for student in students)
+    
+    return SkillGraph.build(
+        profiles,
+        len(vocabulary),
+        min_cooccurrence=config.SKILL_GRAPH_MIN_COOCCURRENCE,
+        neighbors=config.SKILL_GRAPH_NEIGHBORS,
+        decay=config.SKILL_GRAPH_DECAY,
+        source_versions=(alumni_version, student_version)
+    )
+
+def rebuild_skill_graph(force: bool = False) -> bool:
+    """Rebuild the skill graph and swap it in; False if unchanged or already rebuilding"""
+    start_time = time.time()
+    graph = skill_graph_store.rebuild(lambda: build_skill_graph(force))
+    if graph is None:
+        return False
+    stats = graph.stats()
+    logger.info(
+        f"Skill graph rebuilt from {stats['profiles']} profiles: {stats['tokens']} tokens, "
+        f"{stats['edges']} edges in {calculate_processing_time(start_time, time.time()):.2f}ms"
+    )
+    return True
+
+async def watch_skill_graph(interval: float):
+    """Rebuild the skill graph in the background whenever the registries changed"""
+    while True:
+        try:
+            await asyncio.to_thread(rebuild_skill_graph)
+        except Exception as error:
+            logger.error(f"Skill graph rebuild error: {str(error)}")
+        await asyncio.sleep(interval)
+
+def get_mongo_database():
+    """The configured Mongo database, shared by the corpus sync and the match sink"""
+    global mongo_database
+    if mongo_database is None:
+        mongo_database = connect(config.MONGODB_URI, config.DB_NAME)
+    return mongo_database
+
+def observe_validation(endpoint: str):
+    """Observe the time from arrival to handler entry: body read, JSON parsing and model validation"""
+    started_at = request_started.get()
+    if started_at is not None:
+        stage_seconds.observe(time.perf_counter() - started_at, endpoint, "validation")
+
+def observe_stages(endpoint: str, timings: Dict[str, float], queue: Optional[Dict] = None):
+    """Observe stage timings reported by the matcher, plus the executor queue wait"""
+    for stage, seconds in timings.items():
+        stage_seconds.observe(seconds, endpoint, stage)
+    if queue and queue.get("queue_wait_ms") is not None:
+        stage_seconds.observe(queue["queue_wait_ms"] / 1000, endpoint, "queue_wait")
+
+def register_state_metrics():
+    """Corpus, cache, executor and coalescing state, read at scrape time"""
+    registries = (("alumni", alumni_registry), ("student", student_registry))
+    metrics.register(CallbackMetric(
+        "gbhm_registry_profiles", "Profiles resident in each registry", "gauge",
+        lambda: [((name, ), len(registry)) for name, registry in registries], ("registry",)
+    ))
+    metrics.register(CallbackMetric(
+        "gbhm_registry_version", "Corpus version of each registry", "gauge",
+        lambda: [((name, ), registry.version) for name, registry in registries], ("registry",)
+    ))
+    metrics.register(CallbackMetric(
+        "gbhm_result_cache_entries", "Cached match responses", "gauge",
+        lambda: [((), len(result_cache))]
+    ))
+    metrics.register(CallbackMetric(
+        "gbhm_result_cache_bytes", "Bytes of cached match responses", "gauge",
+        lambda: [((), result_cache.stats()['bytes'])]
+    ))
+    metrics.register(CallbackMetric(
+        "gbhm_result_cache_lookups_total", "Result cache lookups by outcome", "counter",
+        lambda: [(("hit", ), result_cache.hits), (("miss", ), result_cache.misses)], ("result",)
+    ))
+    metrics.register(CallbackMetric(
+        "gbhm_result_cache_removals_total", "Result cache entries removed by reason", "counter",
+        lambda: [
+            (("evicted", ), result_cache.evictions),
+            (("expired", ), result_cache.expirations),
+            (("invalidated", ), result_cache.invalidations)
+        ],
+        ("reason",)
+    ))
+    metrics.register(CallbackMetric(
+        "gbhm_executor_queue_depth", "Matching requests waiting for a worker", "gauge",
+        lambda: [((), match_executor.queue_depth)]
+    ))
+    metrics.register(CallbackMetric(
+        "gbhm_executor_pending", "Matching requests queued or running", "gauge",
+        lambda: [((), match_executor.stats()['pending'])]
+    ))
+    metrics.register(CallbackMetric(
+        "gbhm_executor_rejections_total", "Matching requests rejected (429) or past their deadline (503)", "counter",
+        lambda: [(("saturated", ), match_executor.rejected), (("deadline", ), match_executor.expired)], ("reason",)
+    ))
+    metrics.register(CallbackMetric(
+        "gbhm_single_flight_requests_total", "Coalescable requests by whether they computed or joined", "counter",
+        lambda: [(("computed", ), single_flight.leaders), (("coalesced", ), single_flight.coalesced)], ("outcome",)
+    ))
+
+register_state_metrics()
+
+def create_mongo_sync() -> MongoSync:
+    """Mirror the configured profile collections into both registries"""
+    return MongoSync(
+        get_mongo_database(),
+        [
+            SyncTarget(config.MONGO_ALUMNI_COLLECTION, alumni_registry, AlumniProfileData, ALUMNI_FIELDS),
+            SyncTarget(config.MONGO_STUDENT_COLLECTION, student_registry, StudentProfileData, STUDENT_FIELDS)
+        ],
+        batch_size=config.MONGO_BATCH_SIZE,
+        poll_seconds=config.MONGO_POLL_SECONDS,
+        change_streams=config.MONGO_CHANGE_STREAMS
+    )
+
+async def start_mongo_sync(sync: MongoSync, stop):
+    """Load both registries from Mongo, then follow changes on a thread until stop is set"""
+    start_time = time.time()
+    await asyncio.to_thread(sync.open_stream)
+    loaded = await asyncio.to_thread(sync.load)
+    logger.info(
+        f"Loaded {sum(loaded.values())} profiles from Mongo in "
+        f"{calculate_processing_time(start_time, time.time()):.2f}ms"
+    )
+    return asyncio.create_task(asyncio.to_thread(sync.follow, stop))
 
 # ============ LIFESPAN EVENTS ============
 
@@ -45,18 +411,54 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events
     """
+    global mongo_sync
     # Startup
     logger.info("=" * 60)
     logger.info("GBHM MATCHING SERVICE STARTING")
     logger.info("=" * 60)
     logger.info("✓ FastAPI server initialized")
     logger.info("✓ GBHM matcher initialized")
+    
+    snapshot_watcher = None
+    if snapshot_store is not None:
+        try:
+            load_latest_snapshot()
+        except Exception as error:
+            logger.error(f"Snapshot load error: {str(error)}")
+        if config.SNAPSHOT_POLL_SECONDS > 0:
+            snapshot_watcher = asyncio.create_task(watch_snapshots(config.SNAPSHOT_POLL_SECONDS))
+    
+    mongo_follower = None
+    mongo_stop = threading.Event()
+    if config.MONGO_SYNC:
+        try:
+            mongo_sync = create_mongo_sync()
+            mongo_follower = await start_mongo_sync(mongo_sync, mongo_stop)
+        except Exception as error:
+            logger.error(f"Mongo sync error: {str(error)}")
+    
+    skill_graph_watcher = None
+    if config.SKILL_GRAPH_REBUILD_SECONDS > 0 and any(p.weights['bridge'] for p in weight_profiles.values()):
+        skill_graph_watcher = asyncio.create_task(watch_skill_graph(config.SKILL_GRAPH_REBUILD_SECONDS))
+    
     logger.info("✓ Ready to accept matching requests")
     logger.info("=" * 60)
     
     yield
     
     # Shutdown
+    if snapshot_watcher is not None:
+        snapshot_watcher.cancel()
+    if skill_graph_watcher is not None:
+        skill_graph_watcher.cancel()
+    mongo_stop.set()
+    if mongo_follower is not None:
+        await mongo_follower
+    match_executor.shutdown()
+    if batch_pool is not None:
+        batch_pool.shutdown()
+    if shard_matcher is not None:
+        shard_matcher.shutdown()
     logger.info("=" * 60)
     logger.info("GBHM Matching Service shutting down")
     logger.info("=" * 60)
@@ -80,6 +482,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+# Outermost, so request latency includes CORS handling
+app.add_middleware(MetricsMiddleware, requests=request_count, duration=request_seconds)
+
 # ============ API ENDPOINTS ============
 
 @app.get("/health")
@@ -107,13 +514,224 @@ async def root():
         "endpoints": {
             "health": "/health",
             "match": "/api/match",
+            "match_columnar": "/api/match/columnar",
+            "match_student": "/api/match/student",
+            "match_student_persist": "/api/match/student/persist",
             "match_batch": "/api/match/batch",
-            "explain": "/api/explain"
+            "match_alumni": "/api/match/alumni",
+            "match_export": "/api/match/export",
+            "match_delta": "/api/match/delta",
+            "explain": "/api/explain",
+            "explain_batch": "/api/explain/batch",
+            "match_evaluate": "/api/match/evaluate",
+            "weights": "/api/weights",
+            "skill_graph": "/api/skill-graph",
+            "sync": "/api/sync",
+            "alumni": "/api/alumni",
+            "alumni_snapshot": "/api/alumni/snapshot",
+            "students": "/api/students",
+            "cache": "/api/cache",
+            "metrics": "/metrics",
+            "admin_profiling": "/api/admin/profiling"
         }
     }
 
+def resolve_weight_profile(name: Optional[str]) -> WeightProfile:
+    """Look up a request's weight profile (None = default), rejecting unknown names with 400"""
+    profile = weight_profiles.get(name or DEFAULT_PROFILE)
+    if profile is None:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "message": f"Unknown weight profile: {name}",
+                "profiles": sorted(weight_profiles)
+            }
+        )
+    return profile
+
+def request_offset(cursor) -> int:
+    """Decode a request cursor, rejecting malformed ones with 400"""
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def dispatch(fn, *args, deadline_ms: int = None, in_process: bool = False):
+    """
+    Run matching work on the executor, mapping admission failures to HTTP errors
+    
+    Args:
+        fn: Function to run
+        args: Arguments for fn
+        deadline_ms: Request deadline (defaults to MATCH_DEADLINE_MS)
+        in_process: Allow the process pool (fn and args must be picklable)
+        
+    Returns:
+        (fn result, queue metadata)
+    """
+    run = current_run.get()
+    if run is not None:
+        # Profiled requests run on a thread, where the profilers see the matching work
+        fn, in_process = run.wrap(fn), False
+    try:
+        return await match_executor.run(
+            fn,
+            *args,
+            deadline_ms=deadline_ms or config.MATCH_DEADLINE_MS,
+            in_process=in_process
+        )
+    except ExecutorSaturated:
+        logger.warning("Matching request rejected, %d requests queued", match_executor.queue_depth)
+        raise HTTPException(
+            status_code=429,
+            detail="Matching service is saturated, retry later",
+            headers={"Retry-After": "1"}
+        )
+    except DeadlineExceeded:
+        raise HTTPException(
+            status_code=503,
+            detail="Matching deadline exceeded"
+        )
+
+def coalesced_headers(shared: bool) -> Optional[Dict[str, str]]:
+    """Response headers marking a response shared with an identical in-flight request"""
+    return {"X-Coalesced": "true"} if shared else None
+
+def page_limit(top_n) -> int:
+    """Rows to fetch for a page: one extra tells whether another page exists"""
+    return top_n + 1 if top_n else None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    """Whether the client asked for the streaming NDJSON format"""
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+def add_explanation(rec: Dict, student: Dict) -> Dict:
+    """
+    Explain a recommendation from its breakdown, without rescoring
+    
+    Recommendations do not carry the alumnus' university; it is only named
+    when it matched, so the student's is shown.
+    """
+    alumni = dict(rec, university=student.get('university'))
+    rec['explanation'] = matcher.explain_breakdown(rec['score_breakdown'], alumni)
+    return rec
+
+def rank_transient(rank, *args):
+    """
+    Rank a request's own alumni in a request-local vocabulary (runs on the match executor)
+    
+    Returns:
+        (vocabulary the ranking's token IDs belong to, rank output); iterate
+        recommendations with iter_with_vocabulary so they decode against it
+    """
+    with transient_vocabulary() as scoped:
+        return scoped, rank(*args)
+
+def stream_matches(recommendations: Iterable[Dict], total_alumni: int, start_time: float,
+                   corpus_version: int = None, top_n: int = None, offset: int = 0,
+                   queue: dict = None, explain: Optional[Dict] = None) -> Iterator[bytes]:
+    """
+    Stream recommendations as NDJSON, one match per line, then a trailer
+    
+    Matches are serialized as they are built, so the first line is sent
+    before the last recommendation exists. The trailer line has
+    "trailer": true and carries the MatchingResult metadata; a failure
+    mid-stream ends with a trailer whose success is false.
+    
+    Args:
+        recommendations: Recommendations in ranked order (fetched with page_limit)
+        total_alumni: Number of alumni scored
+        start_time: Request start time (time.time())
+        corpus_version: Registry version the alumni were taken from
+        top_n: Page size
+        offset: Ranked offset of the first recommendation
+        queue: Executor metadata (queue_depth, queue_wait_ms, shards, candidates)
+        explain: Student to explain each streamed match for (None = no explanation text)
+    """
+    count = 0
+    next_cursor = None
+    trailer = {"trailer": True, "success": True, "message": "Matching completed successfully"}
+    
+    try:
+        for rec in recommendations:
+            if top_n and count == top_n:
+                next_cursor = encode_cursor(offset + top_n)
+                break
+            if explain is not None:
+                add_explanation(rec, explain)
+            yield dumps(match_payload(rec)) + b"\n"
+            count += 1
+    except Exception as error:
+        logger.error(f"Streaming matching error: {str(error)}")
+        trailer.update(success=False, message="Matching algorithm failed", error=str(error))
+    
+    processing_time = calculate_processing_time(start_time, time.time())
+    logger.info("Streamed %d recommendations in %.2fms", count, processing_time)
+    
+    trailer.update(
+        match_count=count,
+        timestamp=get_current_timestamp(),
+        total_alumni=total_alumni,
+        processing_time_ms=processing_time,
+        corpus_version=corpus_version,
+        next_cursor=next_cursor,
+        **(queue or {})
+    )
+    yield dumps(trailer) + b"\n"
+
+def build_matching_result(recommendations, total_alumni: int, start_time: float, corpus_version: int = None,
+                          top_n: int = None, offset: int = 0, queue: dict = None,
+                          explain: Optional[Dict] = None) -> Dict:
+    """
+    Wrap matcher recommendations into the MatchingResult payload
+    
+    The payload is built straight from the recommendation dicts, skipping
+    MatchResponse/MatchingResult construction and validation; render()
+    serializes it to the same JSON bytes the models would produce.
+    
+    Args:
+        recommendations: Output of GBHMMatcher.get_recommendations
+        total_alumni: Number of alumni scored
+        start_time: Request start time (time.time())
+        corpus_version: Registry version the alumni were taken from
+        top_n: Page size the recommendations were fetched with (page_limit)
+        offset: Ranked offset of the first recommendation
+        queue: Executor metadata (queue_depth, queue_wait_ms, shards, candidates)
+        explain: Student to explain the returned matches for (None = no explanation text)
+        
+    Returns:
+        MatchingResult-shaped dict
+    """
+    next_cursor = None
+    if top_n and len(recommendations) > top_n:
+        recommendations = recommendations[:top_n]
+        next_cursor = encode_cursor(offset + top_n)
+    
+    if explain is not None:
+        for rec in recommendations:
+            add_explanation(rec, explain)
+    
+    processing_time = calculate_processing_time(start_time, time.time())
+    
+    logger.info("Matching completed in %.2fms", processing_time)
+    logger.info("Generated %d recommendations", len(recommendations))
+    
+    return matching_result_payload(
+        recommendations,
+        message="Matching completed successfully",
+        timestamp=get_current_timestamp(),
+        total_alumni=total_alumni,
+        processing_time_ms=processing_time,
+        corpus_version=corpus_version,
+        next_cursor=next_cursor,
+        **(queue or {})
+    )
+
 @app.post("/api/match", response_model=MatchingResult)
-async def run_matching(request: MatchRequest):
+async def run_matching(request: MatchRequest, accept: Optional[str] = Header(default=None)):
     """
     Run matching algorithm for a student against multiple alumni
     
@@ -147,48 +765,221 @@ async def run_matching(request: MatchRequest):
             }
         ]
     }
+    
+    Optional paging fields: top_n, min_score and cursor (next_cursor from the
+    previous page). weight_profile names a configured weight profile (see
+    /api/weights); the default profile is used otherwise.
+    
+    With Accept: application/x-ndjson the matches are streamed one per line
+    in ranked order, followed by a trailer record (see stream_matches).
+    Accept: application/x-msgpack returns the same payload as msgpack.
+    
+    Identical requests arriving while one is being computed (same
+    normalized student, alumni, paging, weights and format) wait for it and
+    return its response with X-Coalesced: true; streamed responses are not
+    shared.
     """
     
+    observe_validation("/api/match")
+    offset = request_offset(request.cursor)
+    profile = resolve_weight_profile(request.weight_profile)
+    request_matcher = profile_matchers[profile.name]
+    
     try:
         start_time = time.time()
         
-        logger.info(f"Matching request for student: {request.student.name}")
-        logger.info(f"Against {len(request.alumni_list)} alumni profiles")
+        logger.info("Matching request for student: %s", request.student.name)
+        logger.info("Against %d alumni profiles", len(request.alumni_list))
         
-        # Run matching algorithm
-        recommendations = matcher.get_recommendations(
-            student=request.student.dict(),
-            alumni_list=[alumni.dict() for alumni in request.alumni_list]
-        )
+        with stage_seconds.time("/api/match", "to_dict"):
+            student = request.student.dict()
+            alumni_list = [alumni.dict() for alumni in request.alumni_list]
         
-        # Format response
-        matches = []
-        for rec in recommendations:
-            match = MatchResponse(
-                alumni_id=rec['alumni_id'],
-                alumni_name=rec['alumni_name'],
-                total_score=rec['total_score'],
-                score_breakdown=rec['score_breakdown'],
-                common_skills=rec['score_breakdown'].get('common_skills', []),
-                common_interests=rec['score_breakdown'].get('common_interests', []),
-                matching_areas=rec['score_breakdown'].get('matching_areas', [])
+        if wants_ndjson(accept):
+            # Rank on the executor; dicts are built while streaming (on a thread)
+            (scoped, ranking), queue = await dispatch(
+                rank_transient,
+                request_matcher.rank_alumni,
+                student,
+                alumni_list,
+                page_limit(request.top_n),
+                request.min_score,
+                offset,
+                deadline_ms=request.deadline_ms
+            )
+            return StreamingResponse(
+                stream_matches(
+                    iter_with_vocabulary(scoped, request_matcher.iter_recommendations(student, alumni_list, ranking)),
+                    total_alumni=len(alumni_list),
+                    start_time=start_time,
+                    top_n=request.top_n,
+                    offset=offset,
+                    queue=queue,
+                    explain=student if request.include_explanations else None
+                ),
+                media_type=NDJSON_MEDIA_TYPE
             )
-            matches.append(match)
         
-        processing_time = calculate_processing_time(start_time, time.time())
+        async def compute() -> bytes:
+            # Run matching algorithm
+            (recommendations, timings), queue = await dispatch(
+                run_transient,
+                request_matcher.timed_recommendations,
+                student,
+                alumni_list,
+                page_limit(request.top_n),
+                request.min_score,
+                offset,
+                deadline_ms=request.deadline_ms,
+                in_process=True
+            )
+            observe_stages("/api/match", timings, queue)
+            with stage_seconds.time("/api/match", "response_build"):
+                payload = build_matching_result(
+                    recommendations,
+                    total_alumni=len(request.alumni_list),
+                    start_time=start_time,
+                    top_n=request.top_n,
+                    offset=offset,
+                    queue=queue,
+                    explain=student if request.include_explanations else None
+                )
+            with stage_seconds.time("/api/match", "serialization"):
+                return render(payload, accept).body
         
-        logger.info(f"Matching completed in {processing_time:.2f}ms")
-        logger.info(f"Generated {len(matches)} recommendations")
+        with stage_seconds.time("/api/match", "fingerprint"):
+            key = (
+                "match", profile_fingerprint(student), profiles_fingerprint(alumni_list), request.top_n,
+                request.min_score, offset, profile.fingerprint, request.include_explanations, media_type(accept)
+            )
+        body, shared = await single_flight.run(key, compute)
+        return Response(content=body, media_type=media_type(accept), headers=coalesced_headers(shared))
         
-        return MatchingResult(
-            success=True,
-            message="Matching completed successfully",
-            matches=matches,
-            timestamp=get_current_timestamp(),
-            total_alumni=len(request.alumni_list),
-            processing_time_ms=processing_time
+    except HTTPException:
+        raise
+    except Exception as error:
+        logger.error(f"Matching error: {str(error)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Matching algorithm failed",
+                "error": str(error)
+            }
+        )
+
+@app.post("/api/match/columnar", response_model=MatchingResult)
+async def run_columnar_matching(http_request: Request, accept: Optional[str] = Header(default=None)):
+    """
+    Run matching against an alumni corpus sent in columnar form
+    
+    Same as /api/match, but alumni_list is replaced by "alumni": column
+    arrays over a shared string dictionary (see python_service.columnar).
+    Alumni are decoded straight into encoded profiles, skipping one
+    AlumniProfileData validation per alumnus. The body may be JSON or, with
+    Content-Type: application/x-msgpack, msgpack.
+    
+    Request body:
+    {
+        "student": {...},
+        "alumni": {
+            "strings": ["MIT", "B.Tech", "Technology", "Python", "Google", "Available"],
+            "id": ["alumni_id"],
+            "userId": ["alumni_user_id"],
+            "name": ["Alumni Name"],
+            "university": [0],
+            "degree": [1],
+            "industry": [2],
+            "skills": [[3]],
+            "company": [4],
+            "availability": [5]
+        },
+        "top_n": 10
+    }
+    """
+    
+    try:
+        body = loads(await http_request.body(), http_request.headers.get("content-type"))
+        request = ColumnarMatchRequest(**body)
+    except (TypeError, ValueError) as error:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "success": False,
+                "message": "Invalid columnar match request",
+                "error": str(error)
+            }
+        )
+    
+    offset = request_offset(request.cursor)
+    request_matcher = profile_matchers[resolve_weight_profile(request.weight_profile).name]
+    
+    try:
+        start_time = time.time()
+        
+        logger.info("Columnar matching request for student: %s", request.student.name)
+        
+        student = request.student.dict()
+        
+        if wants_ndjson(accept):
+            (scoped, (alumni, ranking)), queue = await dispatch(
+                rank_transient,
+                rank_columnar,
+                request_matcher,
+                student,
+                request.alumni,
+                page_limit(request.top_n),
+                request.min_score,
+                offset,
+                deadline_ms=request.deadline_ms
+            )
+            return StreamingResponse(
+                stream_matches(
+                    iter_with_vocabulary(scoped, request_matcher.iter_recommendations(student, alumni, ranking)),
+                    total_alumni=len(alumni),
+                    start_time=start_time,
+                    top_n=request.top_n,
+                    offset=offset,
+                    queue=queue,
+                    explain=student if request.include_explanations else None
+                ),
+                media_type=NDJSON_MEDIA_TYPE
+            )
+        
+        (total_alumni, recommendations), queue = await dispatch(
+            run_transient,
+            columnar_recommendations,
+            request_matcher,
+            student,
+            request.alumni,
+            page_limit(request.top_n),
+            request.min_score,
+            offset,
+            deadline_ms=request.deadline_ms,
+            in_process=True
         )
         
+        return render(build_matching_result(
+            recommendations,
+            total_alumni=total_alumni,
+            start_time=start_time,
+            top_n=request.top_n,
+            offset=offset,
+            queue=queue,
+            explain=student if request.include_explanations else None
+        ), accept)
+        
+    except HTTPException:
+        raise
+    except ValueError as error:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "message": "Invalid alumni columns",
+                "error": str(error)
+            }
+        )
     except Exception as error:
         logger.error(f"Matching error: {str(error)}")
         raise HTTPException(
@@ -200,106 +991,1366 @@ async def run_matching(request: MatchRequest):
             }
         )
 
-@app.post("/api/match/batch")
-async def batch_matching(requests: list):
+def registry_cache_key(fingerprint: str, corpus_version: int, request: StudentMatchRequest, offset: int,
+                       profile: WeightProfile, graph_version: int, binary: bool = False) -> tuple:
+    """Result cache key of a registry match request (binary = msgpack body)"""
+    return (
+        fingerprint,
+        corpus_version,
+        profile.fingerprint,
+        graph_version if profile.weights['bridge'] else None,
+        request.top_n,
+        request.min_score,
+        offset,
+        request.include_explanations,
+        request.approximate,
+        binary
+    )
+
+def student_reach(student, profiles, graph: Optional[SkillGraph]):
+    """Skill graph reach of a student, if a graph is built and any profile bridges"""
+    if graph is None or not any(profile.weights['bridge'] for profile in profiles):
+        return None
+    return graph.reach(encode_student(student))
+
+def registry_recommendations(student, top_n, min_score, offset, profile: WeightProfile,
+                             approximate: bool = False, graph: Optional[SkillGraph] = None):
     """
-    Run matching for multiple students in batch
+    Rank resident alumni for a student (runs on the match executor)
+    
+    Approximate requests score only MinHash LSH candidates; students with
+    nothing to bucket (no skills, interests or mentoring wishes) are
+    ranked exactly. Profiles with a bridge weight rank on the sparse
+    engine (or shards), adding the student's reach in the skill graph.
+    
+    Returns:
+        (recommendations, number of alumni in the corpus, corpus version,
+         extra MatchingResult fields: shard timings or LSH candidate count)
+    """
+    reach = student_reach(student, [profile], graph)
+    
+    if approximate and reach is None:
+        with alumni_registry.view("lsh", build_alumni_lsh, LSHIndex.apply) as (version, index):
+            recommendations, candidates = profile_matchers[profile.name].get_lsh_recommendations(
+                student, index, top_n, min_score, offset
+            )
+            if recommendations is not None:
+                return recommendations, len(index), version, {"candidates": candidates}
+    
+    if shard_matcher is not None:
+        recommendations, total_alumni, version, shards = shard_matcher.get_recommendations(
+            alumni_registry, student, top_n, min_score, offset, profile, reach
+        )
+        return recommendations, total_alumni, version, {"shards": shards}
+    
+    # The index prunes with the default weights; other profiles rank on the engine
+    if config.MATCH_ENGINE == "index" and top_n and profile.name == DEFAULT_PROFILE and reach is None:
+        with alumni_index_view() as (version, index):
+            recommendations = matcher.get_indexed_recommendations(student, index, top_n, min_score, offset)
+            return recommendations, len(index), version, None
+    
+    if config.MATCH_ENGINE in ("index", "sparse") or reach is not None:
+        with alumni_registry.view("engine", build_alumni_engine) as (version, engine):
+            recommendations = engine.get_recommendations(student, top_n, min_score, offset, profile, reach)
+            return recommendations, len(engine), version, None
+    
+    with alumni_registry.view("encoded", build_encoded_alumni, apply_encoded_alumni) as (version, encoded):
+        entries = list(encoded.values())
+    recommendations = profile_matchers[profile.name].get_recommendations(
+        student=student,
+        alumni_list=[profile for profile, _ in entries],
+        top_n=top_n,
+        min_score=min_score,
+        offset=offset,
+        encoded_alumni=[encoding for _, encoding in entries]
+    )
+    return recommendations, len(entries), version, None
+
+@app.post("/api/match/student", response_model=MatchingResult)
+async def run_student_matching(request: StudentMatchRequest, accept: Optional[str] = Header(default=None)):
+    """
+    Run matching for a student against the resident alumni registry
+    
+    Only the student profile is sent; alumni are loaded beforehand through
+    the /api/alumni endpoints.
+    
+    Responses are cached by normalized student profile, corpus version,
+    weights and paging parameters; a cache hit returns the stored bytes
+    (including the original timestamp and processing_time_ms) with
+    X-Cache: hit.
+    
+    With "approximate": true only alumni sharing a MinHash LSH bucket with
+    the student are scored (see python_service.lsh and LSH_BANDS/LSH_ROWS);
+    "candidates" reports how many.
     
-    Returns list of matching results
+    With Accept: application/x-ndjson the matches are streamed one per line
+    followed by a trailer record (see stream_matches); streamed responses
+    bypass the cache. Accept: application/x-msgpack returns the same payload
+    as msgpack.
     """
     
+    observe_validation("/api/match/student")
+    offset = request_offset(request.cursor)
+    profile = resolve_weight_profile(request.weight_profile)
+    graph_version, graph = skill_graph_store.current
+    
     try:
-        results = []
+        start_time = time.time()
+        
+        with stage_seconds.time("/api/match/student", "to_dict"):
+            student = request.student.dict()
+        
+        streaming = wants_ndjson(accept)
+        binary = wants_msgpack(accept)
+        
+        fingerprint = None
+        if result_cache.enabled and not streaming:
+            fingerprint = profile_fingerprint(student)
+            body = result_cache.get(registry_cache_key(
+                fingerprint, alumni_registry.version, request, offset, profile, graph_version, binary
+            ))
+            if body is not None:
+                return Response(content=body, media_type=media_type(accept), headers={"X-Cache": "hit"})
+        
+        logger.info("Registry matching request for student: %s", request.student.name)
+        
+        ranking_started_at = time.perf_counter()
+        (recommendations, total_alumni, corpus_version, extra), queue = await dispatch(
+            registry_recommendations,
+            student,
+            page_limit(request.top_n),
+            request.min_score,
+            offset,
+            profile,
+            request.approximate,
+            graph,
+            deadline_ms=request.deadline_ms
+        )
         
-        for req in requests:
-            # Convert to MatchRequest
-            match_req = MatchRequest(
-                student=StudentProfileData(**req['student']),
-                alumni_list=[AlumniProfileData(**alumni) for alumni in req['alumni_list']]
+        # Ranking on the registry structures (executor time past the queue wait)
+        ranking_seconds = time.perf_counter() - ranking_started_at - queue.get("queue_wait_ms", 0) / 1000
+        observe_stages("/api/match/student", {"ranking": ranking_seconds}, queue)
+        
+        logger.info("Against %d resident alumni (version %s)", total_alumni, corpus_version)
+        if extra is not None:
+            queue = {**queue, **extra}
+            if "shards" in extra:
+                logger.info("Shard latencies (ms): %s", [shard['latency_ms'] for shard in extra['shards']])
+            if "candidates" in extra:
+                logger.info("Scored %d LSH candidates", extra['candidates'])
+        
+        if streaming:
+            return StreamingResponse(
+                stream_matches(
+                    recommendations,
+                    total_alumni=total_alumni,
+                    start_time=start_time,
+                    corpus_version=corpus_version,
+                    top_n=request.top_n,
+                    offset=offset,
+                    queue=queue,
+                    explain=student if request.include_explanations else None
+                ),
+                media_type=NDJSON_MEDIA_TYPE
             )
-            
-            recommendations = matcher.get_recommendations(
-                student=match_req.student.dict(),
-                alumni_list=[alumni.dict() for alumni in match_req.alumni_list]
+        
+        with stage_seconds.time("/api/match/student", "response_build"):
+            payload = build_matching_result(
+                recommendations,
+                total_alumni=total_alumni,
+                start_time=start_time,
+                corpus_version=corpus_version,
+                top_n=request.top_n,
+                offset=offset,
+                queue=queue,
+                explain=student if request.include_explanations else None
             )
-            
-            results.append({
-                "student_id": match_req.student.userId,
-                "student_name": match_req.student.name,
-                "matches": recommendations,
-                "match_count": len(recommendations)
-            })
+        with stage_seconds.time("/api/match/student", "serialization"):
+            response = render(payload, accept)
         
-        return {
-            "success": True,
-            "message": "Batch matching completed",
-            "results": results,
-            "total_students": len(requests),
-            "timestamp": get_current_timestamp()
-        }
+        if fingerprint is not None:
+            # Keyed by the version actually scored, which may be newer than at entry
+            result_cache.put(
+                registry_cache_key(fingerprint, corpus_version, request, offset, profile, graph_version, binary),
+                response.body,
+                tag=request.student.userId
+            )
+            response.headers["X-Cache"] = "miss"
+        return response
         
+    except HTTPException:
+        raise
     except Exception as error:
-        logger.error(f"Batch matching error: {str(error)}")
+        logger.error(f"Matching error: {str(error)}")
         raise HTTPException(
             status_code=500,
             detail={
                 "success": False,
-                "message": "Batch matching failed",
+                "message": "Matching algorithm failed",
                 "error": str(error)
             }
         )
 
-@app.post("/api/explain")
-async def explain_match(student: StudentProfileData, alumni: AlumniProfileData):
+def get_match_sink() -> MatchSink:
+    """The Match collection writer, or 503 when pymongo is not installed"""
+    global match_sink
+    if match_sink is None:
+        try:
+            match_sink = MatchSink(
+                get_mongo_database()[config.MATCH_SINK_COLLECTION],
+                batch_size=config.MATCH_SINK_BATCH_SIZE
+            )
+        except RuntimeError as error:
+            raise HTTPException(
+                status_code=503,
+                detail={"success": False, "message": str(error)}
+            )
+    return match_sink
+
+@app.post("/api/match/student/persist", response_model=MatchPersistResponse)
+async def persist_student_matching(request: MatchPersistRequest):
     """
-    Get explanation for why two profiles match
+    Rank a student against the resident alumni registry and write the
+    ranking to the Match collection
+    
+    The student's stored rows are read once; only pairs whose score,
+    breakdown or rank changed are written, as unordered bulk upserts with
+    matchRank set. Stored pairs no longer ranked are deleted.
+    The matches themselves are not returned: callers read them back from
+    Mongo (alumni_ids lists them in rank order).
     """
+    sink = get_match_sink()
+    profile = resolve_weight_profile(request.weight_profile)
+    graph = skill_graph_store.graph
     
     try:
-        explanation = matcher.generate_explanation(
-            student=student.dict(),
-            alumni=alumni.dict()
+        start_time = time.time()
+        
+        (recommendations, total_alumni, corpus_version, _), _ = await dispatch(
+            registry_recommendations,
+            request.student.dict(),
+            request.top_n,
+            request.min_score,
+            0,
+            profile,
+            False,
+            graph,
+            deadline_ms=request.deadline_ms
         )
+        outcome = await asyncio.to_thread(sink.persist, request.student.userId, recommendations)
         
-        score_data = matcher.calculate_hierarchical_score(
-            student=student.dict(),
-            alumni=alumni.dict()
+        logger.info(
+            "Persisted matches for student %s: %d written, %d unchanged, %d deleted in %d batches",
+            request.student.userId, outcome['written'], outcome['unchanged'], outcome['deleted'], outcome['batches']
         )
         
-        return {
-            "success": True,
-            "explanation": explanation,
-            "score": score_data['total_score'],
-            "breakdown": score_data['breakdown']
-        }
+        return MatchPersistResponse(
+            success=True,
+            student_id=request.student.userId,
+            total_alumni=total_alumni,
+            corpus_version=corpus_version,
+            processing_time_ms=calculate_processing_time(start_time, time.time()),
+            **outcome
+        )
         
+    except HTTPException:
+        raise
     except Exception as error:
-        logger.error(f"Explanation error: {str(error)}")
+        logger.error(f"Match persistence error: {str(error)}")
         raise HTTPException(
             status_code=500,
-            detail="Error generating explanation"
+            detail={
+                "success": False,
+                "message": "Match persistence failed",
+                "error": str(error)
+            }
         )
 
-# ============ ERROR HANDLING ============
+# ============ REVERSE MATCHING ============
 
-@app.exception_handler(HTTPException)
-async def http_exception_handler(request, exc):
-    """Handle HTTP exceptions"""
-    return {
-        "success": False,
-        "message": str(exc.detail),
-        "status_code": exc.status_code
-    }
+def reverse_recommendations(alumni, top_n, min_score, offset):
+    """
+    Rank resident students for an alumnus (runs on the match executor)
+    
+    Returns:
+        (student recommendations, number of students, student corpus version)
+    """
+    with student_index_view() as (version, index):
+        return matcher.get_indexed_students(alumni, index, top_n, min_score, offset), len(index), version
 
-@app.exception_handler(Exception)
-async def general_exception_handler(request, exc):
-    """Handle general exceptions"""
-    logger.error(f"Unhandled exception: {str(exc)}")
-    return {
-        "success": False,
-        "message": "Internal server error",
-        "error": str(exc)
-    }
+async def run_reverse_matching(alumni: Dict, top_n, min_score, cursor, deadline_ms, accept) -> Response:
+    """Shared body of the reverse matching endpoints"""
+    offset = request_offset(cursor)
+    
+    try:
+        start_time = time.time()
+        
+        logger.info("Reverse matching request for alumni: %s", alumni.get('name'))
+        
+        (recommendations, total_students, corpus_version), queue = await dispatch(
+            reverse_recommendations,
+            alumni,
+            page_limit(top_n),
+            min_score,
+            offset,
+            deadline_ms=deadline_ms
+        )
+        
+        next_cursor = None
+        if top_n and len(recommendations) > top_n:
+            recommendations = recommendations[:top_n]
+            next_cursor = encode_cursor(offset + top_n)
+        
+        processing_time = calculate_processing_time(start_time, time.time())
+        logger.info("Ranked %d resident students in %.2fms", total_students, processing_time)
+        
+        return render(reverse_matching_result_payload(
+            alumni['userId'],
+            recommendations,
+            message="Reverse matching completed successfully",
+            timestamp=get_current_timestamp(),
+            total_students=total_students,
+            processing_time_ms=processing_time,
+            corpus_version=corpus_version,
+            next_cursor=next_cursor,
+            **queue
+        ), accept)
+        
+    except HTTPException:
+        raise
+    except Exception as error:
+        logger.error(f"Reverse matching error: {str(error)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Matching algorithm failed",
+                "error": str(error)
+            }
+        )
+
+@app.post("/api/match/alumni", response_model=ReverseMatchingResult)
+async def match_students_for_alumni(request: AlumniMatchRequest, accept: Optional[str] = Header(default=None)):
+    """
+    Rank the resident students for an alumnus
+    
+    Scores are those of calculate_hierarchical_score(student, alumni), so a
+    pair scores the same in both directions. Students are loaded beforehand
+    through the /api/students endpoints; only students sharing a token with
+    the alumnus are scored (inverted index with top-k pruning).
+    
+    Optional paging fields: top_n, min_score and cursor.
+    """
+    return await run_reverse_matching(
+        request.alumni.dict(),
+        request.top_n,
+        request.min_score,
+        request.cursor,
+        request.deadline_ms,
+        accept
+    )
+
+@app.get("/api/match/alumni/{alumni_id}", response_model=ReverseMatchingResult)
+async def match_students_for_registry_alumni(alumni_id: str, top_n: Optional[int] = None,
+                                             min_score: Optional[float] = None, cursor: Optional[str] = None,
+                                             accept: Optional[str] = Header(default=None)):
+    """
+    Rank the resident students for an alumnus of the alumni registry
+    """
+    alumni = alumni_registry.get(alumni_id)
+    if alumni is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Alumni profile not found in registry"
+        )
+    if top_n is not None and top_n < 1:
+        raise HTTPException(
+            status_code=400,
+            detail="top_n must be at least 1"
+        )
+    
+    return await run_reverse_matching(alumni, top_n, min_score, cursor, None, accept)
+
+def batch_results(request) -> list:
+    """
+    Score every student of a batch request (runs on the match executor)
+    
+    Returns:
+        Per-student result dicts, in request order
+    """
+    if isinstance(request, list):
+        groups = []
+        for item in request:
+            if groups and groups[-1][0] == item.alumni_list:
+                groups[-1][1].append(item.student)
+            else:
+                groups.append((item.alumni_list, [item.student]))
+        with transient_vocabulary():
+            return batch_job_results([
+                (matcher.build_engine([alumni.dict() for alumni in alumni_list]), students, None, None, 1)
+                for alumni_list, students in groups
+            ])
+    
+    if request.alumni_list is None:
+        engine = alumni_registry.derive("engine", build_alumni_engine)
+        return batch_job_results([(engine, request.students, request.top_n, request.min_score, request.workers)])
+    
+    with transient_vocabulary():
+        engine = matcher.build_engine([alumni.dict() for alumni in request.alumni_list])
+        return batch_job_results([(engine, request.students, request.top_n, request.min_score, request.workers)])
+
+def batch_job_results(jobs) -> list:
+    """
+    Run (engine, students, top_n, min_score, workers) batch jobs in order
+    
+    Returns:
+        Per-student result dicts, in job order
+    """
+    results = []
+    
+    for engine, students, top_n, min_score, workers in jobs:
+        recommendation_lists = run_batch(
+            engine,
+            [student.dict() for student in students],
+            top_n=top_n,
+            min_score=min_score,
+            # Requests may ask for fewer worker processes, never more
+            workers=min(workers or config.BATCH_WORKERS, config.BATCH_WORKERS),
+            memory_budget_bytes=config.BATCH_MEMORY_BUDGET_MB * 1024 * 1024,
+            pool=batch_pool
+        )
+        
+        for student, recommendations in zip(students, recommendation_lists):
+            results.append({
+                "student_id": student.userId,
+                "student_name": student.name,
+                "matches": recommendations,
+                "match_count": len(recommendations)
+            })
+    
+    return results
+
+@app.post("/api/match/batch")
+async def batch_matching(request: Union[BatchMatchRequest, List[MatchRequest]],
+                         accept: Optional[str] = Header(default=None)):
+    """
+    Run matching for multiple students in batch
+    
+    Preferred body: {"students": [...], "alumni_list": [...] | null, "top_n", "min_score", "workers"}.
+    With alumni_list omitted the resident registry is used. The alumni corpus
+    is encoded once and students are scored in memory-bounded blocks,
+    optionally across a process pool.
+    
+    The legacy body, a list of {student, alumni_list} requests, is still
+    accepted; consecutive entries with the same alumni list share one
+    encoded corpus.
+    
+    Returns list of matching results (msgpack with Accept: application/x-msgpack)
+    """
+    
+    try:
+        # Batches fan out to their own process pool (workers), so they run on a thread
+        results, queue = await dispatch(
+            batch_results,
+            request,
+            deadline_ms=None if isinstance(request, list) else request.deadline_ms
+        )
+        
+        return render({
+            "success": True,
+            "message": "Batch matching completed",
+            "results": results,
+            "total_students": len(results),
+            "timestamp": get_current_timestamp(),
+            **queue
+        }, accept)
+        
+    except HTTPException:
+        raise
+    except Exception as error:
+        logger.error(f"Batch matching error: {str(error)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Batch matching failed",
+                "error": str(error)
+            }
+        )
+
+def explain_pair(student, alumni):
+    """Explanation text and score of one pair, scored once (runs on the match executor)"""
+    with transient_vocabulary():
+        score_data = matcher.calculate_hierarchical_score(student=student, alumni=alumni)
+    return matcher.explain_breakdown(score_data['breakdown'], alumni), score_data
+
+@app.post("/api/explain")
+async def explain_match(student: StudentProfileData, alumni: AlumniProfileData):
+    """
+    Get explanation for why two profiles match
+    
+    Identical concurrent requests share one computation (X-Coalesced: true).
+    """
+    
+    try:
+        student_data, alumni_data = student.dict(), alumni.dict()
+        
+        async def compute() -> bytes:
+            (explanation, score_data), queue = await dispatch(explain_pair, student_data, alumni_data)
+            return dumps({
+                "success": True,
+                "explanation": explanation,
+                "score": score_data['total_score'],
+                "breakdown": score_data['breakdown'],
+                **queue
+            })
+        
+        key = ("explain", profile_fingerprint(student_data), profiles_fingerprint([alumni_data]))
+        body, shared = await single_flight.run(key, compute)
+        return Response(content=body, media_type="application/json", headers=coalesced_headers(shared))
+        
+    except HTTPException:
+        raise
+    except Exception as error:
+        logger.error(f"Explanation error: {str(error)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error generating explanation"
+        )
+
+def explain_many(student, alumni_list):
+    """Explanations of one student against many alumni, one scoring pass per pair"""
+    explanations = []
+    with transient_vocabulary():
+        # Alumni first: they intern their tokens, the student only looks them up
+        encoded_alumni = [encode_alumni(alumni) for alumni in alumni_list]
+        encoded_student = encode_student(student)
+        for alumni, encoded in zip(alumni_list, encoded_alumni):
+            score_data = matcher.score_encoded(encoded_student, encoded)
+            explanations.append({
+                "alumni_id": alumni['userId'],
+                "explanation": matcher.explain_breakdown(score_data['breakdown'], alumni),
+                "score": score_data['total_score'],
+                "breakdown": score_data['breakdown']
+            })
+    return explanations
+
+@app.post("/api/explain/batch", response_model=ExplainManyResult)
+async def explain_many_matches(request: ExplainManyRequest):
+    """
+    Explain one student against many alumni in one call
+    
+    Alumni are given inline (alumni_list) and/or by userId from the alumni
+    registry (alumni_ids); ids not in the registry are listed in
+    missing_alumni_ids. Explanations are built from each pair's breakdown,
+    so every pair is scored once.
+    """
+    alumni_list = [alumni.dict() for alumni in request.alumni_list]
+    missing = []
+    for alumni_id in request.alumni_ids:
+        alumni = alumni_registry.get(alumni_id)
+        if alumni is None:
+            missing.append(alumni_id)
+        else:
+            alumni_list.append(alumni)
+    
+    try:
+        explanations, queue = await dispatch(explain_many, request.student.dict(), alumni_list)
+        
+        return {
+            "success": True,
+            "explanations": explanations,
+            "missing_alumni_ids": missing,
+            **queue
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as error:
+        logger.error(f"Explanation error: {str(error)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error generating explanation"
+        )
+
+# ============ WEIGHT PROFILES ============
+
+@app.get("/api/weights", response_model=WeightProfilesResponse)
+async def get_weight_profiles():
+    """List the configured weight profiles with their full weight tables"""
+    return WeightProfilesResponse(
+        success=True,
+        default=DEFAULT_PROFILE,
+        profiles={name: profile.weights for name, profile in weight_profiles.items()}
+    )
+
+def evaluate_profiles(student, profiles, alumni_list, top_n, min_score):
+    """
+    Rank alumni for a student under several profiles (runs on the match executor)
+    
+    Returns:
+        (profile name -> recommendations, number of alumni scored, corpus version or None)
+    """
+    reach = student_reach(student, profiles, skill_graph_store.graph)
+    if alumni_list is not None:
+        with transient_vocabulary():
+            engine = matcher.build_engine(alumni_list)
+            return engine.evaluate(student, profiles, top_n, min_score, reach), len(engine), None
+    
+    with alumni_registry.view("engine", build_alumni_engine) as (version, engine):
+        return engine.evaluate(student, profiles, top_n, min_score, reach), len(engine), version
+
+@app.post("/api/match/evaluate", response_model=EvaluationResult)
+async def evaluate_weight_profiles(request: EvaluateRequest):
+    """
+    Rank one student under several weight profiles in one scoring pass
+    
+    The per-component overlap counts are computed once and shared by every
+    profile, so comparing profiles costs about as much as one match.
+    Alumni come from alumni_list or, when it is omitted, the resident
+    registry. profiles lists profile names (empty = every configured profile).
+    
+    Request body:
+    {
+        "student": {...},
+        "profiles": ["default", "skills_first"],
+        "top_n": 10
+    }
+    """
+    names = request.profiles or list(weight_profiles)
+    profiles = [resolve_weight_profile(name) for name in dict.fromkeys(names)]
+    
+    try:
+        start_time = time.time()
+        
+        logger.info("Evaluating %d weight profiles for student: %s", len(profiles), request.student.name)
+        
+        alumni_list = None
+        if request.alumni_list is not None:
+            alumni_list = [alumni.dict() for alumni in request.alumni_list]
+        
+        (rankings, total_alumni, corpus_version), queue = await dispatch(
+            evaluate_profiles,
+            request.student.dict(),
+            profiles,
+            alumni_list,
+            request.top_n,
+            request.min_score,
+            deadline_ms=request.deadline_ms
+        )
+        
+        return EvaluationResult(
+            success=True,
+            message=f"Ranked {total_alumni} alumni under {len(profiles)} weight profiles",
+            results=[
+                {
+                    "profile": profile.name,
+                    "weights": profile.weights,
+                    "matches": [match_payload(rec) for rec in rankings[profile.name]]
+                }
+                for profile in profiles
+            ],
+            timestamp=get_current_timestamp(),
+            total_alumni=total_alumni,
+            processing_time_ms=calculate_processing_time(start_time, time.time()),
+            corpus_version=corpus_version,
+            **queue
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as error:
+        logger.error(f"Evaluation error: {str(error)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Weight profile evaluation failed",
+                "error": str(error)
+            }
+        )
+
+# ============ SKILL GRAPH ============
+
+def skill_graph_state(message: str) -> Dict:
+    """Skill graph stats response"""
+    graph_version, graph = skill_graph_store.current
+    return {
+        "success": True,
+        "message": message,
+        "version": graph_version,
+        "building": skill_graph_store.building,
+        "graph": graph.stats() if graph is not None else None
+    }
+
+@app.get("/api/skill-graph")
+async def get_skill_graph():
+    """Size, source registry versions and build time of the current skill graph"""
+    return skill_graph_state("Skill graph state")
+
+@app.post("/api/skill-graph/rebuild", status_code=202)
+async def rebuild_skill_graph_now(background_tasks: BackgroundTasks):
+    """
+    Rebuild the skill graph from the current registries in the background
+    
+    The new graph replaces the current one once complete; requests keep
+    using the graph they started with.
+    """
+    if skill_graph_store.building:
+        return skill_graph_state("Skill graph rebuild already running")
+    background_tasks.add_task(rebuild_skill_graph, True)
+    return skill_graph_state("Skill graph rebuild started")
+
+@app.get("/api/skill-graph/neighbors")
+async def get_skill_neighbors(token: str, limit: int = 10):
+    """Strongest skill graph reach of one skill or interest (case-insensitive)"""
+    graph = skill_graph_store.graph
+    if graph is None:
+        raise HTTPException(status_code=404, detail="Skill graph not built")
+    token_id = vocabulary.lookup(normalize_scalar(token))
+    return {
+        "success": True,
+        "token": token,
+        "neighbors": [
+            {"token": vocabulary.token(neighbor), "edge": round(edge, 4), "reach": round(reach, 4)}
+            for neighbor, edge, reach in graph.neighbors(token_id, limit)
+        ]
+    }
+
+# ============ MONGO SYNC ============
+
+@app.get("/api/sync")
+async def get_sync_status():
+    """
+    Mongo corpus sync mode and counters
+    """
+    if mongo_sync is None:
+        return {"success": True, "enabled": False}
+    return {
+        "success": True,
+        "enabled": True,
+        **mongo_sync.stats(),
+        "alumni_version": alumni_registry.version,
+        "student_version": student_registry.version
+    }
+
+# ============ ALUMNI REGISTRY ============
+
+def registry_state(message: str) -> RegistryResponse:
+    """Build a registry state response"""
+    return RegistryResponse(
+        success=True,
+        message=message,
+        version=alumni_registry.version,
+        total_alumni=len(alumni_registry)
+    )
+
+@app.get("/api/alumni", response_model=RegistryResponse)
+async def get_alumni_registry():
+    """
+    Get the resident alumni corpus version and size
+    """
+    return registry_state("Alumni registry state")
+
+@app.put("/api/alumni/{alumni_id}", response_model=RegistryResponse)
+async def upsert_alumni(alumni_id: str, alumni: AlumniProfileData):
+    """
+    Insert or replace one alumni profile in the registry
+    
+    The path id must equal the profile userId.
+    """
+    if alumni.userId != alumni_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Path alumni id does not match profile userId"
+        )
+    
+    await asyncio.to_thread(alumni_registry.upsert, alumni.dict())
+    return registry_state("Alumni profile stored")
+
+@app.delete("/api/alumni/{alumni_id}", response_model=RegistryResponse)
+async def delete_alumni(alumni_id: str):
+    """
+    Remove one alumni profile from the registry
+    """
+    if await asyncio.to_thread(alumni_registry.delete, alumni_id) is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Alumni profile not found in registry"
+        )
+    
+    return registry_state("Alumni profile removed")
+
+@app.post("/api/alumni/bulk", response_model=RegistryResponse)
+async def bulk_load_alumni(request: AlumniBulkLoadRequest):
+    """
+    Load many alumni profiles into the registry
+    
+    With replace=true the current corpus is dropped first. Registry writes
+    run on a thread: they wait for the registry lock, which derived
+    structure rebuilds hold.
+    """
+    await asyncio.to_thread(
+        alumni_registry.bulk_load,
+        [alumni.dict() for alumni in request.alumni_list],
+        replace=request.replace
+    )
+    
+    logger.info(f"Loaded {len(request.alumni_list)} alumni into registry (version {alumni_registry.version})")
+    
+    return registry_state("Alumni profiles loaded")
+
+# ============ ALUMNI SNAPSHOTS ============
+
+def snapshot_response(message: str) -> SnapshotResponse:
+    """Build a snapshot state response"""
+    return SnapshotResponse(
+        success=True,
+        message=message,
+        snapshot=snapshot_state["name"],
+        snapshot_corpus_version=snapshot_state["corpus_version"],
+        version=alumni_registry.version,
+        total_alumni=len(alumni_registry)
+    )
+
+def require_snapshot_store():
+    """404 when snapshots are disabled"""
+    if snapshot_store is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Snapshots are disabled (SNAPSHOT_DIR is empty)"
+        )
+
+def write_snapshot():
+    """Snapshot the registry's sparse engine (runs on the match executor)"""
+    with alumni_registry.view("engine", build_alumni_engine) as (version, engine):
+        name = snapshot_store.write(engine, version)
+    snapshot_state.update(name=name, corpus_version=version, registry_version=version)
+    return name
+
+@app.get("/api/alumni/snapshot", response_model=SnapshotResponse)
+async def get_snapshot_state():
+    """
+    Snapshot loaded by this worker and the current registry state
+    """
+    require_snapshot_store()
+    return snapshot_response("Snapshot state")
+
+@app.post("/api/alumni/snapshot", response_model=SnapshotResponse)
+async def create_snapshot():
+    """
+    Write the alumni registry as a new snapshot and make it current
+    
+    Other workers pick it up on their next poll (SNAPSHOT_POLL_SECONDS) and
+    new workers map it at startup instead of re-encoding the corpus.
+    """
+    require_snapshot_store()
+    name, _ = await dispatch(write_snapshot)
+    logger.info(f"Wrote alumni snapshot {name}")
+    return snapshot_response(f"Snapshot {name} written")
+
+@app.post("/api/alumni/snapshot/reload", response_model=SnapshotResponse)
+async def reload_snapshot():
+    """
+    Swap to the current snapshot now instead of waiting for the next poll
+    """
+    require_snapshot_store()
+    loaded = await asyncio.to_thread(load_latest_snapshot)
+    if loaded:
+        return snapshot_response("Snapshot loaded")
+    if snapshot_state["skipped"] is not None and snapshot_state["skipped"] == snapshot_store.current():
+        return snapshot_response("Snapshot skipped: local registry changes are no longer in the change log")
+    return snapshot_response("Snapshot already current")
+
+# ============ STUDENT REGISTRY ============
+
+def student_registry_state(message: str) -> StudentRegistryResponse:
+    """Build a student registry state response"""
+    return StudentRegistryResponse(
+        success=True,
+        message=message,
+        version=student_registry.version,
+        total_students=len(student_registry)
+    )
+
+@app.get("/api/students", response_model=StudentRegistryResponse)
+async def get_student_registry():
+    """
+    Get the resident student corpus version and size
+    """
+    return student_registry_state("Student registry state")
+
+@app.put("/api/students/{student_id}", response_model=StudentRegistryResponse)
+async def upsert_student(student_id: str, student: StudentProfileData):
+    """
+    Insert or replace one student profile in the registry
+    
+    The path id must equal the profile userId.
+    """
+    if student.userId != student_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Path student id does not match profile userId"
+        )
+    
+    await asyncio.to_thread(student_registry.upsert, student.dict())
+    return student_registry_state("Student profile stored")
+
+@app.delete("/api/students/{student_id}", response_model=StudentRegistryResponse)
+async def delete_student(student_id: str):
+    """
+    Remove one student profile from the registry
+    """
+    if await asyncio.to_thread(student_registry.delete, student_id) is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Student profile not found in registry"
+        )
+    
+    return student_registry_state("Student profile removed")
+
+@app.post("/api/students/bulk", response_model=StudentRegistryResponse)
+async def bulk_load_students(request: StudentBulkLoadRequest):
+    """
+    Load many student profiles into the registry
+    
+    With replace=true the current corpus is dropped first.
+    """
+    await asyncio.to_thread(
+        student_registry.bulk_load,
+        [student.dict() for student in request.students],
+        replace=request.replace
+    )
+    
+    logger.info(f"Loaded {len(request.students)} students into registry (version {student_registry.version})")
+    
+    return student_registry_state("Student profiles loaded")
+
+# ============ DELTA RE-MATCHING ============
+
+def change_versions(request):
+    """
+    Validate the old and new profile of a delta request
+    
+    A missing old profile defaults to the registry copy when the delta
+    runs (see registry_default).
+    """
+    new = request.new.dict() if request.new else None
+    old = request.old.dict() if request.old else None
+    
+    if new is None and old is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Delta request needs an old or new profile"
+        )
+    if new is not None and old is not None and new['userId'] != old['userId']:
+        raise HTTPException(
+            status_code=400,
+            detail="Old and new profile userId differ"
+        )
+    
+    return old, new
+
+def registry_default(registry: ProfileRegistry, old, new):
+    """The old profile of a delta: as given, or the registry copy"""
+    return old if old is not None else registry.get(new['userId'])
+
+def apply_change(registry: ProfileRegistry, old, new):
+    """Record the change in the registry (and its change log)"""
+    if new is not None:
+        registry.upsert(new)
+    elif old['userId'] in registry:
+        registry.delete(old['userId'])
+
+def build_delta_result(changes, students, alumni, start_time: float) -> DeltaResult:
+    """
+    Wrap pair changes into the API response model
+    
+    Pairs that are (still) scored get their new breakdown, except those
+    known to have left the top N.
+    
+    Args:
+        changes: Output of alumni_change_delta / student_change_delta
+        students: Function mapping a student userId to its profile
+        alumni: Function mapping an alumni userId to its (post-change) profile
+        start_time: Request start time (time.time())
+    """
+    pairs = []
+    for change in changes:
+        pair = PairChange(**change)
+        if change['new_score'] is not None and change['in_top_n'] is not False:
+            student = students(change['student_id'])
+            alumni_profile = alumni(change['alumni_id'])
+            encoded_alumni = encode_alumni(alumni_profile)
+            pair.score_breakdown = matcher.score_encoded(encode_student(student), encoded_alumni)['breakdown']
+        pairs.append(pair)
+    
+    processing_time = calculate_processing_time(start_time, time.time())
+    
+    logger.info(f"Delta re-matching found {len(pairs)} changed pairs in {processing_time:.2f}ms")
+    
+    return DeltaResult(
+        success=True,
+        message="Delta re-matching completed",
+        changes=pairs,
+        affected_pairs=len(pairs),
+        corpus_version=alumni_registry.version,
+        student_version=student_registry.version,
+        processing_time_ms=processing_time
+    )
+
+# Serializes delta runs, so each is computed against the registries the
+# previous one left and applied before the next starts
+delta_lock = threading.Lock()
+
+def run_alumni_delta(old, new, top_n) -> DeltaResult:
+    """Compute and apply one alumni change (runs on the match executor)"""
+    with delta_lock:
+        start_time = time.time()
+        old = registry_default(alumni_registry, old, new)
+        
+        with student_index_view() as (_, students), alumni_index_view() as (_, alumni):
+            changes = alumni_change_delta(old, new, students, alumni, matcher.weights, top_n)
+        
+        # Breakdowns are built against the post-change profile
+        changed_alumni = new or old
+        result = build_delta_result(
+            changes,
+            students=student_registry.get,
+            alumni=lambda alumni_id: changed_alumni if alumni_id == changed_alumni['userId'] else alumni_registry.get(alumni_id),
+            start_time=start_time
+        )
+        
+        apply_change(alumni_registry, old, new)
+        result.corpus_version = alumni_registry.version
+        return result
+
+def run_student_delta(old, new, top_n) -> DeltaResult:
+    """Compute and apply one student change (runs on the match executor)"""
+    with delta_lock:
+        start_time = time.time()
+        old = registry_default(student_registry, old, new)
+        
+        with alumni_index_view() as (_, alumni):
+            changes = student_change_delta(old, new, alumni, matcher.weights, top_n)
+        
+        changed_student = new or old
+        result = build_delta_result(
+            changes,
+            students=lambda student_id: changed_student,
+            alumni=alumni_registry.get,
+            start_time=start_time
+        )
+        
+        apply_change(student_registry, old, new)
+        result.student_version = student_registry.version
+        return result
+
+@app.post("/api/match/delta/alumni", response_model=DeltaResult)
+async def alumni_delta(request: AlumniDeltaRequest):
+    """
+    Re-match after one alumni profile change
+    
+    Returns only the (student, alumni) pairs of the resident student
+    registry whose score changed, and with top_n also those whose top-N
+    membership changed (including alumni displaced by this one). The
+    change is then applied to the alumni registry; new=null removes the
+    profile, old defaults to the registry copy.
+    """
+    old, new = change_versions(request)
+    
+    try:
+        result, _ = await dispatch(run_alumni_delta, old, new, request.top_n)
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as error:
+        logger.error(f"Delta re-matching error: {str(error)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Delta re-matching failed",
+                "error": str(error)
+            }
+        )
+
+@app.post("/api/match/delta/student", response_model=DeltaResult)
+async def student_delta(request: StudentDeltaRequest):
+    """
+    Re-match after one student profile change
+    
+    Returns only the pairs of this student with resident alumni whose score
+    changed, and with top_n also those entering or leaving the student's
+    top N. The change is then applied to the student registry; new=null
+    removes the profile, old defaults to the registry copy.
+    """
+    old, new = change_versions(request)
+    
+    try:
+        result, _ = await dispatch(run_student_delta, old, new, request.top_n)
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as error:
+        logger.error(f"Delta re-matching error: {str(error)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Delta re-matching failed",
+                "error": str(error)
+            }
+        )
+
+# ============ RESULT CACHE ============
+
+@app.get("/api/cache")
+async def get_cache_stats():
+    """
+    Get result cache occupancy and hit/miss/eviction counters, and how many
+    requests were coalesced with an identical in-flight one
+    """
+    return {
+        "success": True,
+        "cache": result_cache.stats(),
+        "single_flight": single_flight.stats()
+    }
+
+@app.delete("/api/cache")
+async def clear_cache():
+    """
+    Drop every cached match response
+    """
+    removed = result_cache.invalidate()
+    logger.info(f"Result cache cleared ({removed} entries)")
+    
+    return {
+        "success": True,
+        "message": "Result cache cleared",
+        "removed": removed
+    }
+
+@app.delete("/api/cache/students/{student_id}")
+async def invalidate_student_cache(student_id: str):
+    """
+    Drop the cached match responses computed for one student
+    """
+    removed = result_cache.invalidate(tag=student_id)
+    
+    return {
+        "success": True,
+        "message": "Student cache entries removed",
+        "removed": removed
+    }
+
+# ============ MATCH TABLE EXPORT ============
+
+# Export job states by job id
+export_jobs: Dict[str, ExportJobResponse] = {}
+
+def export_output_path(output: str) -> str:
+    """Resolve an export output name inside EXPORT_DIR, rejecting paths"""
+    if not output or os.path.basename(output) != output or output.startswith("."):
+        raise HTTPException(
+            status_code=400,
+            detail="Export output must be a plain file name"
+        )
+    os.makedirs(config.EXPORT_DIR, exist_ok=True)
+    return os.path.join(config.EXPORT_DIR, output)
+
+def run_export_job(job: ExportJobResponse, engine, request: ExportRequest):
+    """Background task: stream the match table and track progress on the job"""
+    def report(done, total):
+        job.students_done = done
+        job.total_students = total
+    
+    try:
+        job.status = "running"
+        state = export_match_table(
+            engine,
+            [student.dict() for student in request.students],
+            job.output_path,
+            output_format=request.format,
+            top_n=request.top_n,
+            min_score=request.min_score,
+            start_id=request.start_id,
+            end_id=request.end_id,
+            resume=request.resume,
+            block_size=engine.block_size(config.BATCH_MEMORY_BUDGET_MB * 1024 * 1024),
+            progress=report
+        )
+        job.students_done = state["students_done"]
+        job.total_students = state["total_students"]
+        job.rows_written = state["rows_written"]
+        job.status = "completed"
+        logger.info(f"Export {job.job_id} wrote {job.rows_written} rows to {job.output_path}")
+        
+    except Exception as error:
+        logger.error(f"Export {job.job_id} failed: {str(error)}")
+        job.status = "failed"
+        job.success = False
+        job.error = str(error)
+
+@app.post("/api/match/export", response_model=ExportJobResponse, status_code=202)
+async def export_matches(request: ExportRequest, background_tasks: BackgroundTasks):
+    """
+    Export the student x alumni match table (or per-student top_n) to disk
+    
+    Students are scored against the resident alumni registry as of this
+    request and streamed to EXPORT_DIR/<output> in Match-collection shape.
+    With resume=true a run continues after the last student of the previous
+    checkpoint for the same output; the job fails if that checkpoint was
+    written with another format, top_n, min_score, student id range or
+    alumni corpus. Poll /api/match/export/{job_id} for progress.
+    """
+    output_path = export_output_path(request.output)
+    engine = await asyncio.to_thread(alumni_registry.derive, "engine", build_alumni_engine)
+    
+    job = ExportJobResponse(
+        success=True,
+        job_id=uuid.uuid4().hex,
+        status="queued",
+        output_path=output_path,
+        corpus_version=alumni_registry.version
+    )
+    export_jobs[job.job_id] = job
+    background_tasks.add_task(run_export_job, job, engine, request)
+    
+    logger.info(f"Export {job.job_id} queued for {len(request.students)} students")
+    
+    return job
+
+@app.get("/api/match/export/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(job_id: str):
+    """
+    Get the progress of a match table export
+    """
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Export job not found"
+        )
+    
+    return job
+
+# ============ METRICS ============
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus text exposition of request counts and latencies, per-stage
+    matching latencies, and corpus, cache, executor and coalescing state
+    
+    /api/match stages: validation (body read, JSON parsing and model
+    validation), to_dict, fingerprint (coalescing key), queue_wait, encoding,
+    scoring, sorting, recommendations (dicts of the returned rows),
+    response_build and serialization.
+    """
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+# ============ PROFILING ============
+
+def require_admin(token: Optional[str]):
+    """Reject requests without the admin token (404 when no ADMIN_TOKEN is configured)"""
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not profiler.authorized(token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/api/admin/profiling", status_code=201)
+async def start_profiling(request: ProfilingRequest, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Profile the next requests to a path (cprofile: one .prof per request),
+    or sample every thread's stack (sampling: one .folded file) for a number
+    of requests or a time window, whichever ends first
+    
+    A single request can also be profiled with cProfile by sending it with
+    the X-Profile: cprofile and X-Admin-Token headers; its file name is
+    returned in the X-Profile-File response header.
+    """
+    require_admin(x_admin_token)
+    try:
+        session = profiler.start(
+            request.mode,
+            path=request.path,
+            requests=request.requests,
+            seconds=request.seconds,
+            interval=request.interval_ms / 1000
+        )
+    except ProfilingBusy as error:
+        raise HTTPException(status_code=409, detail=str(error))
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    
+    logger.info(f"Profiling session {session.id} started ({request.mode} on {request.path})")
+    
+    return {
+        "success": True,
+        "session": session.state()
+    }
+
+@app.get("/api/admin/profiling")
+async def get_profiling(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Get the active and last profiling sessions, and the files in PROFILE_DIR
+    """
+    require_admin(x_admin_token)
+    files = sorted(os.listdir(config.PROFILE_DIR)) if os.path.isdir(config.PROFILE_DIR) else []
+    
+    return {
+        "success": True,
+        **profiler.status(),
+        "files": files
+    }
+
+@app.delete("/api/admin/profiling")
+async def stop_profiling(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    End the active profiling session and write its outputs
+    """
+    require_admin(x_admin_token)
+    session = await asyncio.to_thread(profiler.stop)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No active profiling session")
+    
+    logger.info(f"Profiling session {session['id']} stopped")
+    
+    return {
+        "success": True,
+        "session": session
+    }
+
+# ============ ERROR HANDLING ============
+
+@app.exception_handler(HTTPException)
+async def http_exception_handler(request, exc):
+    """Handle HTTP exceptions"""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "success": False,
+            "message": str(exc.detail),
+            "status_code": exc.status_code
+        },
+        headers=getattr(exc, "headers", None)
+    )
+
+@app.exception_handler(Exception)
+async def general_exception_handler(request, exc):
+    """Handle general exceptions"""
+    logger.error(f"Unhandled exception: {str(exc)}")
+    return JSONResponse(
+        status_code=500,
+        content={
+            "success": False,
+            "message": "Internal server error",
+            "error": str(exc)
+        }
+    )
 
 # ============ STARTUP/SHUTDOWN ============
 
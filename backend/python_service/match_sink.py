@@ -0,0 +1,106 @@
+"""
+Match collection persistence for GBHM Service
+Writes a student's ranked recommendations to Mongo with batched, unordered
+bulk upserts, skipping rows that are already stored unchanged
+
+A run reads the student's stored rows once, then writes only pairs whose
+score, breakdown or rank differ. Stored pairs the run no longer ranks are
+deleted, as delta re-matching does, so a student's rows are always exactly
+the latest ranking.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List
+
+from python_service.export import OBJECT_ID, match_document
+
+try:
+    from bson import ObjectId
+    from pymongo import DeleteOne, UpdateOne
+except ImportError:  # pragma: no cover - depends on the environment
+    ObjectId = None
+    DeleteOne = None
+    UpdateOne = None
+
+# Fields compared against the stored row to decide whether it needs a write
+COMPARED_FIELDS = ('totalScore', 'scoreBreakdown', 'commonSkills', 'commonInterests', 'matchingAreas', 'matchRank')
+
+
+def to_object_id(value: str):
+    """Store 24-hex ids as ObjectIds, as the backend's Match model does"""
+    if ObjectId is not None and isinstance(value, str) and OBJECT_ID.match(value):
+        return ObjectId(value)
+    return value
+
+
+class MatchSink:
+    """Persists ranked recommendations to the Match collection"""
+
+    def __init__(self, collection, batch_size: int = 500):
+        """
+        Args:
+            collection: pymongo (or mongomock) Collection of Match documents
+            batch_size: Operations per bulk_write call
+        """
+        if UpdateOne is None:
+            raise RuntimeError("Match persistence needs pymongo (pip install pymongo)")
+        self.collection = collection
+        self.batch_size = batch_size
+
+    def persist(self, student_id: str, recommendations: Iterable[Dict]) -> Dict:
+        """
+        Write one student's ranking
+
+        Args:
+            student_id: Student userId
+            recommendations: Ranked recommendations (rank 1 first)
+
+        Returns:
+            Alumni ids in rank order, and counts of rows written, unchanged
+            and deleted, and bulk_write batches
+        """
+        now = datetime.now(timezone.utc)
+        student_key = to_object_id(student_id)
+        stored = {
+            str(row['alumniId']): row
+            for row in self.collection.find(
+                {'studentId': student_key},
+                {'_id': 0, 'alumniId': 1, **{field: 1 for field in COMPARED_FIELDS}}
+            )
+        }
+
+        operations: List = []
+        alumni_ids, unchanged = [], 0
+        for rank, rec in enumerate(recommendations, 1):
+            alumni_id = str(rec['alumni_id'])
+            alumni_ids.append(alumni_id)
+            document = match_document(student_id, rec, rank, now.isoformat())
+            row = stored.pop(alumni_id, None)
+            if row is not None and all(row.get(field) == document[field] for field in COMPARED_FIELDS):
+                unchanged += 1
+                continue
+            document['updatedAt'] = now
+            document['studentId'] = student_key
+            document['alumniId'] = to_object_id(alumni_id)
+            operations.append(UpdateOne(
+                {'studentId': student_key, 'alumniId': document['alumniId']},
+                {'$set': document, '$setOnInsert': {'createdAt': now, 'viewedAt': None}},
+                upsert=True
+            ))
+        written = len(operations)
+
+        for alumni_id in stored:
+            operations.append(DeleteOne({'studentId': student_key, 'alumniId': to_object_id(alumni_id)}))
+
+        batches = 0
+        for start in range(0, len(operations), self.batch_size):
+            self.collection.bulk_write(operations[start:start + self.batch_size], ordered=False)
+            batches += 1
+
+        return {
+            'alumni_ids': alumni_ids,
+            'written': written,
+            'unchanged': unchanged,
+            'deleted': len(operations) - written,
+            'batches': batches
+        }
@@ -3,8 +3,8 @@ Pydantic models for request/response validation
 Data structures for FastAPI
 """
 
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from pydantic import BaseModel, Field
+from typing import Any, List, Dict, Optional
 
 class StudentProfileData(BaseModel):
     """Student profile data for matching"""
@@ -58,6 +58,25 @@ class MatchResponse(BaseModel):
     common_skills: List[str]
     common_interests: List[str]
     matching_areas: List[str]
+    explanation: Optional[str] = None
+
+class StudentMatchResponse(BaseModel):
+    """Single reverse match result (a student for an alumnus)"""
+    student_id: str
+    student_name: str
+    total_score: float
+    score_breakdown: Dict
+    common_skills: List[str]
+    common_interests: List[str]
+    matching_areas: List[str]
+
+class ShardTiming(BaseModel):
+    """Latency of one shard in a sharded match"""
+    shard: int
+    alumni: int
+    matches: int
+    latency_ms: float
+    compute_ms: float
 
 class MatchingResult(BaseModel):
     """Final matching result"""
@@ -67,11 +86,247 @@ class MatchingResult(BaseModel):
     timestamp: str
     total_alumni: int
     processing_time_ms: float
+    corpus_version: Optional[int] = None
+    next_cursor: Optional[str] = None
+    queue_depth: Optional[int] = None
+    queue_wait_ms: Optional[float] = None
+    shards: Optional[List[ShardTiming]] = None
+    candidates: Optional[int] = None
+
+class ReverseMatchingResult(BaseModel):
+    """Students ranked for one alumnus"""
+    success: bool
+    message: str
+    alumni_id: str
+    matches: List[StudentMatchResponse]
+    timestamp: str
+    total_students: int
+    processing_time_ms: float
+    corpus_version: Optional[int] = None
+    next_cursor: Optional[str] = None
+    queue_depth: Optional[int] = None
+    queue_wait_ms: Optional[float] = None
 
 class MatchRequest(BaseModel):
     """Request model for matching"""
     student: StudentProfileData
     alumni_list: List[AlumniProfileData]
+    top_n: Optional[int] = Field(default=None, ge=1)
+    min_score: Optional[float] = None
+    cursor: Optional[str] = None
+    deadline_ms: Optional[int] = Field(default=None, ge=1)
+    include_explanations: bool = False
+    weight_profile: Optional[str] = None
+
+class ColumnarMatchRequest(BaseModel):
+    """Request model for matching against a columnar alumni corpus (see columnar.py)"""
+    student: StudentProfileData
+    alumni: Dict[str, Any]
+    top_n: Optional[int] = Field(default=None, ge=1)
+    min_score: Optional[float] = None
+    cursor: Optional[str] = None
+    deadline_ms: Optional[int] = Field(default=None, ge=1)
+    include_explanations: bool = False
+    weight_profile: Optional[str] = None
+
+class AlumniMatchRequest(BaseModel):
+    """Request model for ranking resident students for an alumnus"""
+    alumni: AlumniProfileData
+    top_n: Optional[int] = Field(default=None, ge=1)
+    min_score: Optional[float] = None
+    cursor: Optional[str] = None
+    deadline_ms: Optional[int] = Field(default=None, ge=1)
+
+class StudentMatchRequest(BaseModel):
+    """Request model for matching against the resident alumni registry"""
+    student: StudentProfileData
+    top_n: Optional[int] = Field(default=None, ge=1)
+    min_score: Optional[float] = None
+    cursor: Optional[str] = None
+    deadline_ms: Optional[int] = Field(default=None, ge=1)
+    include_explanations: bool = False
+    weight_profile: Optional[str] = None
+    approximate: bool = False
+
+class EvaluateRequest(BaseModel):
+    """Request model for ranking one student under several weight profiles"""
+    student: StudentProfileData
+    profiles: List[str] = []
+    alumni_list: Optional[List[AlumniProfileData]] = None
+    top_n: Optional[int] = Field(default=None, ge=1)
+    min_score: Optional[float] = None
+    deadline_ms: Optional[int] = Field(default=None, ge=1)
+
+class ProfileMatches(BaseModel):
+    """Ranking under one weight profile"""
+    profile: str
+    weights: Dict[str, float]
+    matches: List[MatchResponse]
+
+class EvaluationResult(BaseModel):
+    """Rankings of one student under several weight profiles"""
+    success: bool
+    message: str
+    results: List[ProfileMatches]
+    timestamp: str
+    total_alumni: int
+    processing_time_ms: float
+    corpus_version: Optional[int] = None
+    queue_depth: Optional[int] = None
+    queue_wait_ms: Optional[float] = None
+
+class WeightProfilesResponse(BaseModel):
+    """Configured weight profiles"""
+    success: bool
+    default: str
+    profiles: Dict[str, Dict[str, float]]
+
+class BatchMatchRequest(BaseModel):
+    """Request model for batch matching many students against one alumni corpus"""
+    students: List[StudentProfileData]
+    alumni_list: Optional[List[AlumniProfileData]] = None
+    top_n: Optional[int] = Field(default=None, ge=1)
+    min_score: Optional[float] = None
+    workers: Optional[int] = Field(default=None, ge=1)
+    deadline_ms: Optional[int] = Field(default=None, ge=1)
+
+class ExplainManyRequest(BaseModel):
+    """Request model for explaining one student against many alumni"""
+    student: StudentProfileData
+    alumni_list: List[AlumniProfileData] = []
+    alumni_ids: List[str] = []
+
+class PairExplanation(BaseModel):
+    """Explanation and score of one pair"""
+    alumni_id: str
+    explanation: str
+    score: float
+    breakdown: Dict
+
+class ExplainManyResult(BaseModel):
+    """Explanations for one student against many alumni"""
+    success: bool
+    explanations: List[PairExplanation]
+    missing_alumni_ids: List[str] = []
+    queue_depth: Optional[int] = None
+    queue_wait_ms: Optional[float] = None
+
+class AlumniBulkLoadRequest(BaseModel):
+    """Request model for loading alumni into the registry"""
+    alumni_list: List[AlumniProfileData]
+    replace: bool = False
+
+class RegistryResponse(BaseModel):
+    """Alumni registry state"""
+    success: bool
+    message: str
+    version: int
+    total_alumni: int
+
+class SnapshotResponse(BaseModel):
+    """Alumni snapshot state of this worker"""
+    success: bool
+    message: str
+    snapshot: Optional[str] = None
+    snapshot_corpus_version: Optional[int] = None
+    version: int
+    total_alumni: int
+
+class StudentBulkLoadRequest(BaseModel):
+    """Request model for loading students into the registry"""
+    students: List[StudentProfileData]
+    replace: bool = False
+
+class StudentRegistryResponse(BaseModel):
+    """Student registry state"""
+    success: bool
+    message: str
+    version: int
+    total_students: int
+
+class AlumniDeltaRequest(BaseModel):
+    """Request model for re-matching after one alumni profile change"""
+    old: Optional[AlumniProfileData] = None
+    new: Optional[AlumniProfileData] = None
+    top_n: Optional[int] = Field(default=None, ge=1)
+
+class StudentDeltaRequest(BaseModel):
+    """Request model for re-matching after one student profile change"""
+    old: Optional[StudentProfileData] = None
+    new: Optional[StudentProfileData] = None
+    top_n: Optional[int] = Field(default=None, ge=1)
+
+class PairChange(BaseModel):
+    """One (student, alumni) pair whose score or top-N membership changed"""
+    student_id: str
+    alumni_id: str
+    old_score: Optional[float] = None
+    new_score: Optional[float] = None
+    was_top_n: Optional[bool] = None
+    in_top_n: Optional[bool] = None
+    score_breakdown: Optional[Dict] = None
+
+class DeltaResult(BaseModel):
+    """Pairs affected by one profile change"""
+    success: bool
+    message: str
+    changes: List[PairChange]
+    affected_pairs: int
+    corpus_version: int
+    student_version: int
+    processing_time_ms: float
+
+class ExportRequest(BaseModel):
+    """Request model for exporting the precomputed match table"""
+    students: List[StudentProfileData]
+    output: str
+    format: str = Field(default="ndjson", pattern="^(ndjson|parquet)$")
+    top_n: Optional[int] = Field(default=None, ge=1)
+    min_score: Optional[float] = None
+    start_id: Optional[str] = None
+    end_id: Optional[str] = None
+    resume: bool = False
+
+class ExportJobResponse(BaseModel):
+    """Match table export job state"""
+    success: bool
+    job_id: str
+    status: str
+    output_path: str
+    corpus_version: int
+    total_students: int = 0
+    students_done: int = 0
+    rows_written: int = 0
+    error: Optional[str] = None
+
+class MatchPersistRequest(BaseModel):
+    """Request model for ranking a student and persisting the matches to Mongo"""
+    student: StudentProfileData
+    top_n: Optional[int] = Field(default=None, ge=1)
+    min_score: Optional[float] = None
+    weight_profile: Optional[str] = None
+    deadline_ms: Optional[int] = Field(default=None, ge=1)
+
+class MatchPersistResponse(BaseModel):
+    """Outcome of a persisted match run"""
+    success: bool
+    student_id: str
+    alumni_ids: List[str]
+    total_alumni: int
+    corpus_version: int
+    written: int
+    unchanged: int
+    deleted: int
+    batches: int
+    processing_time_ms: float
+
+class ProfilingRequest(BaseModel):
+    """Request model for starting a profiling session"""
+    mode: str = Field(pattern="^(cprofile|sampling)$")
+    path: str = "/api/match"
+    requests: Optional[int] = Field(default=None, ge=1)
+    seconds: Optional[float] = Field(default=None, gt=0)
+    interval_ms: float = Field(default=5, gt=0)
 
 class HealthResponse(BaseModel):
     """Health check response"""
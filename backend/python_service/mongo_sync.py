@@ -0,0 +1,369 @@
+"""
+MongoDB corpus sync for GBHM Service
+Bulk-loads student and alumni profiles from Mongo at startup and keeps the
+registries current from a change stream, or by polling updatedAt
+
+Documents are projected to the fields the matcher reads and mapped to the
+same profile dicts the /api/alumni and /api/students endpoints store, so a
+change already pushed by the backend is recognised and not applied twice.
+Change streams need a replica set; against a standalone mongod (or a
+mongomock stand-in) the sync polls updatedAt instead and finds deletions by
+comparing document IDs.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from python_service.models import AlumniProfileData, StudentProfileData
+from python_service.registry import ProfileRegistry
+
+try:
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+except ImportError:  # pragma: no cover - depends on the environment
+    MongoClient = None
+    PyMongoError = Exception
+
+logger = logging.getLogger(__name__)
+
+# Profile field -> document field, as the backend's toAlumniPayload maps them
+ALUMNI_FIELDS = {
+    'id': '_id',
+    'userId': 'userId',
+    'name': 'name',
+    'university': 'university',
+    'degree': 'degree',
+    'industry': 'industry',
+    'skills': 'skills',
+    'interests': 'interests',
+    'mentoring_areas': 'mentoringAreas',
+    'company': 'company',
+    'availability': 'availability',
+    'hiring_stack': 'hiringStack',
+    'location': 'location'
+}
+
+# Profile field -> document field, as the backend's toStudentPayload maps them
+STUDENT_FIELDS = {
+    'id': '_id',
+    'userId': 'userId',
+    'name': 'name',
+    'university': 'university',
+    'degree': 'degree',
+    'preferred_industry': 'preferredIndustry',
+    'skills': 'skills',
+    'interests': 'interests',
+    'looking_for': 'lookingFor',
+    'location': 'location'
+}
+
+# Change stream events carrying a full document
+UPSERT_EVENTS = ('insert', 'update', 'replace')
+
+
+class SyncTarget(NamedTuple):
+    """A Mongo collection mirrored into a registry"""
+    collection: str
+    registry: ProfileRegistry
+    model: Type[BaseModel]
+    fields: Dict[str, str]
+
+    @property
+    def projection(self) -> Dict[str, int]:
+        projection = {field: 1 for field in self.fields.values()}
+        projection['updatedAt'] = 1
+        return projection
+
+
+def to_profile(document: Dict, target: SyncTarget) -> Optional[Dict]:
+    """
+    Map a profile document to registry profile data
+
+    ObjectIds become strings and null fields take the model default.
+
+    Returns:
+        Profile dict, or None if the document is not a valid profile
+    """
+    data = {}
+    for field, source in target.fields.items():
+        value = document.get(source)
+        if value is None:
+            continue
+        data[field] = value if isinstance(value, (str, list, int, float)) else str(value)
+    try:
+        return target.model(**data).dict()
+    except ValidationError:
+        return None
+
+
+def connect(uri: str, db_name: str, **client_options):
+    """
+    Open the configured database
+
+    Raises:
+        RuntimeError: pymongo is not installed
+    """
+    if MongoClient is None:
+        raise RuntimeError("Mongo sync needs pymongo (pip install pymongo)")
+    return MongoClient(uri, **client_options)[db_name]
+
+
+class MongoSync:
+    """Mirrors profile collections into registries"""
+
+    def __init__(self, database, targets: Iterable[SyncTarget], batch_size: int = 1000,
+                 poll_seconds: float = 5, change_streams: bool = True):
+        """
+        Args:
+            database: pymongo (or mongomock) Database
+            targets: Collections to mirror
+            batch_size: Documents fetched per cursor batch
+            poll_seconds: Polling interval, and the wait before reopening a failed change stream
+            change_streams: Try a change stream before falling back to polling
+        """
+        self.database = database
+        self.targets = {target.collection: target for target in targets}
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.change_streams = change_streams
+        self.mode = "idle"
+        self.loaded: Dict[str, int] = {}
+        self.applied = 0
+        self.deleted = 0
+        # (collection, document _id) of documents that are not valid profiles
+        self.invalid = set()
+        self.last_change_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._stream = None
+        self._resume_token = None
+        # Per collection: document _id -> registry userId, and the newest updatedAt seen
+        self._user_ids: Dict[str, Dict[str, str]] = {name: {} for name in self.targets}
+        self._watermarks: Dict[str, Any] = {name: None for name in self.targets}
+
+    def load(self) -> Dict[str, int]:
+        """
+        Load every collection into its registry
+
+        An empty registry is bulk-loaded in one version; a populated one
+        (e.g. restored from a snapshot) only gets the profiles that differ,
+        and loses those no longer in Mongo.
+
+        Returns:
+            Collection -> documents loaded
+        """
+        for name, target in self.targets.items():
+            profiles = []
+            user_ids = {}
+            cursor = self.database[name].find({}, target.projection, batch_size=self.batch_size)
+            for document in cursor:
+                self._advance_watermark(name, document)
+                profile = to_profile(document, target)
+                if profile is None:
+                    self.invalid.add((name, str(document['_id'])))
+                    continue
+                user_ids[profile['id']] = profile['userId']
+                profiles.append(profile)
+            self._user_ids[name] = user_ids
+
+            if len(target.registry) == 0:
+                target.registry.bulk_load(profiles)
+            else:
+                self._reconcile(target, profiles)
+            self.loaded[name] = len(profiles)
+            logger.info(
+                f"Loaded {len(profiles)} profiles from {name} into the {target.registry.kind} registry "
+                f"(version {target.registry.version})"
+            )
+        return dict(self.loaded)
+
+    def _reconcile(self, target: SyncTarget, profiles: List[Dict]):
+        """Upsert changed profiles and delete those Mongo no longer has"""
+        present = set()
+        for profile in profiles:
+            present.add(profile['userId'])
+            self._upsert(target, profile)
+        for profile in target.registry.profiles():
+            if profile['userId'] not in present:
+                target.registry.delete(profile['userId'])
+                self.deleted += 1
+
+    def _upsert(self, target: SyncTarget, profile: Dict) -> bool:
+        """Store a profile unless the registry already holds it unchanged"""
+        if target.registry.get(profile['userId']) == profile:
+            return False
+        target.registry.upsert(profile)
+        self.applied += 1
+        return True
+
+    def _advance_watermark(self, name: str, document: Dict):
+        updated_at = document.get('updatedAt')
+        if updated_at is not None and (self._watermarks[name] is None or updated_at > self._watermarks[name]):
+            self._watermarks[name] = updated_at
+
+    def apply_document(self, name: str, document: Optional[Dict]) -> bool:
+        """
+        Apply an inserted or updated document
+
+        Returns:
+            True if the registry changed
+        """
+        target = self.targets[name]
+        if document is None:
+            return False
+        self._advance_watermark(name, document)
+        profile = to_profile(document, target)
+        if profile is None:
+            self.invalid.add((name, str(document['_id'])))
+            return False
+        self.invalid.discard((name, profile['id']))
+
+        previous = self._user_ids[name].get(profile['id'])
+        self._user_ids[name][profile['id']] = profile['userId']
+        if previous is not None and previous != profile['userId']:
+            target.registry.delete(previous)
+        changed = self._upsert(target, profile)
+        if changed:
+            self.last_change_at = time.time()
+        return changed
+
+    def apply_delete(self, name: str, document_id: Any) -> bool:
+        """
+        Apply a deleted document
+
+        Returns:
+            True if the registry held its profile
+        """
+        self.invalid.discard((name, str(document_id)))
+        user_id = self._user_ids[name].pop(str(document_id), None)
+        if user_id is None or self.targets[name].registry.delete(user_id) is None:
+            return False
+        self.deleted += 1
+        self.last_change_at = time.time()
+        return True
+
+    def poll(self) -> int:
+        """
+        Apply documents updated since the last one seen, then deletions
+
+        Documents updated in the same millisecond as the watermark are
+        fetched again; unchanged profiles are not re-applied.
+
+        Returns:
+            Number of registry changes
+        """
+        changes = 0
+        for name, target in self.targets.items():
+            watermark = self._watermarks[name]
+            query = {'updatedAt': {'$gte': watermark}} if watermark is not None else {}
+            for document in self.database[name].find(query, target.projection, batch_size=self.batch_size):
+                changes += self.apply_document(name, document)
+
+            present = {
+                str(document['_id'])
+                for document in self.database[name].find({}, {'_id': 1}, batch_size=self.batch_size)
+            }
+            for document_id in set(self._user_ids[name]) - present:
+                changes += self.apply_delete(name, document_id)
+            self.invalid = {(n, i) for n, i in self.invalid if n != name or i in present}
+        return changes
+
+    def open_stream(self) -> bool:
+        """
+        Start a change stream over the mirrored collections
+
+        Opened before load() so changes made during the load are not missed
+        (re-applying one the load already saw is a no-op).
+
+        Returns:
+            False if change streams are disabled or unsupported
+        """
+        if not self.change_streams:
+            return False
+        pipeline = [{'$match': {'ns.coll': {'$in': list(self.targets)}}}]
+        try:
+            self._stream = self.database.watch(
+                pipeline, full_document='updateLookup', resume_after=self._resume_token,
+                max_await_time_ms=1000
+            )
+        except (NotImplementedError, TypeError, PyMongoError) as error:
+            # TypeError: stand-ins without Database.watch (mongomock)
+            logger.info(f"Mongo change streams unavailable, polling updatedAt instead: {error}")
+            self._stream = None
+            return False
+        return True
+
+    def follow(self, stop: threading.Event):
+        """
+        Apply changes until stop is set (blocking; run it on a thread)
+
+        A change stream that fails is reopened from its resume token; if
+        that fails too the sync polls from then on.
+        """
+        while not stop.is_set():
+            if self._stream is not None:
+                self.mode = "change_stream"
+                try:
+                    self._tail(stop)
+                except Exception as error:
+                    self.last_error = str(error)
+                    logger.error(f"Mongo change stream error: {str(error)}")
+                    self._close_stream()
+                    if stop.wait(self.poll_seconds) or not self.open_stream():
+                        continue
+                    self.load()
+                continue
+
+            self.mode = "polling"
+            try:
+                self.poll()
+            except Exception as error:
+                self.last_error = str(error)
+                logger.error(f"Mongo poll error: {str(error)}")
+            stop.wait(self.poll_seconds)
+        self.mode = "stopped"
+        self._close_stream()
+
+    def _tail(self, stop: threading.Event):
+        while not stop.is_set() and self._stream is not None:
+            change = self._stream.try_next()
+            self._resume_token = self._stream.resume_token
+            if change is None:
+                continue
+            name = change.get('ns', {}).get('coll')
+            operation = change['operationType']
+            if name not in self.targets:
+                continue
+            if operation in UPSERT_EVENTS:
+                self.apply_document(name, change.get('fullDocument'))
+            elif operation == 'delete':
+                self.apply_delete(name, change['documentKey']['_id'])
+            elif operation in ('drop', 'rename', 'invalidate'):
+                # The stream cannot continue past these; start over from a full load
+                self._resume_token = None
+                self._close_stream()
+                self.open_stream()
+                self.load()
+
+    def _close_stream(self):
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except PyMongoError:
+                pass
+            self._stream = None
+
+    def stats(self) -> Dict:
+        """Sync mode and counters"""
+        return {
+            'mode': self.mode,
+            'loaded': dict(self.loaded),
+            'applied': self.applied,
+            'deleted': self.deleted,
+            'invalid': len(self.invalid),
+            'last_change_at': self.last_change_at,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,365 @@
+"""
+On-demand profiling of live matching requests
+An admin starts a session (cProfile for the next N requests to a path, or a
+sampling profiler for N requests or a time window); results are written to
+PROFILE_DIR as pstats (.prof) or collapsed-stack (.folded) files
+
+cProfile runs cover the request on the event loop thread (routing, body
+parsing, validation, serialization; other requests interleaving on the loop
+show up too) and the matching work on its executor thread, merged into one
+.prof per request. Only one request is profiled on the loop at a time;
+others run unprofiled and do not count. The sampler records the stacks of
+every thread at a fixed interval, in the folded format flame graph tools
+read ("frame;frame;frame count"). Requests taken by either profiler skip the
+process pool, so their matching work runs where it can be profiled.
+
+When no session is active and no request asks for profiling, requests only
+pay one attribute check.
+"""
+
+import cProfile
+import hmac
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MODES = ("cprofile", "sampling")
+
+# Request header profiling one request with cProfile (with the admin token header)
+PROFILE_HEADER = b"x-profile"
+ADMIN_TOKEN_HEADER = b"x-admin-token"
+
+# Run of the current request, if the profiler took it
+current_run: ContextVar[Optional["ProfileRun"]] = ContextVar("current_run", default=None)
+
+
+class ProfilingBusy(Exception):
+    """A profiling session is already active"""
+    pass
+
+
+class ProfileRun:
+    """
+    One request taken by the profiler
+
+    In cProfile mode it holds the request's loop-thread profile plus its
+    executor-thread profiles; sampled requests are only counted.
+    """
+
+    def __init__(self, session: Optional["ProfilingSession"], path: Optional[str]):
+        """
+        Args:
+            session: Session the request counts towards (None for X-Profile requests)
+            path: Output .prof file (None = no cProfile, sampling session)
+        """
+        self.session = session
+        self.path = path
+        self.loop_profile = cProfile.Profile() if path else None
+        self._worker_profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def wrap(self, fn: Callable) -> Callable:
+        """fn profiled on the thread it runs on (thread pools only: the wrapper is not picklable)"""
+        if self.loop_profile is None:
+            return fn
+
+        def profiled(*args, **kwargs):
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self._lock:
+                    self._worker_profiles.append(profile)
+        return profiled
+
+    def write(self):
+        """Merge the loop and worker profiles into one pstats file"""
+        stats = pstats.Stats(self.loop_profile)
+        for profile in self._worker_profiles:
+            stats.add(profile)
+        stats.dump_stats(self.path)
+
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of all other threads every interval seconds"""
+
+    def __init__(self, interval: float, path: str, deadline: Optional[float] = None):
+        """
+        Args:
+            interval: Seconds between samples
+            path: Output .folded file, written when sampling stops
+            deadline: time.monotonic() at which sampling stops by itself
+        """
+        super().__init__(name="gbhm-profile-sampler", daemon=True)
+        self.interval = interval
+        self.path = path
+        self.deadline = deadline
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                break
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(frames))] += 1
+            self.samples += 1
+        self._write()
+
+    def stop(self):
+        """Stop sampling and wait for the output file"""
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+
+    def _write(self):
+        with open(self.path, "w", encoding="utf-8") as output:
+            for stack, count in self.stacks.most_common():
+                output.write(f"{stack} {count}\n")
+
+
+class ProfilingSession:
+    """An admin-started profiling session"""
+
+    def __init__(self, mode: str, path: str, requests: Optional[int], seconds: Optional[float],
+                 interval: float, output_dir: str):
+        self.id = uuid.uuid4().hex[:8]
+        self.mode = mode
+        self.path = path
+        self.requests = requests
+        self.seconds = seconds
+        self.interval = interval
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + seconds if seconds else None
+        # Requests taken and finished
+        self.started = 0
+        self.profiled = 0
+        self.files: List[str] = []
+        self.prefix = os.path.join(output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.id}")
+        self.sampler: Optional[StackSampler] = None
+        if mode == "sampling":
+            self.sampler = StackSampler(interval, f"{self.prefix}.folded", self.deadline)
+            self.files.append(self.sampler.path)
+
+    @property
+    def expired(self) -> bool:
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return self.requests is not None and self.profiled >= self.requests
+
+    def state(self) -> Dict:
+        return {
+            'id': self.id,
+            'mode': self.mode,
+            'path': self.path,
+            'requests': self.requests,
+            'seconds': self.seconds,
+            'started': self.started,
+            'profiled': self.profiled,
+            'started_at': self.started_at,
+            'samples': self.sampler.samples if self.sampler is not None else None,
+            'files': [os.path.basename(path) for path in self.files]
+        }
+
+
+class Profiler:
+    """Starts, applies and ends profiling sessions"""
+
+    def __init__(self, output_dir: str, admin_token: str = ""):
+        """
+        Args:
+            output_dir: Directory profiles are written to
+            admin_token: Token the X-Profile header must come with ("" disables profiling)
+        """
+        self.output_dir = output_dir
+        self.admin_token = admin_token
+        self.session: Optional[ProfilingSession] = None
+        self.last_session: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._loop_busy = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.admin_token)
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return self.enabled and token is not None and hmac.compare_digest(token, self.admin_token)
+
+    def start(self, mode: str, path: str = "/api/match", requests: Optional[int] = None,
+              seconds: Optional[float] = None, interval: float = 0.005) -> ProfilingSession:
+        """
+        Start a session ending after `requests` profiled requests or `seconds`, whichever comes first
+
+        Raises:
+            ValueError: Unknown mode, or neither requests nor seconds given
+            ProfilingBusy: Another session is active
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        if not requests and not seconds:
+            raise ValueError("A profiling session needs a request count or a time window")
+        with self._lock:
+            self._expire()
+            if self.session is not None:
+                raise ProfilingBusy(f"Profiling session {self.session.id} is active")
+            os.makedirs(self.output_dir, exist_ok=True)
+            session = ProfilingSession(mode, path, requests, seconds, interval, self.output_dir)
+            if session.sampler is not None:
+                session.sampler.start()
+            self.session = session
+            return session
+
+    def stop(self) -> Optional[Dict]:
+        """End the active session (flushing the sampler); returns its final state"""
+        with self._lock:
+            return self._end()
+
+    def status(self) -> Dict:
+        with self._lock:
+            self._expire()
+            return {
+                'enabled': self.enabled,
+                'output_dir': self.output_dir,
+                'session': self.session.state() if self.session is not None else None,
+                'last_session': self.last_session
+            }
+
+    def _expire(self):
+        if self.session is not None and self.session.expired:
+            self._end()
+
+    def _end(self) -> Optional[Dict]:
+        session, self.session = self.session, None
+        if session is None:
+            return None
+        if session.sampler is not None:
+            session.sampler.stop()
+        self.last_session = session.state()
+        return self.last_session
+
+    def begin(self, scope) -> Optional[ProfileRun]:
+        """
+        Decide whether a request is taken (called only while armed, see ProfilingMiddleware)
+
+        Returns:
+            The request's run, or None if it runs unprofiled
+        """
+        session = self.session
+        if session is None:
+            headers = dict(scope["headers"])
+            mode = headers.get(PROFILE_HEADER)
+            token = headers.get(ADMIN_TOKEN_HEADER)
+            if mode != b"cprofile" or token is None or not self.authorized(token.decode("latin-1")):
+                return None
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-request-{uuid.uuid4().hex[:8]}.prof"
+            return self._claim_loop(None, os.path.join(self.output_dir, name))
+
+        if scope["path"] != session.path:
+            return None
+        with self._lock:
+            if self.session is not session or session.expired:
+                self._expire()
+                return None
+            if session.requests is not None and session.started >= session.requests:
+                return None
+            if session.mode == "sampling":
+                run = ProfileRun(session, None)
+            else:
+                run = self._claim_loop(session, f"{session.prefix}-{session.started + 1:04d}.prof")
+                if run is None:
+                    return None
+                session.files.append(run.path)
+            session.started += 1
+            return run
+
+    def _claim_loop(self, session: Optional[ProfilingSession], path: str) -> Optional[ProfileRun]:
+        """A cProfile run, unless another request is being profiled on the loop thread"""
+        if self._loop_busy:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._loop_busy = True
+        return ProfileRun(session, path)
+
+    def finish(self, run: ProfileRun):
+        """Write a request's profile and end its session once complete"""
+        if run.loop_profile is not None:
+            self._loop_busy = False
+            try:
+                run.write()
+            except OSError as error:
+                logger.error(f"Could not write profile {run.path}: {str(error)}")
+        if run.session is not None:
+            with self._lock:
+                run.session.profiled += 1
+                if self.session is run.session and run.session.expired:
+                    self._end()
+
+    def armed(self, scope) -> bool:
+        """Whether a request may be profiled: an active session, or the X-Profile header when enabled"""
+        if self.session is not None:
+            return True
+        return self.enabled and any(name == PROFILE_HEADER for name, _ in scope["headers"])
+
+
+class ProfilingMiddleware:
+    """ASGI middleware running requests under the profiler when a session or header asks for it"""
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.armed(scope):
+            await self.app(scope, receive, send)
+            return
+
+        run = self.profiler.begin(scope)
+        if run is None:
+            await self.app(scope, receive, send)
+            return
+        if run.loop_profile is None:
+            token = current_run.set(run)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                current_run.reset(token)
+                self.profiler.finish(run)
+            return
+
+        async def send_with_file(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-file", os.path.basename(run.path).encode("latin-1"))
+                ]
+            await send(message)
+
+        token = current_run.set(run)
+        run.loop_profile.enable()
+        try:
+            await self.app(scope, receive, send_with_file)
+        finally:
+            run.loop_profile.disable()
+            current_run.reset(token)
+            self.profiler.finish(run)
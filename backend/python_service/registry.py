@@ -0,0 +1,289 @@
+"""
+Resident profile registry for GBHM Service
+Keeps the alumni corpus in memory so match requests only carry the student
+"""
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class ProfileChange(NamedTuple):
+    """One entry of the registry change log"""
+    version: int
+    profile_id: str
+    old: Optional[Dict]
+    new: Optional[Dict]
+
+
+class ReadWriteLock:
+    """Many concurrent readers or one writer"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writing:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._condition:
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class ProfileRegistry:
+    """In-memory profile store with a monotonically increasing corpus version"""
+
+    def __init__(self, kind: str, change_log_size: int = 10000):
+        """
+        Initialize an empty registry
+
+        Args:
+            kind: Profile kind held by this registry (e.g. "alumni")
+            change_log_size: Number of profile changes kept for incremental consumers
+        """
+        self.kind = kind
+        self.version = 0
+        self.change_log_size = change_log_size
+        self._profiles: Dict[str, Dict] = {}
+        self._derived: Dict[str, tuple] = {}
+        self._changes = deque()
+        self._log_floor = 0
+        self._lock = threading.RLock()
+        # Guards in-place updates of derived structures against readers in view()
+        self._derived_lock = ReadWriteLock()
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def __contains__(self, profile_id: str) -> bool:
+        return profile_id in self._profiles
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        """Get a single profile by its userId"""
+        return self._profiles.get(profile_id)
+
+    def profiles(self) -> List[Dict]:
+        """
+        Get a snapshot of all profiles in insertion order
+
+        Returns:
+            List of profile dictionaries
+        """
+        with self._lock:
+            return list(self._profiles.values())
+
+    def versioned_profiles(self) -> Tuple[int, List[Dict]]:
+        """Consistent (corpus version, profiles in insertion order)"""
+        with self._lock:
+            return self.version, list(self._profiles.values())
+
+    def upsert(self, profile: Dict) -> int:
+        """
+        Insert or replace a profile keyed by its userId
+
+        Args:
+            profile: Profile data
+
+        Returns:
+            New corpus version
+        """
+        with self._lock:
+            self.version += 1
+            self._store(profile)
+            return self.version
+
+    def delete(self, profile_id: str) -> Optional[int]:
+        """
+        Remove a profile
+
+        Args:
+            profile_id: userId of the profile to remove
+
+        Returns:
+            New corpus version, or None if the profile was not registered
+        """
+        with self._lock:
+            old = self._profiles.pop(profile_id, None)
+            if old is None:
+                return None
+            self.version += 1
+            self._log(ProfileChange(self.version, profile_id, old, None))
+            return self.version
+
+    def bulk_load(self, profiles: List[Dict], replace: bool = False) -> int:
+        """
+        Load many profiles at once
+
+        Args:
+            profiles: Profile data list
+            replace: Drop the current corpus before loading
+
+        Returns:
+            New corpus version
+        """
+        with self._lock:
+            self.version += 1
+            if replace:
+                # Consumers older than this version must rebuild
+                self._profiles = {}
+                self._changes.clear()
+                self._log_floor = self.version
+            for profile in profiles:
+                self._store(profile)
+            return self.version
+
+    def restore(self, profiles: List[Dict], derived: Dict[str, Any], replay_since: int = 0) -> Optional[int]:
+        """
+        Replace the corpus together with structures already built for it
+
+        Used to swap in a snapshot: readers see either the old corpus and
+        structures or the new ones, never a mix. Changes logged after
+        replay_since (writes the snapshot may not have seen) are applied
+        again on top, unless the snapshot already has them, so they are not
+        rolled back.
+
+        Args:
+            profiles: Profile data list
+            derived: Cache slot name -> structure built from profiles
+            replay_since: Corpus version whose later changes are re-applied
+
+        Returns:
+            Corpus version of the restored profiles (replayed changes come
+            after it), or None if the change log no longer covers
+            replay_since; the corpus is then left as it was
+        """
+        with self._lock:
+            changes = self.changes_since(replay_since)
+            if changes is None:
+                return None
+            version = self.bulk_load(profiles, replace=True)
+            for key, value in derived.items():
+                self._derived[key] = (version, value)
+            for change in changes:
+                if change.new is None:
+                    self.delete(change.profile_id)
+                elif self._profiles.get(change.profile_id) != change.new:
+                    self.upsert(change.new)
+            return version
+
+    def _store(self, profile: Dict):
+        """Store a profile and log the change under the current version"""
+        profile_id = profile['userId']
+        old = self._profiles.get(profile_id)
+        self._profiles[profile_id] = profile
+        self._log(ProfileChange(self.version, profile_id, old, profile))
+
+    def _log(self, change: ProfileChange):
+        """Append to the change log, raising the floor as entries fall off"""
+        self._changes.append(change)
+        while len(self._changes) > self.change_log_size:
+            self._log_floor = self._changes.popleft().version
+
+    def changes_since(self, version: int) -> Optional[List[ProfileChange]]:
+        """
+        Get the profile changes applied after a version
+
+        Args:
+            version: Corpus version the caller is at
+
+        Returns:
+            Changes in order, or None if the log no longer covers that version
+        """
+        with self._lock:
+            if version < self._log_floor:
+                return None
+            return [change for change in self._changes if change.version > version]
+
+    def derive(self, key: str, builder: Callable[[List[Dict]], Any]) -> Any:
+        """
+        Get a structure built from the corpus, rebuilding it on version change
+
+        Args:
+            key: Cache slot name
+            builder: Function building the structure from the profile list
+
+        Returns:
+            Structure built for the current version
+        """
+        with self._lock:
+            cached = self._derived.get(key)
+            if cached is not None and cached[0] == self.version:
+                return cached[1]
+            value = builder(list(self._profiles.values()))
+            self._derived[key] = (self.version, value)
+            return value
+
+    def derive_incremental(self, key: str, builder: Callable[[List[Dict]], Any],
+                           apply: Callable[[Any, ProfileChange], None]) -> Any:
+        """
+        Like derive, but catches up by replaying the change log when possible
+
+        Args:
+            key: Cache slot name
+            builder: Function building the structure from the profile list
+            apply: Function applying one ProfileChange to the structure in place
+
+        Returns:
+            Structure updated to the current version
+        """
+        with self._lock:
+            cached = self._derived.get(key)
+            if cached is not None and cached[0] != self.version:
+                changes = self.changes_since(cached[0])
+                if changes is not None:
+                    with self._derived_lock.write():
+                        for change in changes:
+                            apply(cached[1], change)
+                    self._derived[key] = (self.version, cached[1])
+            return self.derive(key, builder)
+
+    @contextmanager
+    def view(self, key: str, builder: Callable[[List[Dict]], Any],
+             apply: Optional[Callable[[Any, ProfileChange], None]] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        Read a derived structure from another thread, consistently with its version
+
+        Structures updated in place by derive_incremental are not modified
+        while a view is open. Do not call derive/derive_incremental on this
+        registry inside the view.
+
+        Args:
+            key: Cache slot name
+            builder: Function building the structure from the profile list
+            apply: Incremental update function (None = rebuild via derive)
+
+        Yields:
+            (corpus version, structure)
+        """
+        with self._lock:
+            if apply is None:
+                value = self.derive(key, builder)
+            else:
+                value = self.derive_incremental(key, builder, apply)
+            version = self.version
+            self._derived_lock.acquire_read()
+        try:
+            yield version, value
+        finally:
+            self._derived_lock.release_read()
@@ -0,0 +1,167 @@
+"""
+Response serialization for GBHM Service
+Serializes matcher output directly (orjson, optional msgpack) without
+building Pydantic response models, byte-compatible with the default JSON
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/x-msgpack", "application/msgpack")
+
+
+def match_payload(rec: Dict) -> Dict:
+    """
+    One recommendation in MatchResponse shape and field order
+
+    total_score is a float, as MatchResponse declares it.
+    """
+    breakdown = rec['score_breakdown']
+    return {
+        'alumni_id': rec['alumni_id'],
+        'alumni_name': rec['alumni_name'],
+        'total_score': float(rec['total_score']),
+        'score_breakdown': breakdown,
+        'common_skills': breakdown.get('common_skills', []),
+        'common_interests': breakdown.get('common_interests', []),
+        'matching_areas': breakdown.get('matching_areas', []),
+        'explanation': rec.get('explanation')
+    }
+
+
+def matching_result_payload(recommendations: Iterable[Dict], message: str, timestamp: str, total_alumni: int,
+                            processing_time_ms: float, corpus_version: Optional[int] = None,
+                            next_cursor: Optional[str] = None, queue_depth: Optional[int] = None,
+                            queue_wait_ms: Optional[float] = None, shards: Optional[List[Dict]] = None,
+                            candidates: Optional[int] = None) -> Dict:
+    """MatchingResult as a plain dict, fields in model order"""
+    return {
+        'success': True,
+        'message': message,
+        'matches': [match_payload(rec) for rec in recommendations],
+        'timestamp': timestamp,
+        'total_alumni': total_alumni,
+        'processing_time_ms': processing_time_ms,
+        'corpus_version': corpus_version,
+        'next_cursor': next_cursor,
+        'queue_depth': queue_depth,
+        'queue_wait_ms': queue_wait_ms,
+        'shards': shards,
+        'candidates': candidates
+    }
+
+
+def student_match_payload(rec: Dict) -> Dict:
+    """One reverse recommendation in StudentMatchResponse shape and field order"""
+    breakdown = rec['score_breakdown']
+    return {
+        'student_id': rec['student_id'],
+        'student_name': rec['student_name'],
+        'total_score': float(rec['total_score']),
+        'score_breakdown': breakdown,
+        'common_skills': breakdown.get('common_skills', []),
+        'common_interests': breakdown.get('common_interests', []),
+        'matching_areas': breakdown.get('matching_areas', [])
+    }
+
+
+def reverse_matching_result_payload(alumni_id: str, recommendations: Iterable[Dict], message: str, timestamp: str,
+                                    total_students: int, processing_time_ms: float,
+                                    corpus_version: Optional[int] = None, next_cursor: Optional[str] = None,
+                                    queue_depth: Optional[int] = None,
+                                    queue_wait_ms: Optional[float] = None) -> Dict:
+    """ReverseMatchingResult as a plain dict, fields in model order"""
+    return {
+        'success': True,
+        'message': message,
+        'alumni_id': alumni_id,
+        'matches': [student_match_payload(rec) for rec in recommendations],
+        'timestamp': timestamp,
+        'total_students': total_students,
+        'processing_time_ms': processing_time_ms,
+        'corpus_version': corpus_version,
+        'next_cursor': next_cursor,
+        'queue_depth': queue_depth,
+        'queue_wait_ms': queue_wait_ms
+    }
+
+
+def dumps(payload) -> bytes:
+    """
+    Serialize to the same bytes as FastAPI's JSONResponse
+
+    (compact separators, UTF-8 without escaping); orjson when installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(body: bytes, content_type: Optional[str] = None):
+    """
+    Parse a request body sent as JSON or msgpack
+
+    Args:
+        body: Raw request body
+        content_type: Request Content-Type header
+
+    Returns:
+        Decoded data
+
+    Raises:
+        ValueError: Body is not valid for its content type
+    """
+    if content_type and any(media in content_type for media in MSGPACK_MEDIA_TYPES):
+        if msgpack is None:
+            raise ValueError("msgpack request bodies are not supported (msgpack is not installed)")
+        try:
+            return msgpack.unpackb(body)
+        except Exception as error:
+            raise ValueError(f"Invalid msgpack body: {error}")
+    try:
+        return orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError as error:
+        raise ValueError(f"Invalid JSON body: {error}")
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """Whether the client asked for msgpack and it is available"""
+    return msgpack is not None and bool(accept) and any(media in accept for media in MSGPACK_MEDIA_TYPES)
+
+
+def media_type(accept: Optional[str]) -> str:
+    """Response media type render() picks for an Accept header"""
+    return MSGPACK_MEDIA_TYPES[0] if wants_msgpack(accept) else JSON_MEDIA_TYPE
+
+
+def render(payload, accept: Optional[str] = None, status_code: int = 200, headers: Optional[Dict] = None) -> Response:
+    """
+    Serialize a payload for the client's Accept header
+
+    Args:
+        payload: JSON-compatible data
+        accept: Request Accept header
+        status_code: HTTP status
+        headers: Extra response headers
+
+    Returns:
+        msgpack response if asked for (and installed), JSON otherwise
+    """
+    if wants_msgpack(accept):
+        content = msgpack.packb(payload)
+    else:
+        content = dumps(payload)
+    return Response(content=content, status_code=status_code, media_type=media_type(accept), headers=headers)
@@ -0,0 +1,242 @@
+"""
+Sharded scatter-gather matching for GBHM Service
+Partitions the resident alumni corpus across worker processes; each shard
+ranks its alumni locally and the coordinator k-way merges the shard top-k
+"""
+
+import heapq
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from python_service.registry import ProfileRegistry, ReadWriteLock
+from python_service.skill_graph import Reach
+from python_service.sparse_engine import SparseMatchEngine
+from python_service.weights import WeightProfile
+
+# Rebalance when the last shard (which takes all inserts) outgrows the average by this factor
+REBALANCE_FACTOR = 2.0
+
+
+# ---- Shard process side ----
+
+_shard = None
+
+
+class _ShardState:
+    """Alumni slice owned by one shard process"""
+
+    def __init__(self, profiles: List[Dict], weights: Dict):
+        self.profiles = {profile['userId']: profile for profile in profiles}
+        self.weights = weights
+        self.engine: Optional[SparseMatchEngine] = None
+
+    def apply(self, profile_id: str, profile: Optional[Dict]):
+        # Dict order follows the registry: updates keep their row, inserts append
+        if profile is None:
+            self.profiles.pop(profile_id, None)
+        else:
+            self.profiles[profile_id] = profile
+        self.engine = None
+
+    def prepare(self) -> SparseMatchEngine:
+        if self.engine is None:
+            self.engine = SparseMatchEngine(list(self.profiles.values()), self.weights)
+        return self.engine
+
+    def top(self, student: Dict, k: Optional[int], min_score: Optional[float], profile: Optional[WeightProfile],
+            reach_tokens: Optional[Tuple[List[str], object]]) -> Tuple[List[Tuple[int, Dict]], float]:
+        started_at = time.time()
+        # Vocabulary IDs are per process: reach arrives keyed by token
+        reach = Reach.from_tokens(*reach_tokens) if reach_tokens is not None else None
+        ranked = self.prepare().get_ranked_recommendations(student, k, min_score, profile=profile, reach=reach)
+        return ranked, (time.time() - started_at) * 1000
+
+
+def _init_shard(profiles: List[Dict], weights: Dict):
+    global _shard
+    _shard = _ShardState(profiles, weights)
+
+
+def _shard_prepare() -> int:
+    return len(_shard.prepare())
+
+
+def _shard_apply(profile_id: str, profile: Optional[Dict]) -> int:
+    _shard.apply(profile_id, profile)
+    return len(_shard.profiles)
+
+
+def _shard_top(student: Dict, k: Optional[int], min_score: Optional[float], profile: Optional[WeightProfile],
+               reach_tokens: Optional[Tuple[List[str], object]]):
+    return _shard.top(student, k, min_score, profile, reach_tokens)
+
+
+# ---- Coordinator side ----
+
+class ShardedMatcher:
+    """Scatter-gather GBHM matching over a registry corpus split across processes"""
+
+    def __init__(self, shard_count: int, weights: Dict):
+        """
+        Args:
+            shard_count: Number of shard processes
+            weights: GBHM weights (GBHMMatcher.weights)
+        """
+        self.shard_count = shard_count
+        self.weights = dict(weights)
+        self.version: Optional[int] = None
+        self._shards: List[ProcessPoolExecutor] = []
+        self._sizes: List[int] = []
+        self._owner: Dict[str, int] = {}
+        self._sync_lock = threading.Lock()
+        # Queries read all shards at one version; syncs write
+        self._shards_lock = ReadWriteLock()
+        self._context = multiprocessing.get_context("spawn")
+
+    def __len__(self) -> int:
+        return sum(self._sizes)
+
+    def sync(self, registry: ProfileRegistry):
+        """
+        Bring the shards up to the registry's current version
+
+        Changes from the registry log are forwarded to the owning shard,
+        which re-encodes only its own slice; a full re-partition happens on
+        first use, when the log no longer covers the shard version, or when
+        inserts have unbalanced the last shard.
+        """
+        with self._sync_lock:
+            target = registry.version
+            if self.version == target:
+                return
+
+            changes = registry.changes_since(self.version) if self.version is not None else None
+            if changes is not None and self._balanced_after(changes):
+                with self._shards_lock.write():
+                    self._apply(changes)
+                    self.version = max([target] + [change.version for change in changes])
+                return
+
+            version, profiles = registry.versioned_profiles()
+            shards, sizes, owner = self._partition(profiles)
+            with self._shards_lock.write():
+                old_shards = self._shards
+                self._shards, self._sizes, self._owner, self.version = shards, sizes, owner, version
+            for shard in old_shards:
+                shard.shutdown(wait=False, cancel_futures=True)
+
+    def _balanced_after(self, changes) -> bool:
+        inserts = sum(1 for change in changes if change.old is None and change.new is not None)
+        average = (len(self) + inserts) / self.shard_count
+        return self._sizes[-1] + inserts <= max(REBALANCE_FACTOR * average, 1)
+
+    def _apply(self, changes):
+        """Forward registry changes to their shards (under the write lock)"""
+        pending = []
+        for change in changes:
+            shard = self._owner.get(change.profile_id)
+            if change.new is None:
+                self._owner.pop(change.profile_id, None)
+            elif shard is None:
+                # The registry appends new profiles, so the last shard keeps corpus order
+                shard = self.shard_count - 1
+                self._owner[change.profile_id] = shard
+            if shard is not None:
+                pending.append((shard, self._shards[shard].submit(_shard_apply, change.profile_id, change.new)))
+        for shard, future in pending:
+            self._sizes[shard] = future.result()
+
+    def _partition(self, profiles: List[Dict]):
+        """Start shard processes over contiguous slices of the corpus"""
+        shards, sizes, owner = [], [], {}
+        for shard in range(self.shard_count):
+            start = len(profiles) * shard // self.shard_count
+            end = len(profiles) * (shard + 1) // self.shard_count
+            part = profiles[start:end]
+            shards.append(ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=self._context,
+                initializer=_init_shard,
+                initargs=(part, self.weights)
+            ))
+            sizes.append(len(part))
+            owner.update((profile['userId'], shard) for profile in part)
+        # Start the processes and encode every slice before serving
+        for future in [executor.submit(_shard_prepare) for executor in shards]:
+            future.result()
+        return shards, sizes, owner
+
+    def get_recommendations(self, registry: ProfileRegistry, student: Dict, top_n: Optional[int] = None,
+                            min_score: Optional[float] = None,
+                            offset: int = 0,
+                            profile: Optional[WeightProfile] = None,
+                            reach: Optional[Reach] = None) -> Tuple[List[Dict], int, int, List[Dict]]:
+        """
+        Rank the registry corpus for a student across all shards
+
+        Each shard returns its local top (offset + top_n); merging on
+        (-score, shard, row) reproduces the single-process ranking, since
+        shards hold contiguous registry slices and ties go to corpus order.
+
+        Args:
+            registry: Alumni registry the shards mirror
+            student: Student profile data
+            top_n: Number of recommendations (None = all)
+            min_score: Drop alumni scoring below this
+            offset: Number of ranked rows to skip (pagination)
+            profile: Weight profile (default: the shard weights)
+            reach: Skill graph reach of the student (computed once, sent to every shard)
+
+        Returns:
+            (recommendations, number of alumni scored, corpus version,
+             per-shard {"shard", "alumni", "matches", "latency_ms", "compute_ms"})
+        """
+        self.sync(registry)
+        k = offset + top_n if top_n else None
+        reach_tokens = reach.to_tokens() if reach is not None else None
+
+        self._shards_lock.acquire_read()
+        try:
+            version, sizes = self.version, list(self._sizes)
+            sent_at = time.time()
+            done_at = [sent_at] * len(sizes)
+            futures = []
+            for shard, executor in enumerate(self._shards):
+                future = executor.submit(_shard_top, student, k, min_score, profile, reach_tokens)
+                future.add_done_callback(lambda _, shard=shard: done_at.__setitem__(shard, time.time()))
+                futures.append(future)
+            results = [future.result() for future in futures]
+        finally:
+            self._shards_lock.release_read()
+
+        timings = [
+            {
+                'shard': shard,
+                'alumni': sizes[shard],
+                'matches': len(ranked),
+                'latency_ms': round((done_at[shard] - sent_at) * 1000, 2),
+                'compute_ms': round(compute_ms, 2)
+            }
+            for shard, (ranked, compute_ms) in enumerate(results)
+        ]
+
+        merged = heapq.merge(
+            *[[((-rec['total_score'], shard, row), rec) for row, rec in ranked]
+              for shard, (ranked, _) in enumerate(results)],
+            key=lambda item: item[0]
+        )
+        recommendations = [rec for _, rec in itertools.islice(merged, offset, k)]
+        return recommendations, sum(sizes), version, timings
+
+    def stats(self) -> Dict:
+        """Shard sizes and the corpus version they hold"""
+        return {'shard_count': self.shard_count, 'version': self.version, 'sizes': list(self._sizes)}
+
+    def shutdown(self):
+        """Stop the shard processes"""
+        for shard in self._shards:
+            shard.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,215 @@
+"""
+Skill co-occurrence graph for GBHM bridge scoring
+Skills and interests that appear together across profiles are linked; 2-hop
+reach weights are precomputed so a student's bridge scores against every
+alumnus cost one sparse row sum plus one mat-vec per component
+
+Edge weight between tokens i and j is their co-occurrence count divided by
+sqrt(count_i * count_j) (cosine), pruned to the strongest neighbors. Reach is
+max(edge, decay * two-hop path weight), capped at 1.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from python_service.vocabulary import UNKNOWN, EncodedProfile, current_vocabulary
+
+# Encoded components the graph is built over and bridges between
+GRAPH_COMPONENTS = ('skills', 'interests')
+
+
+class Reach(NamedTuple):
+    """Tokens a student reaches through the graph, beyond their own"""
+    ids: np.ndarray
+    strengths: np.ndarray
+
+    def to_tokens(self) -> Tuple[List[str], np.ndarray]:
+        """Reach keyed by token instead of vocabulary ID, for processes with their own vocabulary"""
+        return [current_vocabulary().token(token_id) for token_id in self.ids.tolist()], self.strengths
+
+    @classmethod
+    def from_tokens(cls, tokens: List[str], strengths: np.ndarray) -> "Reach":
+        """Inverse of to_tokens in this process; tokens it has never seen are dropped"""
+        ids = np.array([current_vocabulary().lookup(token) for token in tokens], dtype=np.int64)
+        known = ids != UNKNOWN
+        return cls(ids[known], np.asarray(strengths)[known])
+
+
+def _top_per_row(matrix: sparse.csr_matrix, limit: int) -> sparse.csr_matrix:
+    """Keep the largest `limit` entries of every row"""
+    matrix = matrix.tocsr()
+    matrix.sum_duplicates()
+    rows, cols, values = [], [], []
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        if start == end:
+            continue
+        row_values = matrix.data[start:end]
+        keep = np.argsort(-row_values, kind='stable')[:limit]
+        rows.append(np.full(len(keep), row, dtype=np.int64))
+        cols.append(matrix.indices[start:end][keep])
+        values.append(row_values[keep])
+    if not rows:
+        return sparse.csr_matrix(matrix.shape, dtype=np.float64)
+    return sparse.csr_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+        shape=matrix.shape
+    )
+
+
+class SkillGraph:
+    """Precomputed 2-hop reach between skill/interest tokens (vocabulary IDs)"""
+
+    def __init__(self, adjacency: sparse.csr_matrix, reach: sparse.csr_matrix, profiles: int,
+                 source_versions: Optional[Tuple] = None):
+        """
+        Args:
+            adjacency: Pruned 1-hop edge weights (tokens x tokens)
+            reach: 2-hop reach weights (tokens x tokens), zero diagonal
+            profiles: Number of profiles the graph was built from
+            source_versions: Registry versions the graph was built from
+        """
+        self.adjacency = adjacency
+        self.reach_matrix = reach
+        self.profiles = profiles
+        self.source_versions = source_versions
+        self.built_at = time.time()
+
+    @property
+    def width(self) -> int:
+        return self.reach_matrix.shape[0]
+
+    @classmethod
+    def build(cls, encoded_profiles: Iterable[EncodedProfile], width: int, min_cooccurrence: int = 2,
+              neighbors: int = 20, decay: float = 0.5, source_versions: Optional[Tuple] = None) -> "SkillGraph":
+        """
+        Build the graph from encoded profiles of both sides
+
+        Args:
+            encoded_profiles: Encoded alumni and student profiles
+            width: Vocabulary size (every token ID is below it)
+            min_cooccurrence: Profiles two tokens must share to be linked
+            neighbors: Strongest edges kept per token (1-hop and 2-hop)
+            decay: Weight of a 2-hop path relative to a direct edge
+            source_versions: Registry versions the profiles were taken from
+
+        Returns:
+            SkillGraph
+        """
+        indptr, indices = [0], []
+        for encoded in encoded_profiles:
+            tokens = set()
+            for component in GRAPH_COMPONENTS:
+                tokens.update(getattr(encoded, component))
+            indices.extend(sorted(tokens))
+            indptr.append(len(indices))
+        width = max(width, 1)
+        occurrences = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float64), np.array(indices, dtype=np.int64), np.array(indptr)),
+            shape=(len(indptr) - 1, width)
+        )
+
+        counts = (occurrences.T @ occurrences).tocoo()
+        frequency = np.zeros(width)
+        diagonal = counts.row == counts.col
+        frequency[counts.row[diagonal]] = counts.data[diagonal]
+
+        # Cosine normalization: count_ij / sqrt(count_i * count_j)
+        linked = ~diagonal & (counts.data >= min_cooccurrence)
+        rows, cols = counts.row[linked], counts.col[linked]
+        norm = np.sqrt(np.maximum(frequency, 1))
+        adjacency = _top_per_row(sparse.csr_matrix(
+            (counts.data[linked] / (norm[rows] * norm[cols]), (rows, cols)),
+            shape=(width, width)
+        ), neighbors)
+
+        two_hop = (adjacency @ adjacency) * decay
+        two_hop.data = np.minimum(two_hop.data, 1.0)
+        reach = adjacency.maximum(two_hop).tocoo()
+        off_diagonal = reach.row != reach.col
+        reach = _top_per_row(sparse.csr_matrix(
+            (reach.data[off_diagonal], (reach.row[off_diagonal], reach.col[off_diagonal])),
+            shape=(width, width)
+        ), neighbors)
+
+        return cls(adjacency, reach, occurrences.shape[0], source_versions)
+
+    def reach(self, encoded_student: EncodedProfile) -> Reach:
+        """
+        Reach of a student's skills and interests: one sparse row sum
+
+        Strengths are summed over the student's tokens and capped at 1;
+        tokens the student already has are excluded (exact matches score
+        them).
+        """
+        own = set()
+        for component in GRAPH_COMPONENTS:
+            own.update(token_id for token_id in getattr(encoded_student, component) if token_id < self.width)
+        if not own:
+            return Reach(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+
+        summed = self.reach_matrix[sorted(own)].sum(axis=0).A1
+        summed[sorted(own)] = 0
+        ids = np.flatnonzero(summed)
+        return Reach(ids, np.minimum(summed[ids], 1.0))
+
+    def neighbors(self, token_id: int, limit: int = 10) -> List[Tuple[int, float, float]]:
+        """(token ID, edge weight, reach weight) of a token's strongest reach, strongest first"""
+        if not 0 <= token_id < self.width:
+            return []
+        row = self.reach_matrix.getrow(token_id)
+        edges = self.adjacency.getrow(token_id).toarray().ravel()
+        order = np.argsort(-row.data, kind='stable')[:limit]
+        return [(int(row.indices[i]), float(edges[row.indices[i]]), float(row.data[i])) for i in order]
+
+    def stats(self) -> Dict:
+        """Graph size and build time"""
+        return {
+            'tokens': int(np.count_nonzero(np.diff(self.reach_matrix.indptr))),
+            'edges': int(self.adjacency.nnz),
+            'reach_entries': int(self.reach_matrix.nnz),
+            'profiles': self.profiles,
+            'source_versions': list(self.source_versions) if self.source_versions else None,
+            'built_at': self.built_at
+        }
+
+
+class SkillGraphStore:
+    """Holds the current graph; rebuilds replace it in one reference swap"""
+
+    def __init__(self):
+        # (version, graph), replaced as one tuple so readers see a consistent pair
+        self.current: Tuple[int, Optional[SkillGraph]] = (0, None)
+        self._build_lock = threading.Lock()
+
+    @property
+    def graph(self) -> Optional[SkillGraph]:
+        return self.current[1]
+
+    def rebuild(self, builder) -> Optional[SkillGraph]:
+        """
+        Build a new graph and swap it in
+
+        Requests keep using the graph they read until they finish. A call
+        made while another rebuild runs returns None without building.
+
+        Args:
+            builder: Callable returning a SkillGraph (or None to keep the current one)
+        """
+        if not self._build_lock.acquire(blocking=False):
+            return None
+        try:
+            graph = builder()
+            if graph is not None:
+                self.current = (self.current[0] + 1, graph)
+            return graph
+        finally:
+            self._build_lock.release()
+
+    @property
+    def building(self) -> bool:
+        return self._build_lock.locked()
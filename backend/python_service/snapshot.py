@@ -0,0 +1,198 @@
+"""
+Memory-mapped alumni corpus snapshots for GBHM Service
+Writes the encoded corpus (vocabulary, CSR arrays, profile order) to a
+versioned directory that every worker maps read-only instead of re-encoding
+
+Layout:
+    <directory>/CURRENT                 name of the newest complete snapshot
+    <directory>/snapshot-000042/
+        manifest.json                   format, corpus version, sizes, array names
+        vocabulary.json                 tokens in vocabulary ID order
+        profiles.json                   alumni profiles in row order
+        <component>.<array>.npy         SparseMatchEngine.arrays()
+
+Snapshots are written to a temporary directory and renamed into place, then
+CURRENT is replaced atomically, so readers never see a partial snapshot.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from python_service.serialization import dumps, loads
+from python_service.sparse_engine import SparseMatchEngine
+from python_service.vocabulary import vocabulary
+
+SNAPSHOT_FORMAT = 1
+
+CURRENT_FILE = "CURRENT"
+
+SNAPSHOT_NAME = re.compile(r"^snapshot-(\d+)$")
+
+
+class Snapshot(NamedTuple):
+    """A loaded snapshot"""
+    name: str
+    corpus_version: int
+    profiles: List[Dict]
+    engine: SparseMatchEngine
+
+
+def _snapshot_number(name: Optional[str]) -> int:
+    match = SNAPSHOT_NAME.match(name or "")
+    return int(match.group(1)) if match else -1
+
+
+def _write_file(path: str, data: bytes):
+    with open(path, "wb") as output:
+        output.write(data)
+        output.flush()
+        os.fsync(output.fileno())
+
+
+class SnapshotStore:
+    """Directory of versioned snapshots, shared by all service workers"""
+
+    def __init__(self, directory: str, keep: int = 3):
+        """
+        Args:
+            directory: Snapshot directory
+            keep: Number of newest snapshots kept when writing (older ones are removed)
+        """
+        self.directory = directory
+        self.keep = max(keep, 1)
+
+    def snapshots(self) -> List[str]:
+        """Names of complete snapshots, oldest first"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted((name for name in names if SNAPSHOT_NAME.match(name)), key=_snapshot_number)
+
+    def current(self) -> Optional[str]:
+        """Name of the snapshot CURRENT points to, if any"""
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE)) as current_file:
+                name = current_file.read().strip()
+        except FileNotFoundError:
+            return None
+        return name if SNAPSHOT_NAME.match(name) else None
+
+    def write(self, engine: SparseMatchEngine, corpus_version: int) -> str:
+        """
+        Write an engine's corpus as a new snapshot and make it current
+
+        Args:
+            engine: Engine built from the corpus (its alumni are the profiles)
+            corpus_version: Registry version the engine was built from
+
+        Returns:
+            Snapshot name
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.directory)
+        try:
+            os.chmod(staging, 0o755)
+            arrays = engine.arrays()
+            for array_name, array in arrays.items():
+                np.save(os.path.join(staging, f"{array_name}.npy"), np.ascontiguousarray(array))
+
+            tokens = vocabulary.tokens()[:engine.width]
+            _write_file(os.path.join(staging, "vocabulary.json"), dumps(tokens))
+            _write_file(os.path.join(staging, "profiles.json"), dumps(engine.alumni))
+            _write_file(os.path.join(staging, "manifest.json"), dumps({
+                "format": SNAPSHOT_FORMAT,
+                "corpus_version": corpus_version,
+                "created_at": time.time(),
+                "total_alumni": len(engine),
+                "vocabulary_size": len(tokens),
+                "arrays": sorted(arrays)
+            }))
+
+            # Claim the next number; renaming onto an existing snapshot fails
+            while True:
+                existing = self.snapshots()
+                name = f"snapshot-{_snapshot_number(existing[-1]) + 1 if existing else 1:06d}"
+                try:
+                    os.rename(staging, os.path.join(self.directory, name))
+                    break
+                except OSError:
+                    if not os.path.exists(os.path.join(self.directory, name)):
+                        raise
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        # Another worker may have published a newer snapshot meanwhile
+        if _snapshot_number(name) > _snapshot_number(self.current()):
+            current_path = os.path.join(self.directory, CURRENT_FILE)
+            _write_file(f"{current_path}.{os.getpid()}.tmp", name.encode("utf-8"))
+            os.replace(f"{current_path}.{os.getpid()}.tmp", current_path)
+
+        self._prune()
+        return name
+
+    def _prune(self):
+        """Remove all but the newest snapshots (mapped files stay readable until unmapped)"""
+        current = self.current()
+        for name in self.snapshots()[:-self.keep]:
+            if name != current:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def load(self, name: str, weights: Dict) -> Snapshot:
+        """
+        Load a snapshot, memory-mapping its arrays
+
+        The snapshot vocabulary is adopted by the process vocabulary. If this
+        process already assigned conflicting IDs, column indices are
+        translated, which copies those arrays instead of mapping them.
+
+        Args:
+            name: Snapshot name
+            weights: GBHM weights for the engine
+
+        Returns:
+            Snapshot with its engine and profiles
+        """
+        path = os.path.join(self.directory, name)
+        with open(os.path.join(path, "manifest.json")) as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format in {name}: {manifest.get('format')}")
+
+        with open(os.path.join(path, "vocabulary.json"), "rb") as vocabulary_file:
+            tokens = loads(vocabulary_file.read())
+        with open(os.path.join(path, "profiles.json"), "rb") as profiles_file:
+            profiles = loads(profiles_file.read())
+
+        arrays = {
+            array_name: np.load(os.path.join(path, f"{array_name}.npy"), mmap_mode="r")
+            for array_name in manifest["arrays"]
+        }
+
+        width = len(tokens)
+        remap = vocabulary.adopt(tokens)
+        if remap is not None:
+            remap = np.asarray(remap, dtype=np.int64)
+            width = len(vocabulary)
+            for array_name, array in arrays.items():
+                if array_name.endswith(".indices"):
+                    arrays[array_name] = remap[array].astype(array.dtype)
+                elif array_name.endswith(".data"):
+                    # Sorted along with the indices below
+                    arrays[array_name] = np.array(array)
+
+        engine = SparseMatchEngine.from_arrays(profiles, weights, arrays, width)
+        if remap is not None:
+            for matrix in engine.matrices.values():
+                matrix.has_sorted_indices = False
+                matrix.sort_indices()
+
+        return Snapshot(name, manifest["corpus_version"], profiles, engine)
@@ -0,0 +1,465 @@
+"""
+Vectorized GBHM scoring engine
+Encodes the alumni corpus as sparse one-hot matrices and scores a student
+against every alumnus with a handful of sparse mat-vec products
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from python_service.skill_graph import GRAPH_COMPONENTS, Reach
+from python_service.vocabulary import EncodedProfile, current_vocabulary, encode_alumni, encode_student
+from python_service.weights import VECTOR_KEYS, WeightProfile, compile_profile
+
+# Breakdown component -> weight key; each component is an EncodedProfile field
+COMPONENTS = {
+    'university': 'university',
+    'industry': 'industry',
+    'degree': 'degree',
+    'skills': 'skill',
+    'interests': 'interest',
+    'mentoring': 'mentoring',
+    'company': 'company',
+}
+
+# Weight key -> component; with availability last this is the overlaps() row order
+WEIGHT_COMPONENTS = {weight_key: component for component, weight_key in COMPONENTS.items()}
+
+SCALAR_COMPONENTS = ('university', 'industry', 'degree')
+
+# Explanation list stored in the breakdown for each overlap component
+COMMON_LISTS = {
+    'skills': 'common_skills',
+    'interests': 'common_interests',
+    'mentoring': 'matching_areas',
+}
+
+
+def rank_rows(scores: np.ndarray, top_n: Optional[int] = None, min_score: Optional[float] = None) -> np.ndarray:
+    """
+    Rank rows by descending score, ties in row order
+
+    Uses a partial partition so only the selected rows are sorted.
+
+    Args:
+        scores: Per-row scores
+        top_n: Number of rows to keep (None = all)
+        min_score: Drop rows scoring below this
+
+    Returns:
+        Row indices in ranked order
+    """
+    rows = np.arange(len(scores))
+    if min_score is not None:
+        rows = rows[scores >= min_score]
+    candidate_scores = scores[rows]
+
+    if top_n and top_n < len(rows):
+        kth = np.partition(candidate_scores, len(rows) - top_n)[len(rows) - top_n]
+        above = rows[candidate_scores > kth]
+        ties = rows[candidate_scores == kth][:top_n - len(above)]
+        rows = np.concatenate([above, ties])
+        candidate_scores = scores[rows]
+
+    return rows[np.lexsort((rows, -candidate_scores))]
+
+
+class SparseMatchEngine:
+    """Sparse-matrix GBHM scorer over a fixed alumni corpus"""
+
+    def __init__(self, alumni_list: List[Dict], weights: Dict,
+                 encoded_alumni: Optional[List[EncodedProfile]] = None):
+        """
+        Encode the alumni corpus
+
+        Columns are IDs of the current vocabulary (the process one, or a
+        request's transient_vocabulary), so one matrix per component is
+        enough and no per-engine token tables are kept.
+
+        Args:
+            alumni_list: Alumni profiles (order defines tie-breaking)
+            weights: GBHM weights (GBHMMatcher.weights)
+            encoded_alumni: encode_alumni output for alumni_list, if cached
+        """
+        self.alumni = list(alumni_list)
+        self.weights = dict(weights)
+        self.profile = compile_profile('engine', self.weights)
+        if encoded_alumni is None:
+            encoded_alumni = [encode_alumni(alumni) for alumni in self.alumni]
+        self.width = max(len(current_vocabulary()), 1)
+        self.matrices: Dict[str, sparse.csr_matrix] = {}
+
+        for component in SCALAR_COMPONENTS:
+            self._encode(component, [[getattr(e, component)] for e in encoded_alumni])
+
+        for component in COMMON_LISTS:
+            self._encode(component, [sorted(getattr(e, component)) for e in encoded_alumni])
+
+        # Company only counts when the alumnus has one
+        self._encode('company', [[e.company] if e.company is not None else [] for e in encoded_alumni])
+
+        self.available = np.array([e.available for e in encoded_alumni], dtype=bool)
+        self._stacked: Optional[sparse.csr_matrix] = None
+
+    @classmethod
+    def from_arrays(cls, alumni_list: List[Dict], weights: Dict, arrays: Dict[str, np.ndarray],
+                    width: int) -> "SparseMatchEngine":
+        """
+        Rebuild an engine from arrays() output without re-encoding the corpus
+
+        The arrays are used as given (no copy), so memory-mapped arrays stay
+        shared with the page cache.
+
+        Args:
+            alumni_list: Alumni profiles, in the order the arrays were built
+            weights: GBHM weights
+            arrays: arrays() output, with column IDs valid in the global vocabulary
+            width: Number of matrix columns (>= the largest column ID + 1)
+        """
+        engine = cls.__new__(cls)
+        engine.alumni = list(alumni_list)
+        engine.weights = dict(weights)
+        engine.profile = compile_profile('engine', engine.weights)
+        engine.width = max(width, 1)
+        engine.matrices = {
+            component: sparse.csr_matrix(
+                (arrays[f'{component}.data'], arrays[f'{component}.indices'], arrays[f'{component}.indptr']),
+                shape=(len(engine.alumni), engine.width),
+                copy=False
+            )
+            for component in COMPONENTS
+        }
+        engine.available = arrays['available']
+        engine._stacked = None
+        return engine
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """CSR arrays of every component plus availability, for from_arrays"""
+        arrays = {'available': self.available}
+        for component, matrix in self.matrices.items():
+            arrays[f'{component}.data'] = matrix.data
+            arrays[f'{component}.indices'] = matrix.indices
+            arrays[f'{component}.indptr'] = matrix.indptr
+        return arrays
+
+    def __len__(self) -> int:
+        return len(self.alumni)
+
+    def _encode(self, component: str, rows: List[List[int]]):
+        """Build the one-hot CSR matrix for one component"""
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids in rows], out=indptr[1:])
+        indices = np.fromiter((i for ids in rows for i in ids), dtype=np.int32, count=int(indptr[-1]))
+
+        self.matrices[component] = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), indices, indptr),
+            shape=(len(rows), self.width)
+        )
+
+    def _student_columns(self, student: Dict) -> Dict[str, np.ndarray]:
+        """Encode the student as column IDs per component, dropping IDs no alumnus has"""
+        encoded = encode_student(student)
+        columns = {}
+        for component in COMPONENTS:
+            value = getattr(encoded, component)
+            ids = sorted(value) if component in COMMON_LISTS else [value]
+            columns[component] = np.array([i for i in ids if 0 <= i < self.width], dtype=np.int32)
+        return columns
+
+    def score_components(self, student: Dict, profile: Optional[WeightProfile] = None) -> Dict[str, np.ndarray]:
+        """
+        Score one student against every alumnus
+
+        Args:
+            student: Student profile data
+            profile: Weight profile (default: the engine weights)
+
+        Returns:
+            Component name -> per-alumnus score array, plus 'total_score'
+        """
+        return self._score_columns(self._student_columns(student), profile)
+
+    def overlaps(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Unweighted per-component overlap counts of a student with every alumnus
+
+        Args:
+            columns: _student_columns output
+
+        Returns:
+            (len(VECTOR_KEYS) x alumni) array in VECTOR_KEYS order: shared
+            tokens per component, then availability as 0/1
+        """
+        counts = np.empty((len(VECTOR_KEYS), len(self.alumni)), dtype=np.int64)
+        for i, weight_key in enumerate(VECTOR_KEYS[:-1]):
+            component = WEIGHT_COMPONENTS[weight_key]
+            vector = np.zeros(self.width, dtype=np.int32)
+            vector[columns[component]] = 1
+            counts[i] = self.matrices[component] @ vector
+        counts[-1] = self.available
+        return counts
+
+    def _score_columns(self, columns: Dict[str, np.ndarray],
+                       profile: Optional[WeightProfile] = None) -> Dict[str, np.ndarray]:
+        """Score encoded student columns against every alumnus"""
+        vector = (profile or self.profile).vector
+        counts = self.overlaps(columns)
+
+        components = {
+            WEIGHT_COMPONENTS.get(weight_key, weight_key): counts[i] * vector[i]
+            for i, weight_key in enumerate(VECTOR_KEYS)
+        }
+        components['total_score'] = vector @ counts
+        return components
+
+    def _stacked_matrix(self) -> sparse.csr_matrix:
+        """All components side by side, each pre-multiplied by its weight"""
+        if self._stacked is None:
+            self._stacked = sparse.hstack(
+                [self.matrices[component] * self.weights[weight_key] for component, weight_key in COMPONENTS.items()],
+                format='csr'
+            )
+        return self._stacked
+
+    def score_block(self, students: List[Dict]) -> Tuple[np.ndarray, List[Dict[str, np.ndarray]]]:
+        """
+        Total scores of a block of students against every alumnus
+
+        One sparse matrix-matrix product of the stacked, weighted alumni
+        components with the block's stacked student matrix.
+
+        Args:
+            students: Student profiles
+
+        Returns:
+            (students x alumni total score array,
+             per-student column IDs for build_recommendation)
+        """
+        columns = [self._student_columns(student) for student in students]
+
+        student_ids = []
+        for c in columns:
+            student_ids.append(np.concatenate([
+                c[component] + offset * self.width
+                for offset, component in enumerate(COMPONENTS)
+            ]).astype(np.int64))
+
+        indptr = np.zeros(len(students) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids in student_ids], out=indptr[1:])
+        indices = np.concatenate(student_ids) if student_ids else np.zeros(0, dtype=np.int64)
+        block = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), indices, indptr),
+            shape=(len(students), self.width * len(COMPONENTS))
+        )
+
+        # Out of place: a fractional availability weight promotes an integral product
+        total = (block @ self._stacked_matrix().T).toarray() + self.available * self.weights['availability']
+        return total, columns
+
+    def get_block_recommendations(self, students: List[Dict], top_n: Optional[int] = None,
+                                  min_score: Optional[float] = None) -> List[List[Dict]]:
+        """
+        get_recommendations for every student of a block
+
+        Args:
+            students: Student profiles
+            top_n: Number of recommendations per student (None = all)
+            min_score: Drop alumni scoring below this
+
+        Returns:
+            One recommendation list per student, in input order
+        """
+        total, columns = self.score_block(students)
+        results = []
+
+        for j in range(len(students)):
+            scores = total[j]
+            order = rank_rows(scores, top_n, min_score)
+            student_ids = self.column_sets(columns[j])
+            results.append([
+                self.build_recommendation(row, scores[row].item(), student_ids)
+                for row in order.tolist()
+            ])
+
+        return results
+
+    def block_size(self, memory_budget_bytes: int) -> int:
+        """Students per score_block call that fit a memory budget"""
+        bytes_per_student = max(len(self.alumni), 1) * 8 * 3
+        return max(1, memory_budget_bytes // bytes_per_student)
+
+    def _shared(self, component: str, row: int, student_ids: set) -> List[int]:
+        """Column IDs an alumnus shares with the student for one component, ascending"""
+        matrix = self.matrices[component]
+        row_columns = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]].tolist()
+        return [c for c in row_columns if c in student_ids]
+
+    def bridge_strengths(self, reach: Reach) -> np.ndarray:
+        """
+        Unweighted bridge score of every alumnus: one mat-vec per graph component
+
+        Args:
+            reach: SkillGraph.reach of the student
+
+        Returns:
+            Per-alumnus sum of reach strengths over their skills and interests
+        """
+        keep = reach.ids < self.width
+        vector = np.zeros(self.width, dtype=np.float64)
+        vector[reach.ids[keep]] = reach.strengths[keep]
+        strengths = np.zeros(len(self.alumni), dtype=np.float64)
+        for component in GRAPH_COMPONENTS:
+            strengths += self.matrices[component] @ vector
+        return strengths
+
+    @staticmethod
+    def weighted_bridge(strengths: np.ndarray, weight) -> np.ndarray:
+        """Bridge component of the score, rounded to cents of a point"""
+        return np.round(strengths * weight, 2)
+
+    @staticmethod
+    def column_sets(columns: Dict[str, np.ndarray]) -> Dict[str, set]:
+        """Student column IDs as sets, for build_recommendation"""
+        return {component: set(ids.tolist()) for component, ids in columns.items()}
+
+    def build_recommendation(self, row: int, total_score, student_ids: Dict[str, set],
+                             profile: Optional[WeightProfile] = None,
+                             bridge: Optional[Tuple[np.ndarray, set]] = None) -> Dict:
+        """
+        Build the get_recommendations dict for one alumnus row
+
+        The breakdown is recomputed from this row's shared columns, so only
+        totals are needed for the ranking pass.
+
+        Args:
+            row: Alumni row
+            total_score: Row total from the ranking pass
+            student_ids: column_sets of the student
+            profile: Weight profile the total was scored with (default: the engine weights)
+            bridge: (weighted_bridge scores, reached token IDs) when the total includes a bridge
+        """
+        weights = (profile or self.profile).weights
+        alumni = self.alumni[row]
+        breakdown = {}
+        for name in ('university', 'industry', 'degree', 'skills', 'interests', 'mentoring', 'company'):
+            shared = self._shared(name, row, student_ids[name])
+            breakdown[name] = len(shared) * weights[COMPONENTS[name]]
+            if name in COMMON_LISTS:
+                breakdown[COMMON_LISTS[name]] = current_vocabulary().decode(shared)
+        breakdown['availability'] = weights['availability'] if self.available[row] else 0
+        if bridge is not None:
+            scores, reached = bridge
+            breakdown['bridge'] = scores[row].item()
+            breakdown['bridged_skills'] = current_vocabulary().decode(sorted(set(
+                token_id for component in GRAPH_COMPONENTS for token_id in self._shared(component, row, reached)
+            )))
+
+        return {
+            'alumni_id': alumni.get('userId'),
+            'alumni_name': alumni.get('name'),
+            'company': alumni.get('company'),
+            'industry': alumni.get('industry'),
+            'location': alumni.get('location'),
+            'skills': alumni.get('skills', []),
+            'interests': alumni.get('interests', []),
+            'mentoring_areas': alumni.get('mentoring_areas', []),
+            'availability': alumni.get('availability'),
+            'total_score': total_score,
+            'score_breakdown': breakdown
+        }
+
+    def get_recommendations(self, student: Dict, top_n: Optional[int] = None,
+                            min_score: Optional[float] = None, offset: int = 0,
+                            profile: Optional[WeightProfile] = None, reach: Optional[Reach] = None) -> List[Dict]:
+        """
+        Vectorized equivalent of GBHMMatcher.get_recommendations
+
+        Args:
+            student: Student profile data
+            top_n: Number of recommendations (None = all)
+            min_score: Drop alumni scoring below this
+            offset: Number of ranked rows to skip (pagination)
+            profile: Weight profile (default: the engine weights)
+            reach: Skill graph reach of the student; adds the bridge
+                   component when the profile's bridge weight is non-zero
+
+        Returns:
+            List of recommendations sorted by score, ties in corpus order
+        """
+        return [rec for _, rec in self.get_ranked_recommendations(student, top_n, min_score, offset, profile, reach)]
+
+    def get_ranked_recommendations(self, student: Dict, top_n: Optional[int] = None,
+                                   min_score: Optional[float] = None, offset: int = 0,
+                                   profile: Optional[WeightProfile] = None,
+                                   reach: Optional[Reach] = None) -> List[Tuple[int, Dict]]:
+        """
+        get_recommendations, with the corpus row of each recommendation
+
+        Returns:
+            (row, recommendation) pairs sorted by score, ties in corpus order
+        """
+        profile = profile or self.profile
+        columns = self._student_columns(student)
+        scores = profile.vector @ self.overlaps(columns)
+
+        bridge = None
+        if reach is not None and profile.weights.get('bridge'):
+            bridged = self.weighted_bridge(self.bridge_strengths(reach), profile.weights['bridge'])
+            scores = scores + bridged
+            bridge = (bridged, set(reach.ids.tolist()))
+
+        order = rank_rows(scores, offset + top_n if top_n else None, min_score)
+
+        student_ids = self.column_sets(columns)
+        return [
+            (row, self.build_recommendation(row, scores[row].item(), student_ids, profile, bridge))
+            for row in order[offset:].tolist()
+        ]
+
+    def evaluate(self, student: Dict, profiles: List[WeightProfile], top_n: Optional[int] = None,
+                 min_score: Optional[float] = None, reach: Optional[Reach] = None) -> Dict[str, List[Dict]]:
+        """
+        Rank the corpus for one student under several weight profiles
+
+        The overlap counts (and bridge strengths) are computed once; each
+        profile then costs one row of a (profiles x components) @
+        (components x alumni) product plus its own ranking.
+
+        Args:
+            student: Student profile data
+            profiles: Compiled weight profiles
+            top_n: Number of recommendations per profile (None = all)
+            min_score: Drop alumni scoring below this
+            reach: Skill graph reach of the student, for profiles with a bridge weight
+
+        Returns:
+            Profile name -> recommendations, as get_recommendations with that profile
+        """
+        columns = self._student_columns(student)
+        counts = self.overlaps(columns)
+        student_ids = self.column_sets(columns)
+
+        vectors = np.stack([profile.vector for profile in profiles]) if profiles else np.zeros((0, len(VECTOR_KEYS)))
+        totals = vectors @ counts
+
+        strengths, reached = None, None
+        if reach is not None and any(profile.weights.get('bridge') for profile in profiles):
+            strengths, reached = self.bridge_strengths(reach), set(reach.ids.tolist())
+
+        results = {}
+        for profile, scores in zip(profiles, totals):
+            # Integral profiles were promoted to float only if mixed with fractional ones
+            scores = scores.astype(profile.vector.dtype, copy=False)
+            bridge = None
+            if strengths is not None and profile.weights.get('bridge'):
+                bridged = self.weighted_bridge(strengths, profile.weights['bridge'])
+                scores = scores + bridged
+                bridge = (bridged, reached)
+            order = rank_rows(scores, top_n, min_score)
+            results[profile.name] = [
+                self.build_recommendation(row, scores[row].item(), student_ids, profile, bridge)
+                for row in order.tolist()
+            ]
+        return results
@@ -2,9 +2,11 @@
 Utility functions for GBHM Service
 """
 
+import base64
+import json
 import time
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 def print_header(text: str, char: str = "=", length: int = 80):
     """Print formatted header"""
@@ -44,4 +46,27 @@ def sort_recommendations(recommendations: List[Dict]) -> List[Dict]:
 
 def get_top_matches(recommendations: List[Dict], top_n: int = 10) -> List[Dict]:
     """Get top N recommendations"""
-    return recommendations[:top_n]
\ No newline at end of file
+    return recommendations[:top_n]
+
+def encode_cursor(offset: int) -> str:
+    """Encode a ranked-list offset as an opaque pagination cursor"""
+    payload = json.dumps({"offset": offset}).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """
+    Decode a pagination cursor back to a ranked-list offset
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["offset"]
+    except (ValueError, KeyError, TypeError) as error:
+        raise ValueError("Invalid cursor") from error
+    if isinstance(offset, bool) or not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
@@ -0,0 +1,265 @@
+"""
+Token normalization and interning for GBHM Service
+Maps every normalized university/industry/degree/company/skill/interest/area
+to an int ID so profile comparisons work on integers instead of strings
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, TypeVar, Union
+
+# Marks a scalar field whose token is not in the vocabulary
+UNKNOWN = -1
+
+
+def normalize_scalar(value) -> str:
+    """Normalize a single-valued field the way GBHMMatcher compares it"""
+    return str(value).lower()
+
+
+def normalize_set(values) -> set:
+    """Normalize a list field the way GBHMMatcher compares it"""
+    return set([str(v).lower() for v in values or []])
+
+
+class Vocabulary:
+    """Append-only token <-> int ID mapping"""
+
+    def __init__(self):
+        """Initialize an empty vocabulary"""
+        self._ids: Dict[str, int] = {}
+        self._tokens: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def intern(self, token: str) -> int:
+        """Get the ID of a normalized token, assigning one if new"""
+        token_id = self._ids.get(token)
+        if token_id is None:
+            with self._lock:
+                token_id = self._ids.get(token)
+                if token_id is None:
+                    token_id = len(self._tokens)
+                    self._tokens.append(token)
+                    self._ids[token] = token_id
+        return token_id
+
+    def lookup(self, token: str) -> int:
+        """Get the ID of a normalized token, or UNKNOWN"""
+        return self._ids.get(token, UNKNOWN)
+
+    def token(self, token_id: int) -> str:
+        """Decode one ID back to its display string"""
+        return self._tokens[token_id]
+
+    def tokens(self) -> List[str]:
+        """Copy of all tokens, in ID order"""
+        with self._lock:
+            return list(self._tokens)
+
+    def adopt(self, tokens: List[str]) -> Optional[List[int]]:
+        """
+        Take over token IDs assigned by another vocabulary (e.g. a snapshot)
+
+        If one vocabulary is a prefix of the other, this one is extended so
+        the IDs carry over unchanged. Otherwise the tokens are interned and
+        the caller must translate IDs.
+
+        Args:
+            tokens: The other vocabulary's tokens, in ID order
+
+        Returns:
+            None if IDs are unchanged, else other ID -> ID in this vocabulary
+        """
+        with self._lock:
+            shared = min(len(self._tokens), len(tokens))
+            if self._tokens[:shared] == tokens[:shared]:
+                for token in tokens[shared:]:
+                    self._ids[token] = len(self._tokens)
+                    self._tokens.append(token)
+                return None
+        return [self.intern(token) for token in tokens]
+
+    def decode(self, token_ids: Iterable[int]) -> List[str]:
+        """Decode IDs back to display strings"""
+        tokens = self._tokens
+        return [tokens[token_id] for token_id in token_ids]
+
+
+class ScopedVocabulary:
+    """
+    Request-local overlay of another vocabulary
+
+    Tokens the base vocabulary knew when the overlay was created keep their
+    IDs; new tokens get local IDs after them, so a request's own corpus
+    can be encoded without growing the process vocabulary. IDs are only
+    valid within the overlay, which is dropped with the request.
+    """
+
+    def __init__(self, base: Union[Vocabulary, "ScopedVocabulary"]):
+        """
+        Args:
+            base: Vocabulary to overlay (it may keep growing; later tokens are not seen)
+        """
+        self.base = base
+        self.offset = len(base)
+        self._ids: Dict[str, int] = {}
+        self._tokens: List[str] = []
+
+    def __len__(self) -> int:
+        return self.offset + len(self._tokens)
+
+    def intern(self, token: str) -> int:
+        """Get the ID of a normalized token, assigning a local one if new"""
+        token_id = self.lookup(token)
+        if token_id == UNKNOWN:
+            token_id = self.offset + len(self._tokens)
+            self._tokens.append(token)
+            self._ids[token] = token_id
+        return token_id
+
+    def lookup(self, token: str) -> int:
+        """Get the ID of a normalized token, or UNKNOWN"""
+        token_id = self.base.lookup(token)
+        if token_id != UNKNOWN and token_id < self.offset:
+            return token_id
+        return self._ids.get(token, UNKNOWN)
+
+    def token(self, token_id: int) -> str:
+        """Decode one ID back to its display string"""
+        if token_id < self.offset:
+            return self.base.token(token_id)
+        return self._tokens[token_id - self.offset]
+
+    def tokens(self) -> List[str]:
+        """Copy of all tokens, in ID order"""
+        return self.base.tokens()[:self.offset] + self._tokens
+
+    def decode(self, token_ids: Iterable[int]) -> List[str]:
+        """Decode IDs back to display strings"""
+        return [self.token(token_id) for token_id in token_ids]
+
+
+# Process-wide vocabulary shared by the matcher, engine and index
+vocabulary = Vocabulary()
+
+# Vocabulary encoding and decoding use in this context (None = the process one)
+_active_vocabulary: ContextVar[Optional[Union[Vocabulary, ScopedVocabulary]]] = ContextVar(
+    "active_vocabulary", default=None
+)
+
+T = TypeVar("T")
+
+
+def current_vocabulary() -> Union[Vocabulary, ScopedVocabulary]:
+    """Vocabulary in use in this context (the process vocabulary by default)"""
+    active = _active_vocabulary.get()
+    return vocabulary if active is None else active
+
+
+@contextmanager
+def use_vocabulary(active: Union[Vocabulary, ScopedVocabulary]) -> Iterator[Union[Vocabulary, ScopedVocabulary]]:
+    """Encode and decode with the given vocabulary inside the block"""
+    reset_token = _active_vocabulary.set(active)
+    try:
+        yield active
+    finally:
+        _active_vocabulary.reset(reset_token)
+
+
+@contextmanager
+def transient_vocabulary() -> Iterator[ScopedVocabulary]:
+    """
+    Encode inside the block with a request-local overlay of the current vocabulary
+
+    For corpora sent with a request: their tokens are dropped with the
+    overlay instead of staying in the process vocabulary. Registry-resident
+    structures must not be built inside the block.
+    """
+    with use_vocabulary(ScopedVocabulary(current_vocabulary())) as scoped:
+        yield scoped
+
+
+def run_transient(fn, *args, **kwargs):
+    """Call fn inside transient_vocabulary(), returning its result (picklable for process pools)"""
+    with transient_vocabulary():
+        return fn(*args, **kwargs)
+
+
+def iter_with_vocabulary(active: Union[Vocabulary, ScopedVocabulary], items: Iterator[T]) -> Iterator[T]:
+    """Advance a lazy iterator with the given vocabulary active, e.g. to decode a ranking later"""
+    while True:
+        with use_vocabulary(active):
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+        yield item
+
+
+class EncodedProfile(NamedTuple):
+    """Integer-encoded profile fields compared by GBHM"""
+    university: int
+    industry: int
+    degree: int
+    company: Optional[int]
+    skills: FrozenSet[int]
+    interests: FrozenSet[int]
+    mentoring: FrozenSet[int]
+    available: bool
+
+
+def _scalar(value, intern: bool) -> int:
+    token = normalize_scalar(value)
+    active = current_vocabulary()
+    return active.intern(token) if intern else active.lookup(token)
+
+
+def _token_set(values, intern: bool) -> FrozenSet[int]:
+    tokens = normalize_set(values)
+    active = current_vocabulary()
+    if intern:
+        return frozenset([active.intern(t) for t in tokens])
+    ids = [active.lookup(t) for t in tokens]
+    return frozenset([i for i in ids if i != UNKNOWN])
+
+
+def encode_alumni(alumni: Dict) -> EncodedProfile:
+    """
+    Encode an alumni profile, interning its tokens in the current vocabulary
+
+    Company is None when the alumnus has none (it then never matches).
+    """
+    return EncodedProfile(
+        university=_scalar(alumni.get('university', ''), True),
+        industry=_scalar(alumni.get('industry', ''), True),
+        degree=_scalar(alumni.get('degree', ''), True),
+        company=_scalar(alumni.get('company', ''), True) if alumni.get('company') else None,
+        skills=_token_set(alumni.get('skills', []), True),
+        interests=_token_set(alumni.get('interests', []), True),
+        mentoring=_token_set(alumni.get('mentoring_areas', []), True),
+        available=alumni.get('availability') == 'Available'
+    )
+
+
+def encode_student(student: Dict, intern: bool = False) -> EncodedProfile:
+    """
+    Encode a student profile
+
+    By default tokens are only looked up: a token no alumnus has cannot
+    match, so it is dropped (sets) or left UNKNOWN (scalars) without
+    growing the vocabulary.
+    """
+    return EncodedProfile(
+        university=_scalar(student.get('university', ''), intern),
+        industry=_scalar(student.get('preferred_industry', ''), intern),
+        degree=_scalar(student.get('degree', ''), intern),
+        company=_scalar(student.get('company', ''), intern),
+        skills=_token_set(student.get('skills', []), intern),
+        interests=_token_set(student.get('interests', []), intern),
+        mentoring=_token_set(student.get('looking_for', []), intern),
+        available=False
+    )
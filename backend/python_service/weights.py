@@ -0,0 +1,130 @@
+"""
+Named GBHM weight profiles
+Profiles are read from configuration and compiled once into the weight
+vector SparseMatchEngine multiplies its per-component overlap counts with
+
+Configuration (WEIGHT_PROFILES, inline JSON or a path to a JSON file):
+    {
+        "default": {"skill": 100},
+        "skills_first": {"university": 100, "skill": 150, "interest": 90}
+    }
+Each profile overrides DEFAULT_WEIGHTS; keys it omits keep their default.
+Weights must be nonnegative.
+The "default" profile always exists and is used when a request names none.
+The bridge weight (skill graph, see skill_graph.py) only applies to
+registry matching and is off by default.
+"""
+
+import json
+import os
+from numbers import Real
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from python_service.cache import weights_fingerprint
+
+DEFAULT_PROFILE = "default"
+
+# Weights for different connection types
+DEFAULT_WEIGHTS = {
+    'university': 200,      # Exact match - strongest (Level 0)
+    'industry': 160,        # Exact match (Level 0)
+    'degree': 100,          # Exact match (Level 0)
+    'skill': 90,            # Per skill match (Level 1)
+    'interest': 70,         # Per interest match (Level 1)
+    'mentoring': 50,        # Per mentoring area match (Level 2)
+    'company': 50,          # Company match (Additional)
+    'availability': 50,     # Alumni is available (Additional)
+    'bridge': 0             # Per unit of 2-hop skill graph reach (off)
+}
+
+WEIGHT_KEYS = tuple(DEFAULT_WEIGHTS)
+
+# Weights multiplying an overlap count, in weight vector order (availability last)
+VECTOR_KEYS = WEIGHT_KEYS[:WEIGHT_KEYS.index('availability') + 1]
+
+
+class WeightProfile(NamedTuple):
+    """A compiled weight profile"""
+    name: str
+    weights: Dict[str, float]
+    # Weights in VECTOR_KEYS order; int64 when every weight is integral
+    vector: np.ndarray
+    fingerprint: str
+
+
+def compile_profile(name: str, overrides: Optional[Dict] = None) -> WeightProfile:
+    """
+    Merge overrides into DEFAULT_WEIGHTS and compile the weight vector
+
+    Args:
+        name: Profile name
+        overrides: Weight key -> weight
+
+    Returns:
+        Compiled profile
+
+    Raises:
+        ValueError: Unknown weight key, or a non-numeric or negative weight
+    """
+    overrides = overrides or {}
+    if not isinstance(overrides, dict):
+        raise ValueError(f"Weight profile '{name}' must be an object")
+
+    unknown = sorted(set(overrides) - set(WEIGHT_KEYS))
+    if unknown:
+        raise ValueError(f"Weight profile '{name}' has unknown keys: {unknown}")
+    for key, value in overrides.items():
+        if not isinstance(value, Real) or isinstance(value, bool):
+            raise ValueError(f"Weight profile '{name}' has a non-numeric weight for '{key}': {value!r}")
+        # Pruning bounds (MaxScore, shard merges, LSH ordering) assume every
+        # component adds a nonnegative amount
+        if not value >= 0:
+            raise ValueError(f"Weight profile '{name}' weight for '{key}' must be nonnegative, got {value!r}")
+
+    weights = {key: overrides.get(key, DEFAULT_WEIGHTS[key]) for key in WEIGHT_KEYS}
+    integral = all(float(weights[key]).is_integer() for key in VECTOR_KEYS)
+    if integral:
+        # Keep scores integers, as with the built-in weights
+        weights.update((key, int(weights[key])) for key in VECTOR_KEYS)
+
+    vector = np.array([weights[key] for key in VECTOR_KEYS], dtype=np.int64 if integral else np.float64)
+    vector.setflags(write=False)
+    return WeightProfile(name, weights, vector, weights_fingerprint(weights))
+
+
+def load_weight_profiles(source: str = "") -> Dict[str, WeightProfile]:
+    """
+    Compile the configured weight profiles
+
+    Args:
+        source: JSON object of profile name -> overrides, or a path to a file
+                holding one; empty means only the default profile
+
+    Returns:
+        Profile name -> compiled profile, always including DEFAULT_PROFILE
+
+    Raises:
+        ValueError: Malformed configuration
+    """
+    raw = {}
+    source = source.strip()
+    if source:
+        if not source.startswith("{"):
+            if not os.path.isfile(source):
+                raise ValueError(f"Weight profile file not found: {source}")
+            with open(source) as profiles_file:
+                source = profiles_file.read()
+        try:
+            raw = json.loads(source)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Invalid weight profiles JSON: {error}")
+        if not isinstance(raw, dict):
+            raise ValueError("Weight profiles must be a JSON object")
+
+    profiles = {DEFAULT_PROFILE: compile_profile(DEFAULT_PROFILE, raw.get(DEFAULT_PROFILE))}
+    for name, overrides in raw.items():
+        if name != DEFAULT_PROFILE:
+            profiles[name] = compile_profile(name, overrides)
+    return profiles
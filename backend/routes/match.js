@@ -10,11 +10,91 @@ const authMiddleware = require('../middleware/auth');
 const Match = require('../models/Match');
 const StudentProfile = require('../models/StudentProfile');
 const AlumniProfile = require('../models/AlumniProfile');
+const {
+  MATCH_TOP_N,
+  pythonServiceUrl,
+  toStudentPayload,
+  toAlumniPayload,
+  offsetCursor,
+  ensureAlumniRegistry,
+  ensureStudentRegistry
+} = require('../utils/gbhmService');
+
+// AlumniProfile fields shown on match cards alongside the scores
+const ALUMNI_CARD_FIELDS = 'userId name company designation university degree industry yearsOfExperience';
+
+/**
+ * Map a stored Match document and its alumni profile to the GBHM service match shape
+ */
+const toMatchResponse = (match, alumni = {}) => ({
+  alumni_id: match.alumniId,
+  alumni_name: alumni.name,
+  company: alumni.company,
+  designation: alumni.designation,
+  university: alumni.university,
+  degree: alumni.degree,
+  industry: alumni.industry,
+  yearsOfExperience: alumni.yearsOfExperience,
+  total_score: match.totalScore,
+  score_breakdown: {
+    ...match.scoreBreakdown,
+    common_skills: match.commonSkills,
+    common_interests: match.commonInterests,
+    matching_areas: match.matchingAreas
+  },
+  common_skills: match.commonSkills,
+  common_interests: match.commonInterests,
+  matching_areas: match.matchingAreas,
+  match_rank: match.matchRank
+});
+
+const toTime = (date) => (date ? new Date(date).getTime() : 0);
+
+/**
+ * Load the alumni profiles of Match documents, by userId
+ */
+const findMatchAlumni = async (matches) => {
+  const profiles = await AlumniProfile.find({ userId: { $in: matches.map((match) => match.alumniId) } })
+    .select(ALUMNI_CARD_FIELDS)
+    .lean();
+  return new Map(profiles.map((profile) => [String(profile.userId), profile]));
+};
+
+/**
+ * Map Match documents to responses, dropping any whose alumnus no longer exists
+ */
+const toMatchResponses = (matches, alumni) => matches
+  .filter((match) => alumni.has(String(match.alumniId)))
+  .map((match) => toMatchResponse(match, alumni.get(String(match.alumniId))));
+
+/**
+ * Whether a student's stored ranking can be served instead of a new run
+ * It must be at least as new as the student's profile and the newest alumni
+ * profile, still name only existing alumni, and be deep enough for the limit
+ */
+const isRankingFresh = async (studentProfile, matches, alumni, limit) => {
+  const [alumniTotal, newest] = await Promise.all([
+    AlumniProfile.countDocuments(),
+    AlumniProfile.findOne().sort({ updatedAt: -1 }).select('updatedAt').lean()
+  ]);
+
+  if (alumni.size < matches.length || (matches.length < limit && matches.length < alumniTotal)) {
+    return false;
+  }
+
+  // Exported rows carry the export time; service runs stamp the student
+  const rankedAt = Math.max(
+    toTime(studentProfile.matchesUpdatedAt),
+    ...matches.map((match) => toTime(match.updatedAt))
+  );
+  return rankedAt >= toTime(studentProfile.updatedAt) && rankedAt >= toTime(newest && newest.updatedAt);
+};
 
 // ============ POST /api/match/run ============
 router.post('/run', authMiddleware, async (req, res) => {
   try {
-    const { studentId } = req.body;
+    const { studentId, topN, minScore, refresh } = req.body;
+    const limit = parseInt(topN) || MATCH_TOP_N;
 
     // Get student profile
     const studentProfile = await StudentProfile.findOne({ userId: studentId });
@@ -25,9 +105,32 @@ router.post('/run', authMiddleware, async (req, res) => {
       });
     }
 
-    // Get all alumni profiles
-    const alumniProfiles = await AlumniProfile.find();
-    if (alumniProfiles.length === 0) {
+    // Serve the stored ranking (nightly export or an earlier run) unless a
+    // refresh is asked for or profiles changed since it was computed
+    if (!refresh) {
+      const precomputed = await Match.find({ studentId: studentId, matchRank: { $ne: null } })
+        .sort({ matchRank: 1 })
+        .limit(limit)
+        .lean();
+
+      const alumni = precomputed.length > 0 ? await findMatchAlumni(precomputed) : new Map();
+      if (precomputed.length > 0 && await isRankingFresh(studentProfile, precomputed, alumni, limit)) {
+        // Ranks follow descending scores, so the cutoff keeps a prefix
+        const matches = minScore !== undefined && minScore !== null
+          ? precomputed.filter((match) => match.totalScore >= minScore)
+          : precomputed;
+
+        return res.json({
+          success: true,
+          message: 'Precomputed matches',
+          matches: toMatchResponses(matches, alumni)
+        });
+      }
+    }
+
+    // Make sure the service holds the current alumni corpus
+    const registry = await ensureAlumniRegistry(AlumniProfile);
+    if (registry.total_alumni === 0) {
       return res.json({
         success: true,
         message: 'No alumni available for matching',
@@ -35,60 +138,28 @@ router.post('/run', authMiddleware, async (req, res) => {
       });
     }
 
-    // Call Python GBHM service
-    const pythonServiceUrl = process.env.PYTHON_SERVICE_URL || 'http://localhost:8000';
-    
-    const matchingResponse = await axios.post(`${pythonServiceUrl}/api/match`, {
-      student: {
-        id: studentProfile._id,
-        userId: studentProfile.userId,
-        name: studentProfile.name,
-        university: studentProfile.university,
-        degree: studentProfile.degree,
-        preferred_industry: studentProfile.preferredIndustry,
-        skills: studentProfile.skills,
-        interests: studentProfile.interests,
-        looking_for: studentProfile.lookingFor,
-        location: studentProfile.location
-      },
-      alumni_list: alumniProfiles.map(alumni => ({
-        id: alumni._id,
-        userId: alumni.userId,
-        name: alumni.name,
-        university: alumni.university,
-        degree: alumni.degree,
-        industry: alumni.industry,
-        skills: alumni.skills,
-        interests: alumni.interests,
-        mentoring_areas: alumni.mentoringAreas,
-        company: alumni.company,
-        availability: alumni.availability,
-        hiring_stack: alumni.hiringStack,
-        location: alumni.location
-      }))
+    // Run GBHM on the service (alumni are resident there); it writes the
+    // changed Match rows itself in bulk, with matchRank set
+    const rankedAt = new Date();
+    const persisted = await axios.post(`${pythonServiceUrl()}/api/match/student/persist`, {
+      student: toStudentPayload(studentProfile),
+      top_n: limit,
+      min_score: minScore
     });
+    await StudentProfile.updateOne({ userId: studentId }, { $set: { matchesUpdatedAt: rankedAt } });
 
-    // Save matches to database
-    for (const match of matchingResponse.data.matches) {
-      await Match.findOneAndUpdate(
-        { studentId: studentId, alumniId: match.alumni_id },
-        {
-          studentId: studentId,
-          alumniId: match.alumni_id,
-          totalScore: match.total_score,
-          scoreBreakdown: match.score_breakdown,
-          commonSkills: match.score_breakdown.common_skills || [],
-          commonInterests: match.score_breakdown.common_interests || [],
-          matchingAreas: match.score_breakdown.matching_areas || []
-        },
-        { upsert: true, new: true }
-      );
-    }
+    // Read this run's matches back in rank order
+    const matches = await Match.find({
+      studentId: studentId,
+      alumniId: { $in: persisted.data.alumni_ids }
+    })
+      .sort({ matchRank: 1 })
+      .lean();
 
     res.json({
       success: true,
       message: 'Matching completed',
-      matches: matchingResponse.data.matches
+      matches: toMatchResponses(matches, await findMatchAlumni(matches))
     });
 
   } catch (error) {
@@ -140,6 +211,36 @@ router.get('/alumni/:id', async (req, res) => {
     const limit = parseInt(req.query.limit) || 10;
     const skip = (page - 1) * limit;
 
+    // Opt-in: rank all resident students for this alumnus instead of
+    // listing the pairs stored by student runs
+    if (req.query.source === 'live') {
+      const alumniProfile = await AlumniProfile.findOne({ userId: req.params.id });
+
+      if (!alumniProfile) {
+        return res.status(404).json({
+          success: false,
+          message: 'Alumni profile not found'
+        });
+      }
+
+      await ensureStudentRegistry(StudentProfile);
+      const response = await axios.post(`${pythonServiceUrl()}/api/match/alumni`, {
+        alumni: toAlumniPayload(alumniProfile),
+        top_n: limit,
+        min_score: req.query.minScore !== undefined ? parseFloat(req.query.minScore) : undefined,
+        cursor: req.query.cursor || offsetCursor(skip)
+      });
+
+      return res.json({
+        success: true,
+        matches: response.data.matches,
+        total: response.data.total_students,
+        page,
+        totalPages: Math.ceil(response.data.total_students / limit),
+        nextCursor: response.data.next_cursor
+      });
+    }
+
     const matches = await Match.find({ alumniId: req.params.id })
       .sort({ totalScore: -1 })
       .skip(skip)
@@ -165,6 +266,50 @@ router.get('/alumni/:id', async (req, res) => {
   }
 });
 
+// ============ POST /api/match/explain ============
+router.post('/explain', authMiddleware, async (req, res) => {
+  try {
+    const { studentId, alumniIds } = req.body;
+
+    if (!Array.isArray(alumniIds) || alumniIds.length === 0) {
+      return res.status(400).json({
+        success: false,
+        message: 'alumniIds must be a non-empty array'
+      });
+    }
+
+    const studentProfile = await StudentProfile.findOne({ userId: studentId });
+
+    if (!studentProfile) {
+      return res.status(404).json({
+        success: false,
+        message: 'Student profile not found'
+      });
+    }
+
+    // One call explains every card; alumni are read from the service registry
+    await ensureAlumniRegistry(AlumniProfile);
+    const response = await axios.post(`${pythonServiceUrl()}/api/explain/batch`, {
+      student: toStudentPayload(studentProfile),
+      alumni_ids: alumniIds
+    });
+
+    res.json({
+      success: true,
+      explanations: response.data.explanations,
+      missingAlumniIds: response.data.missing_alumni_ids
+    });
+
+  } catch (error) {
+    console.error('Explain matches error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Server error',
+      error: error.message
+    });
+  }
+});
+
 // ============ GET /api/match/:studentId/:alumniId ============
 router.get('/:studentId/:alumniId', async (req, res) => {
   try {
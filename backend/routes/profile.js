@@ -9,6 +9,7 @@ const authMiddleware = require('../middleware/auth');
 const StudentProfile = require('../models/StudentProfile');
 const AlumniProfile = require('../models/AlumniProfile');
 const User = require('../models/User');
+const { rematchAlumni, rematchStudent } = require('../utils/gbhmService');
 
 // ============ POST /api/profile/student ============
 router.post('/student', authMiddleware, async (req, res) => {
@@ -53,6 +54,9 @@ router.post('/student', authMiddleware, async (req, res) => {
     // Update user profile status
     await User.findByIdAndUpdate(req.userId, { isProfileComplete: true });
 
+    // Match the new student and keep the matching service registry current
+    rematchStudent(profile);
+
     res.status(201).json({
       success: true,
       message: 'Student profile created',
@@ -74,7 +78,7 @@ router.put('/student', authMiddleware, async (req, res) => {
   try {
     const profile = await StudentProfile.findOneAndUpdate(
       { userId: req.userId },
-      { $set: req.body },
+      { $set: { ...req.body, updatedAt: new Date() } },
       { new: true }
     );
 
@@ -85,6 +89,9 @@ router.put('/student', authMiddleware, async (req, res) => {
       });
     }
 
+    // Re-match the student and keep the matching service registry current
+    rematchStudent(profile);
+
     res.json({
       success: true,
       message: 'Profile updated',
@@ -173,6 +180,9 @@ router.post('/alumni', authMiddleware, async (req, res) => {
     // Update user profile status
     await User.findByIdAndUpdate(req.userId, { isProfileComplete: true });
 
+    // Re-match affected students and keep the matching service registry current
+    rematchAlumni(profile, StudentProfile);
+
     res.status(201).json({
       success: true,
       message: 'Alumni profile created',
@@ -194,7 +204,7 @@ router.put('/alumni', authMiddleware, async (req, res) => {
   try {
     const profile = await AlumniProfile.findOneAndUpdate(
       { userId: req.userId },
-      { $set: req.body },
+      { $set: { ...req.body, updatedAt: new Date() } },
       { new: true }
     );
 
@@ -205,6 +215,9 @@ router.put('/alumni', authMiddleware, async (req, res) => {
       });
     }
 
+    // Re-match affected students and keep the matching service registry current
+    rematchAlumni(profile, StudentProfile);
+
     res.json({
       success: true,
       message: 'Profile updated',
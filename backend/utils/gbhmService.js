@@ -0,0 +1,241 @@
+/**
+ * GBHM service client
+ * Payload mapping and alumni registry sync for the Python matching service
+ */
+
+const axios = require('axios');
+const Match = require('../models/Match');
+
+const pythonServiceUrl = () => process.env.PYTHON_SERVICE_URL || 'http://localhost:8000';
+
+// Number of top matches requested from the GBHM service and stored per student
+const MATCH_TOP_N = parseInt(process.env.MATCH_TOP_N) || 50;
+
+/**
+ * Map a StudentProfile document to the service payload
+ */
+const toStudentPayload = (studentProfile) => ({
+  id: studentProfile._id,
+  userId: studentProfile.userId,
+  name: studentProfile.name,
+  university: studentProfile.university,
+  degree: studentProfile.degree,
+  preferred_industry: studentProfile.preferredIndustry,
+  skills: studentProfile.skills,
+  interests: studentProfile.interests,
+  looking_for: studentProfile.lookingFor,
+  location: studentProfile.location
+});
+
+/**
+ * Map an AlumniProfile document to the service payload
+ */
+const toAlumniPayload = (alumni) => ({
+  id: alumni._id,
+  userId: alumni.userId,
+  name: alumni.name,
+  university: alumni.university,
+  degree: alumni.degree,
+  industry: alumni.industry,
+  skills: alumni.skills,
+  interests: alumni.interests,
+  mentoring_areas: alumni.mentoringAreas,
+  company: alumni.company,
+  availability: alumni.availability,
+  hiring_stack: alumni.hiringStack,
+  location: alumni.location
+});
+
+/**
+ * Pagination cursor for a ranked-list offset, as the service encodes them
+ */
+const offsetCursor = (offset) => (offset > 0
+  ? Buffer.from(JSON.stringify({ offset })).toString('base64url')
+  : undefined);
+
+// Per service registry: its version and the newest profile updatedAt it is
+// known to hold, as of this process's last bulk load or pushed change
+const registrySync = { alumni: null, students: null };
+
+const newestUpdatedAt = async (Profile) => {
+  const newest = await Profile.findOne().sort({ updatedAt: -1 }).select('updatedAt').lean();
+  return newest && newest.updatedAt ? new Date(newest.updatedAt).getTime() : 0;
+};
+
+/**
+ * Make sure a service registry holds the current profiles from Mongo
+ * Reloads it when the counts differ, when its version moved without this
+ * process knowing why, or when a profile was edited after the last load
+ */
+const ensureRegistry = async (name, Profile, { path, totalField, listField, toPayload }) => {
+  const [registry, total, updatedAt] = await Promise.all([
+    axios.get(`${pythonServiceUrl()}${path}`),
+    Profile.countDocuments(),
+    newestUpdatedAt(Profile)
+  ]);
+
+  const synced = registrySync[name];
+  if (registry.data[totalField] === total && synced && synced.version === registry.data.version
+      && synced.updatedAt >= updatedAt) {
+    return registry.data;
+  }
+
+  const profiles = await Profile.find();
+  const response = await axios.post(`${pythonServiceUrl()}${path}/bulk`, {
+    [listField]: profiles.map(toPayload),
+    replace: true
+  });
+  registrySync[name] = { version: response.data.version, updatedAt };
+  return response.data;
+};
+
+/**
+ * Record a profile change pushed to a service registry by a delta call
+ * Only a change made on top of the known state keeps the registry in sync
+ */
+const notePushedProfile = (name, version, profile) => {
+  const synced = registrySync[name];
+  if (synced && (version === synced.version || version === synced.version + 1)) {
+    registrySync[name] = {
+      version,
+      updatedAt: Math.max(synced.updatedAt, profile.updatedAt ? new Date(profile.updatedAt).getTime() : 0)
+    };
+  }
+};
+
+/**
+ * Make sure the service alumni registry holds the current alumni profiles
+ */
+const ensureAlumniRegistry = (AlumniProfile) => ensureRegistry('alumni', AlumniProfile, {
+  path: '/api/alumni',
+  totalField: 'total_alumni',
+  listField: 'alumni_list',
+  toPayload: toAlumniPayload
+});
+
+/**
+ * Make sure the service student registry holds the current student profiles
+ */
+const ensureStudentRegistry = (StudentProfile) => ensureRegistry('students', StudentProfile, {
+  path: '/api/students',
+  totalField: 'total_students',
+  listField: 'students',
+  toPayload: toStudentPayload
+});
+
+/**
+ * Renumber matchRank over each student's stored matches by descending score
+ * Ties keep their previous order; only ranks that moved are written
+ */
+const rerankStudents = async (studentIds) => {
+  for (const studentId of studentIds) {
+    const matches = await Match.find({ studentId })
+      .sort({ totalScore: -1, matchRank: 1 })
+      .select('_id matchRank')
+      .lean();
+
+    const operations = [];
+    matches.forEach((match, index) => {
+      if (match.matchRank !== index + 1) {
+        operations.push({
+          updateOne: { filter: { _id: match._id }, update: { $set: { matchRank: index + 1 } } }
+        });
+      }
+    });
+
+    if (operations.length > 0) {
+      await Match.bulkWrite(operations, { ordered: false });
+    }
+  }
+};
+
+/**
+ * Apply delta re-matching output to the Match collection
+ * Pairs entering or staying in the top N are upserted and pairs leaving it
+ * are removed, as the service's match sink does; the affected students'
+ * matchRank is then recomputed
+ */
+const applyPairChanges = async (changes) => {
+  const operations = [];
+  const studentIds = new Set();
+
+  for (const change of changes) {
+    const filter = { studentId: change.student_id, alumniId: change.alumni_id };
+
+    if (change.in_top_n && change.score_breakdown) {
+      operations.push({
+        updateOne: {
+          filter,
+          update: {
+            $set: {
+              totalScore: change.new_score,
+              scoreBreakdown: change.score_breakdown,
+              commonSkills: change.score_breakdown.common_skills || [],
+              commonInterests: change.score_breakdown.common_interests || [],
+              matchingAreas: change.score_breakdown.matching_areas || [],
+              updatedAt: new Date()
+            }
+          },
+          upsert: true
+        }
+      });
+      studentIds.add(String(change.student_id));
+    } else if (change.was_top_n && !change.in_top_n) {
+      operations.push({ deleteOne: { filter } });
+      studentIds.add(String(change.student_id));
+    }
+  }
+
+  if (operations.length > 0) {
+    await Match.bulkWrite(operations, { ordered: false });
+    await rerankStudents(studentIds);
+  }
+  return operations.length;
+};
+
+/**
+ * Re-match the students affected by one alumni profile change
+ * Also stores the new profile in the service registry; failures are logged only
+ */
+const rematchAlumni = async (alumni, StudentProfile) => {
+  try {
+    await ensureStudentRegistry(StudentProfile);
+    const response = await axios.post(`${pythonServiceUrl()}/api/match/delta/alumni`, {
+      new: toAlumniPayload(alumni),
+      top_n: MATCH_TOP_N
+    });
+    notePushedProfile('alumni', response.data.corpus_version, alumni);
+    await applyPairChanges(response.data.changes);
+  } catch (error) {
+    console.error('GBHM alumni re-match error:', error.message);
+  }
+};
+
+/**
+ * Re-match one student after a profile change
+ * Also stores the new profile in the service registry; failures are logged only
+ */
+const rematchStudent = async (student) => {
+  try {
+    const response = await axios.post(`${pythonServiceUrl()}/api/match/delta/student`, {
+      new: toStudentPayload(student),
+      top_n: MATCH_TOP_N
+    });
+    notePushedProfile('students', response.data.student_version, student);
+    await applyPairChanges(response.data.changes);
+  } catch (error) {
+    console.error('GBHM student re-match error:', error.message);
+  }
+};
+
+module.exports = {
+  MATCH_TOP_N,
+  pythonServiceUrl,
+  toStudentPayload,
+  toAlumniPayload,
+  offsetCursor,
+  ensureAlumniRegistry,
+  ensureStudentRegistry,
+  rematchAlumni,
+  rematchStudent
+};